@@ -10,97 +10,13 @@ def get_base_dir():
         return Path(__file__).parent.parent
 
 def get_database_path():
-    """Get the correct path for the database"""
+    """Get the correct path for the database.
+
+    The schema itself is created by database.schema.initialize_database().
+    """
     base_dir = get_base_dir()
     base_dir.mkdir(parents=True, exist_ok=True)
-    
-    db_path = base_dir / "PLdatabase.db"
-    
-    if not db_path.exists():
-        _create_initial_database(db_path)
-    
-    return db_path
-
-def _create_initial_database(db_path):
-    """Create the database with initial schema"""
-    import sqlite3
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.cursor()
-    
-    # customers table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS customers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            phone TEXT
-        )
-    ''')
-
-    # bolts table 
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS bolts(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            metal_strip TEXT,
-            rod TEXT,
-            screw TEXT,
-            plate TEXT,
-            square_mechanism TEXT,
-            stamp TEXT,
-            quantity TEXT,
-            Last_updated TEXT DEFAULT (datetime('now'))
-        )
-    ''')
-
-    # orders table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            customer_id INTEGER NOT NULL,
-            order_date TEXT NOT NULL DEFAULT (datetime('now')),
-            status TEXT NOT NULL DEFAULT 'pending',
-            notes TEXT,
-            total_items INTEGER DEFAULT 0,
-            last_updated TEXT NOT NULL DEFAULT (datetime('now')),
-            FOREIGN KEY (customer_id) REFERENCES customers(id) ON DELETE RESTRICT
-        )
-    ''')
-
-    # Order items table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS order_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            order_id INTEGER NOT NULL,
-            bolt_id INTEGER NOT NULL,
-            quantity INTEGER NOT NULL CHECK (quantity > 0),
-            created_at TEXT NOT NULL DEFAULT (datetime('now')),
-            FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
-            FOREIGN KEY (bolt_id) REFERENCES bolts(id) ON DELETE RESTRICT
-        )
-    ''')
-    
-    # Order status history
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS order_status_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            order_id INTEGER NOT NULL,
-            old_status TEXT,
-            new_status TEXT NOT NULL,
-            changed_at TEXT NOT NULL DEFAULT (datetime('now')),
-            changed_by TEXT,
-            FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE
-        )
-    ''')
-
-    # Indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_order_items_bolt ON order_items(bolt_id)')
-    
-    conn.commit()
-    conn.close()
+    return base_dir / "PLdatabase.db"
 
 BASE_DIR = get_base_dir()
 DB_FILE = get_database_path()
@@ -112,3 +28,80 @@ ORDER_STATUSES = ["pending", "approved", "processing", "shipped", "delivered", "
 
 LOG_FILE = BASE_DIR / "app.log"
 LOG_LEVEL = "INFO"
+LOG_MAX_BYTES = 5 * 1024 * 1024   # rotate app.log at this size...
+LOG_MAX_AGE_DAYS = 7              # ...or once it is this old
+LOG_BACKUP_COUNT = 10             # gzipped app.log.N.gz files kept
+
+# Connection pool
+DB_POOL_SIZE = 5          # max open connections; each thread reuses its own
+DB_POOL_TIMEOUT = 10.0    # seconds to wait for a free connection
+LOADER_WORKERS = 2        # background loader threads; keep below DB_POOL_SIZE
+
+# SQL profiling: per-statement timings (Tools > Query Profiler) and a slow-query log.
+# Off by default, since it adds a stack walk to every get_connection(); Tools >
+# Query Profiler turns it on for the session, POWERLOCK_SQL_PROFILING=1 from startup
+SQL_PROFILING = os.environ.get("POWERLOCK_SQL_PROFILING") == "1"
+SLOW_QUERY_MS = 100        # statements slower than this are logged with their query plan
+SLOW_QUERY_LOG = BASE_DIR / "slow_queries.log"
+# Log slow statements with their bound values (customer data) instead of placeholders
+SLOW_QUERY_LOG_VALUES = False
+
+# Views kept alive while hidden; the least recently shown is destroyed first.
+# All 3 views fit, so switching never rebuilds one; a view hidden for longer
+# than VIEW_IDLE_MINUTES is destroyed instead, freeing its rows and page cache
+VIEW_CACHE_SIZE = 3
+VIEW_IDLE_MINUTES = 15     # 0 keeps hidden views until the cache is full
+
+# How often to check for writes by other processes, in ms (0 disables)
+CHANGE_POLL_MS = 2000
+
+# CSV export
+EXPORT_CHUNK_SIZE = 1000    # rows fetched per round trip
+EXPORT_GZIP = False         # write .csv.gz instead of .csv
+
+# Online backup
+BACKUP_PAGES_PER_STEP = 256   # pages copied before pausing
+BACKUP_STEP_PAUSE = 0.01      # seconds between steps, leaves room for other connections
+BACKUP_COMPRESSION = None     # None, "gzip" or "lzma"
+
+# Scheduled incremental snapshots
+SNAPSHOT_DIR = BASE_DIR / "snapshots"
+SNAPSHOT_INTERVAL_MIN = 15                # minutes between snapshots (0 disables)
+SNAPSHOT_CHUNK_PAGES = 16                 # pages per stored chunk; smaller dedupes finer
+SNAPSHOT_MEMORY_LIMIT = 8 * 1024 * 1024   # larger databases are copied via a temp file
+# Newest snapshot kept per hour / day / ISO week, for this many of each
+SNAPSHOT_RETENTION = {"hourly": 24, "daily": 7, "weekly": 8}
+
+# SQLite pragma profile applied to every new connection.
+# WAL lets readers keep working while another clerk is writing.
+DB_PRAGMA_PROFILE = os.environ.get("POWERLOCK_DB_PROFILE", "desktop")
+
+DB_PRAGMA_PROFILES = {
+    # Single workstation, local disk
+    "desktop": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,          # KiB (~32 MB)
+        "mmap_size": 268435456,        # 256 MB
+        "temp_store": "MEMORY",
+    },
+    # Several app instances working on the same PLdatabase.db
+    "shared-file": {
+        "busy_timeout": 15000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+    },
+    # Imports and data generation; trades durability for speed
+    "bulk-load": {
+        "busy_timeout": 30000,
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 1073741824,
+        "temp_store": "MEMORY",
+    },
+}
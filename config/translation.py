@@ -22,6 +22,7 @@ GREEK = {
     "square_mechanism": "Μηχανισμος Καρε",
     "stamp": "Σταμπο",
     "quantity": "Ποσότητα",
+    "min_stock_level": "Ελάχιστο Απόθεμα",
     "last_updated": "Τελευταία Ενημέρωση",
     
     # Bolt types
@@ -0,0 +1,159 @@
+# database/backup.py
+import gzip
+import logging
+import lzma
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from config.settings import DB_FILE, BACKUP_PAGES_PER_STEP, BACKUP_STEP_PAUSE
+
+logger = logging.getLogger("PowerLock.database")
+
+# Compression name -> (file suffix, opener)
+COMPRESSORS = {
+    "gzip": (".gz", gzip.open),
+    "lzma": (".xz", lzma.open),
+}
+
+
+class BackupError(Exception):
+    """Raised when a backup cannot be taken or fails verification."""
+
+
+class BackupCancelled(BackupError):
+    """Raised when cancel() asked the backup to stop."""
+
+
+@dataclass(frozen=True)
+class BackupResult:
+    path: Path
+    pages: int
+    page_size: int
+    size: int               # bytes on disk, after compression
+    seconds: float
+
+    @property
+    def database_size(self) -> int:
+        return self.pages * self.page_size
+
+
+def backup_suffix(compress: Optional[str]) -> str:
+    """File suffix a backup with this compression gets after '.db'."""
+    if compress is None:
+        return ""
+    try:
+        return COMPRESSORS[compress][0]
+    except KeyError:
+        raise ValueError(f"Unknown compression '{compress}'. Available: {', '.join(COMPRESSORS)}")
+
+
+def open_backup(path, mode: str = "rb"):
+    """Open a backup file, decompressing by suffix."""
+    path = Path(path)
+    for suffix, opener in COMPRESSORS.values():
+        if path.suffix == suffix:
+            return opener(path, mode)
+    return open(path, mode)
+
+
+def copy_database(source, dst: sqlite3.Connection, pages: int = BACKUP_PAGES_PER_STEP,
+                  pause: float = BACKUP_STEP_PAUSE, progress=None, cancel=None) -> tuple:
+    """
+    Copy source into the open connection dst with the backup API and check it.
+
+    Returns:
+        (page_count, page_size) of the copy
+    """
+    src = sqlite3.connect(source, isolation_level=None)
+    try:
+        src.execute("PRAGMA busy_timeout = 5000")
+        # Hold one read transaction for the whole copy. Otherwise every commit
+        # by another connection restarts the backup from the first page, and
+        # a busy database never finishes. In WAL mode writers are not blocked.
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+        def step(status, remaining, total):
+            if progress is not None:
+                progress(total - remaining, total)
+            if cancel is not None and cancel():
+                raise BackupCancelled("Backup cancelled")
+            # sqlite3's own sleep only applies when the source is locked;
+            # pausing here is what leaves room for other connections
+            if remaining and pause:
+                time.sleep(pause)
+
+        src.backup(dst, pages=pages, progress=step)
+        src.execute("COMMIT")
+    finally:
+        src.close()
+
+    result = dst.execute("PRAGMA quick_check").fetchall()
+    if [row[0] for row in result] != ["ok"]:
+        problems = "; ".join(str(row[0]) for row in result[:5])
+        raise BackupError(f"Backup failed verification: {problems}")
+    page_count = dst.execute("PRAGMA page_count").fetchone()[0]
+    page_size = dst.execute("PRAGMA page_size").fetchone()[0]
+    return page_count, page_size
+
+
+def backup_database(destination, source=DB_FILE, compress: Optional[str] = None,
+                    pages: int = BACKUP_PAGES_PER_STEP, pause: float = BACKUP_STEP_PAUSE,
+                    progress: Optional[Callable[[int, int], None]] = None,
+                    cancel: Optional[Callable[[], bool]] = None) -> BackupResult:
+    """
+    Take a consistent copy of a live database without stopping other work.
+
+    Pages are copied in batches with a short pause between them, so other
+    connections keep reading and writing meanwhile. The copy is checked with
+    PRAGMA quick_check before it replaces destination; with compress set it
+    is then streamed through gzip or lzma. Nothing is left behind on failure.
+
+    Args:
+        destination: Backup file to write
+        source: Database to back up
+        compress: None, "gzip" or "lzma"
+        pages: Pages copied per step
+        pause: Seconds to wait between steps
+        progress: Called with (pages_done, pages_total) after each step
+        cancel: Polled after each step; returning True aborts the backup
+
+    Returns:
+        BackupResult describing the written file
+    """
+    backup_suffix(compress)
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    snapshot = destination.with_name(destination.name + ".snapshot")
+    part = destination.with_name(destination.name + ".part")
+    started = time.perf_counter()
+
+    try:
+        dst = sqlite3.connect(snapshot)
+        try:
+            page_count, page_size = copy_database(source, dst, pages, pause, progress, cancel)
+        finally:
+            dst.close()
+        if compress is None:
+            os.replace(snapshot, part)
+        else:
+            opener = COMPRESSORS[compress][1]
+            with open(snapshot, "rb") as src, opener(part, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            snapshot.unlink()
+        os.replace(part, destination)
+    except BaseException:
+        for leftover in (snapshot, part):
+            leftover.unlink(missing_ok=True)
+        raise
+
+    result = BackupResult(destination, page_count, page_size, destination.stat().st_size,
+                          time.perf_counter() - started)
+    logger.info(f"Backed up {source} to {destination}: {result.database_size:,} bytes "
+                f"({result.size:,} on disk) in {result.seconds:.1f}s")
+    return result
@@ -0,0 +1,74 @@
+# database/change_tracker.py
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from config.settings import DB_FILE
+
+logger = logging.getLogger("PowerLock.database")
+
+
+class ChangeTracker:
+    """
+    Tells whether tables changed, cheaply, including writes by other processes.
+
+    PRAGMA data_version on a connection changes whenever any *other*
+    connection commits. The tracker keeps one connection of its own that
+    never writes, so every commit - by the pool or another instance of the
+    app - shows up there. Only when it moves are the trigger-maintained
+    counters in table_versions read to see which tables were touched.
+    """
+
+    def __init__(self, database=DB_FILE):
+        self.database = database
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._versions: Dict[str, int] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.database, check_same_thread=False)
+            self._conn.execute("PRAGMA busy_timeout = 5000")
+        return self._conn
+
+    def data_version(self) -> int:
+        """The database-wide change token; one PRAGMA, no table reads."""
+        with self._lock:
+            return self._connection().execute("PRAGMA data_version").fetchone()[0]
+
+    def versions(self) -> Dict[str, int]:
+        """Modification counter of every tracked table."""
+        with self._lock:
+            conn = self._connection()
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                try:
+                    self._versions = dict(conn.execute("SELECT name, version FROM table_versions"))
+                except sqlite3.OperationalError as e:
+                    # Schema not migrated yet: fall back to whole-database changes
+                    logger.warning(f"Table versions unavailable: {e}")
+                    self._versions = {}
+                self._data_version = data_version
+            return dict(self._versions)
+
+    def snapshot(self, tables: Iterable[str]) -> Tuple:
+        """
+        Token for a set of tables; it differs from an earlier one exactly
+        when one of those tables was modified in between.
+        """
+        versions = self.versions()
+        if not versions:
+            return ("data_version", self._data_version)
+        return tuple(versions.get(table) for table in tables)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._data_version = None
+
+
+tracker = ChangeTracker()
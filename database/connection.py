@@ -1,22 +1,264 @@
 # database/connection.py
+import logging
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
-from config.settings import DB_FILE
+from config.settings import (
+    DB_FILE, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_PRAGMA_PROFILE, DB_PRAGMA_PROFILES
+)
+from database.profiler import ProfiledConnection, profiler
+from database.rows import RowFactory
+from utils.text import normalize_text
+
+logger = logging.getLogger("PowerLock.database")
+
+# Order matters: busy_timeout first so switching journal mode can wait for locks
+PRAGMA_ORDER = ("busy_timeout", "journal_mode", "synchronous",
+                "cache_size", "mmap_size", "temp_store")
+
+# Symbolic values as SQLite reports them back
+_PRAGMA_SYMBOLS = {
+    "synchronous": {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3},
+    "temp_store": {"DEFAULT": 0, "FILE": 1, "MEMORY": 2},
+}
 
 def dict_factory(cursor, row):
+    """Legacy per-row dict factory, kept for comparison benchmarks."""
     return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
 
+
+def get_pragma_profile(name: str = DB_PRAGMA_PROFILE) -> dict:
+    """Look up a pragma profile from settings."""
+    try:
+        return DB_PRAGMA_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown pragma profile '{name}'. "
+            f"Available: {', '.join(DB_PRAGMA_PROFILES)}"
+        )
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: dict):
+    """Apply a pragma profile to a freshly opened connection."""
+    for name in PRAGMA_ORDER:
+        if name in pragmas:
+            conn.execute(f"PRAGMA {name} = {pragmas[name]}")
+    conn.execute("PRAGMA foreign_keys = ON")
+
+
+def _normalize_pragma(name, value):
+    if isinstance(value, str):
+        upper = value.upper()
+        return _PRAGMA_SYMBOLS.get(name, {}).get(upper, upper)
+    return value
+
+
+def read_pragmas(conn: sqlite3.Connection, names=PRAGMA_ORDER) -> dict:
+    """Read the effective pragma values from a connection."""
+    effective = {}
+    for name in names:
+        value = conn.execute(f"PRAGMA {name}").fetchone()[0]
+        effective[name] = _normalize_pragma(name, value)
+    return effective
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes free in time."""
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections.
+
+    Each thread gets back the connection it used last whenever that one is
+    idle, so in practice every thread keeps its own connection. Connections
+    are configured once, when they are opened.
+    """
+
+    def __init__(self, database, max_size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT,
+                 pragmas: dict = None):
+        self.database = database
+        self.pragmas = pragmas if pragmas is not None else get_pragma_profile()
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._idle = []
+        self._size = 0
+        # Bumped by reset(); connections opened before it are not reused
+        self._generation = 0
+        self._born = {}
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.database,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            factory=ProfiledConnection if profiler.enabled else sqlite3.Connection,
+        )
+        conn.row_factory = RowFactory()
+        if profiler.enabled and profiler.log_values:
+            conn.set_trace_callback(profiler.trace)
+        apply_pragmas(conn, self.pragmas)
+        conn.create_function("normalize_text", 1, normalize_text, deterministic=True)
+        with self._cond:
+            self._born[conn] = self._generation
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take a connection, opening a new one if the pool has room."""
+        with self._cond:
+            preferred = getattr(self._local, "conn", None)
+            if preferred is not None and preferred in self._idle:
+                self._idle.remove(preferred)
+                self._hits += 1
+                return preferred
+
+            started = None
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._hits += 1
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._misses += 1
+                    conn = None
+                    break
+
+                now = time.perf_counter()
+                if started is None:
+                    started = now
+                    self._waits += 1
+                remaining = self.timeout - (now - started)
+                if remaining <= 0:
+                    self._wait_time += now - started
+                    raise PoolTimeout(
+                        f"No database connection available after {self.timeout:.1f}s"
+                    )
+                self._cond.wait(remaining)
+
+            if started is not None:
+                self._wait_time += time.perf_counter() - started
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        self._local.conn = conn
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool."""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._cond:
+            born = self._born.get(conn)
+            retired = born != self._generation
+            if retired:
+                self._born.pop(conn, None)
+                # A connection this pool never opened was never counted
+                if born is not None:
+                    self._size -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+        if retired:
+            conn.close()
+
+    def close_all(self):
+        """Close every idle connection."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            for conn in idle:
+                self._born.pop(conn, None)
+        for conn in idle:
+            conn.close()
+
+    def reset(self):
+        """
+        Retire every connection: idle ones now, borrowed ones when they are
+        released. Later acquires open fresh connections.
+        """
+        with self._cond:
+            self._generation += 1
+        self.close_all()
+
+    def stats(self) -> dict:
+        """Return pool usage counters."""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "waits": self._waits,
+                "wait_time": round(self._wait_time, 6),
+            }
+
+
 class DatabaseConnection:
     _instance = None
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance.profile = DB_PRAGMA_PROFILE
+            cls._instance.pool = ConnectionPool(DB_FILE, pragmas=get_pragma_profile(DB_PRAGMA_PROFILE))
+            cls._instance._local = threading.local()
+            # thread ident -> connection it currently holds, for interrupt()
+            cls._instance._active = {}
         return cls._instance
 
     @contextmanager
-    def get_connection(self):
-        conn = sqlite3.connect(DB_FILE, detect_types=sqlite3.PARSE_DECLTYPES)
-        conn.row_factory = dict_factory   
+    def get_connection(self, raw: bool = False):
+        """
+        Borrow a pooled connection for one unit of work.
+
+        Args:
+            raw: Return plain tuples instead of mapping rows. Meant for bulk
+                 paths that index columns by position.
+        """
+        token = profiler.enter() if profiler.enabled else None
+        try:
+            with self._borrow(raw) as conn:
+                yield conn
+        finally:
+            if token is not None:
+                profiler.leave(token)
+
+    @contextmanager
+    def _borrow(self, raw: bool):
+        # Nested calls on the same thread join the outer transaction
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            factory = held.row_factory
+            if raw:
+                held.row_factory = None
+            try:
+                yield held
+            finally:
+                held.row_factory = factory
+            return
+
+        # Released to the pool it came from, even if open() swaps pools meanwhile
+        pool = self.pool
+        conn = pool.acquire()
+        factory = conn.row_factory
+        if raw:
+            conn.row_factory = None
+        self._local.conn = conn
+        self._active[threading.get_ident()] = conn
         try:
             yield conn
             conn.commit()
@@ -24,6 +266,84 @@ class DatabaseConnection:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            if isinstance(conn, ProfiledConnection):
+                # Cursors returned half-read are finished here, while the
+                # connection is still ours to run EXPLAIN on
+                conn.finish_cursors()
+            self._active.pop(threading.get_ident(), None)
+            conn.row_factory = factory
+            self._local.conn = None
+            pool.release(conn)
+
+    def interrupt(self, thread_id: int) -> bool:
+        """
+        Abort whatever statement the given thread is running.
+
+        The interrupted call raises sqlite3.OperationalError("interrupted")
+        in that thread. Returns False if the thread holds no connection.
+        """
+        conn = self._active.get(thread_id)
+        if conn is None:
+            return False
+        conn.interrupt()
+        return True
+
+    def pool_stats(self) -> dict:
+        return self.pool.stats()
+
+    def verify_pragmas(self) -> dict:
+        """
+        Check that the active profile took effect and log the result.
+
+        Returns:
+            Dictionary of pragma -> (expected, actual) for every mismatch
+        """
+        expected = self.pool.pragmas
+        with self.get_connection() as conn:
+            effective = read_pragmas(conn, [name for name in PRAGMA_ORDER if name in expected])
+
+        mismatches = {}
+        for name, actual in effective.items():
+            wanted = _normalize_pragma(name, expected[name])
+            if actual != wanted:
+                mismatches[name] = (expected[name], actual)
+
+        summary = ", ".join(f"{name}={value}" for name, value in effective.items())
+        logger.info(f"SQLite pragma profile '{self.profile}': {summary}")
+        for name, (wanted, actual) in mismatches.items():
+            logger.warning(f"PRAGMA {name} is {actual}, profile requested {wanted}")
+        return mismatches
+
+    def open(self, database, pragmas: dict = None):
+        """
+        Point the pool at another database file. For tools and benchmarks
+        that work on a scratch database; the app itself only uses DB_FILE.
+
+        Connections still borrowed from the old pool go back to it and are
+        closed there, so they never count against the new pool's size.
+        """
+        old = self.pool
+        self.pool = ConnectionPool(database, pragmas=pragmas if pragmas is not None else old.pragmas)
+        old.reset()
+        logger.info(f"Database switched to {database}")
+
+    def set_profiling(self, enabled: bool):
+        """
+        Turn SQL profiling on or off while running. Connections are reopened
+        so they are ProfiledConnections exactly while it is on.
+        """
+        if profiler.enabled == enabled:
+            return
+        profiler.enabled = enabled
+        self.pool.reset()
+        logger.info(f"SQL profiling {'enabled' if enabled else 'disabled'}")
+
+    def reset(self):
+        """Reopen all connections, e.g. after the database file was replaced."""
+        self.pool.reset()
+        logger.info("Connection pool reset")
+
+    def close(self):
+        self.pool.close_all()
 
 db = DatabaseConnection()
@@ -0,0 +1,98 @@
+# database/migrations.py
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, List
+
+logger = logging.getLogger("PowerLock.database")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+_MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Register a schema migration. Versions must be unique and increasing."""
+    def decorator(func):
+        if any(m.version == version for m in _MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        _MIGRATIONS.append(Migration(version, description, func))
+        _MIGRATIONS.sort(key=lambda m: m.version)
+        return func
+    return decorator
+
+
+def get_migrations() -> List[Migration]:
+    return list(_MIGRATIONS)
+
+
+def latest_version() -> int:
+    return _MIGRATIONS[-1].version if _MIGRATIONS else 0
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Bring the database up to the latest schema version.
+
+    Costs a single PRAGMA read when the schema is already current. Each
+    migration runs in its own IMMEDIATE transaction together with the
+    user_version bump, so a failure leaves the previous version intact.
+
+    Returns:
+        The schema version after migrating
+    """
+    current = get_schema_version(conn)
+    target = latest_version()
+    if current == target:
+        return current
+    if current > target:
+        raise RuntimeError(
+            f"Database schema version {current} is newer than this application "
+            f"supports ({target}). Please update the application."
+        )
+
+    # Table rebuilds need foreign keys off; this pragma is a no-op inside a transaction
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    # Rows orphaned while foreign keys were unenforced are not a migration's fault
+    baseline_violations = len(conn.execute("PRAGMA foreign_key_check").fetchall())
+    if baseline_violations:
+        logger.warning(f"Database has {baseline_violations} pre-existing foreign key violation(s)")
+    try:
+        for step in [m for m in _MIGRATIONS if m.version > current]:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another instance may have migrated while we waited for the lock
+                if step.version <= get_schema_version(conn):
+                    conn.rollback()
+                    continue
+
+                step.apply(conn)
+
+                violations = len(conn.execute("PRAGMA foreign_key_check").fetchall())
+                if violations > baseline_violations:
+                    raise sqlite3.IntegrityError(
+                        f"Migration {step.version} introduced "
+                        f"{violations - baseline_violations} foreign key violation(s)"
+                    )
+                conn.execute(f"PRAGMA user_version = {step.version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                logger.error(f"Migration {step.version} ({step.description}) failed")
+                raise
+            logger.info(f"Applied migration {step.version}: {step.description}")
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+
+    return get_schema_version(conn)
@@ -0,0 +1,334 @@
+# database/profiler.py
+import logging
+import re
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional
+
+from config.settings import SQL_PROFILING, SLOW_QUERY_MS, SLOW_QUERY_LOG_VALUES
+
+slow_logger = logging.getLogger("PowerLock.slow")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """One-line form of a statement, used as its key in the statistics."""
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class StatementStats:
+    """Totals for one statement issued from one caller."""
+
+    __slots__ = ("sql", "statement", "params", "caller", "calls", "total", "max", "rows", "slow")
+
+    def __init__(self, statement: str, caller: str):
+        self.sql = normalize_sql(statement)
+        self.statement = statement
+        self.params = ()            # of the latest call, to re-run EXPLAIN with
+        self.caller = caller
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.slow = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "sql": self.sql,
+            "caller": self.caller,
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_ms": round(self.total * 1000 / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "rows": self.rows,
+            "slow": self.slow,
+        }
+
+
+class QueryProfiler:
+    """
+    Per-statement latency, row counts and callers for every pooled connection.
+
+    Pooled connections are ProfiledConnections, whose cursors time execute()
+    and every fetch and count the rows they return.
+    get_connection() notes which repository method borrowed the connection
+    and how long it held it, Python work between statements included.
+
+    A statement whose execution (execute plus fetches) takes longer than
+    slow_ms is written to the "PowerLock.slow" log with its
+    EXPLAIN QUERY PLAN. The log shows the statement with placeholders; with
+    log_values set, the SQLite trace callback also captures it as run, with
+    the bound values (customer names, phones, notes) filled in.
+    """
+
+    def __init__(self, enabled: bool = SQL_PROFILING, slow_ms: float = SLOW_QUERY_MS,
+                 log_values: bool = SLOW_QUERY_LOG_VALUES):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.log_values = log_values
+        self._stats: Dict[tuple, StatementStats] = {}
+        # caller -> [connections borrowed, seconds held]
+        self._callers: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.started = time.time()
+
+    # ---- caller attribution ----
+
+    def enter(self) -> tuple:
+        """Note the repository method behind a get_connection(); returns a token for leave()."""
+        previous = getattr(self._local, "caller", None)
+        self._local.caller = self._find_caller()
+        return previous, time.perf_counter()
+
+    def leave(self, token: tuple):
+        """Charge the time the connection was held to the caller."""
+        previous, started = token
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            totals = self._callers.setdefault(self._local.caller, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+        self._local.caller = previous
+
+    @staticmethod
+    def _find_caller() -> str:
+        """
+        Nearest public repository method on the stack, so helpers such as
+        _fetch_page are charged to the method that called them; else the
+        nearest caller outside database/.
+        """
+        frame = sys._getframe(2)
+        helper = outside = None
+        while frame is not None:
+            code = frame.f_code
+            path = code.co_filename.replace("\\", "/")
+            if "/repositories/" in path:
+                owner = frame.f_locals.get("self")
+                name = f"{type(owner).__name__}.{code.co_name}" if owner is not None else code.co_name
+                if not code.co_name.startswith("_"):
+                    return name
+                helper = helper or name
+            elif outside is None and "/database/" not in path and "contextlib" not in path:
+                outside = f"{path.rsplit('/', 1)[-1]}:{code.co_name}"
+            frame = frame.f_back
+        return helper or outside or "?"
+
+    # ---- recording ----
+
+    def trace(self, statement: str):
+        """sqlite3 trace callback: remember the statement as run, with values bound."""
+        # Trigger programs are reported as "-- TRIGGER name"; keep the outer statement
+        if not statement.startswith("--"):
+            self._local.expanded = statement
+
+    def last_statement(self) -> Optional[str]:
+        return getattr(self._local, "expanded", None)
+
+    def record(self, sql: str, elapsed: float, rows: int, new_call: bool, params=()) -> StatementStats:
+        caller = getattr(self._local, "caller", None) or "?"
+        key = (sql, caller)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats(sql, caller)
+            if new_call:
+                stats.calls += 1
+                stats.params = params
+            stats.total += elapsed
+            stats.rows += rows
+        return stats
+
+    def finish_call(self, stats: StatementStats, conn, sql: str, params, elapsed: float,
+                    expanded: Optional[str] = None, explain: bool = True):
+        """
+        Called once per execution with its full time; logs it if slow.
+
+        explain must be False unless the caller still holds conn, as the
+        plan is read on it.
+        """
+        slow = elapsed * 1000 >= self.slow_ms
+        with self._lock:
+            stats.max = max(stats.max, elapsed)
+            stats.slow += slow
+        if not slow:
+            return
+        plan = self.explain(conn, sql, params) if explain else ["(no plan: cursor was dropped unfinished)"]
+        slow_logger.warning(
+            f"Slow query {elapsed * 1000:.1f} ms in {stats.caller}: {normalize_sql(expanded if self.log_values and expanded else sql)}\n"
+            + "\n".join(f"    {line}" for line in plan)
+        )
+
+    @staticmethod
+    def explain(conn, sql: str, params=()) -> List[str]:
+        """EXPLAIN QUERY PLAN as indented lines; empty if it cannot be explained."""
+        if params is None or not sql.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")):
+            return []
+        try:
+            # A plain cursor with plain tuples, so explaining is not itself profiled
+            cursor = sqlite3.Cursor(conn)
+            cursor.row_factory = None
+            rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except sqlite3.Error as e:
+            return [f"(no plan: {e})"]
+        depth = {0: 0}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, 0) + 1
+            lines.append("  " * (depth[node_id] - 1) + detail)
+        return lines
+
+    # ---- reporting ----
+
+    def top(self, limit: int = 50, key: str = "total_ms") -> List[dict]:
+        """Statements ordered by key, largest first."""
+        with self._lock:
+            rows = [stats.as_dict() for stats in self._stats.values()]
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:limit]
+
+    def statements(self) -> List[StatementStats]:
+        """Every distinct (statement, caller) seen, in first-seen order."""
+        with self._lock:
+            return list(self._stats.values())
+
+    def callers(self, limit: int = 50) -> List[dict]:
+        """Repository methods by total time spent holding a connection."""
+        with self._lock:
+            rows = [{"caller": caller, "calls": calls, "total_ms": round(total * 1000, 3),
+                     "avg_ms": round(total * 1000 / calls, 3)}
+                    for caller, (calls, total) in self._callers.items()]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._callers.clear()
+        self.started = time.time()
+
+
+profiler = QueryProfiler()
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor that reports its statement's time and rows to the profiler."""
+
+    _stats = None
+    _sql = None
+    _params = ()
+    _expanded = None
+    _elapsed = 0.0
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._sql, self._params, self._elapsed = sql, parameters, elapsed
+            self._expanded = profiler.last_statement()
+            complete = self.description is None
+            # Statements without a result set report the rows they changed
+            rows = max(self.rowcount, 0) if complete else 0
+            self._stats = profiler.record(sql, elapsed, rows, new_call=True, params=parameters)
+            if complete:
+                self._finish()
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = profiler.record(sql, elapsed, max(self.rowcount, 0), new_call=True)
+            profiler.finish_call(stats, self.connection, sql, None, elapsed)
+
+    def _fetched(self, started: float, rows: int, done: bool):
+        if self._stats is None:
+            return
+        elapsed = time.perf_counter() - started
+        self._elapsed += elapsed
+        profiler.record(self._sql, elapsed, rows, new_call=False)
+        if done:
+            self._finish()
+
+    def _finish(self, explain: bool = True):
+        """Close the books on the current execution."""
+        if self._stats is not None:
+            stats, self._stats = self._stats, None
+            profiler.finish_call(stats, self.connection, self._sql, self._params,
+                                 self._elapsed, self._expanded, explain)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # get_connection() finishes its cursors before releasing the
+        # connection; one dropped later may be on a connection another
+        # thread now holds, so it is recorded without EXPLAIN
+        try:
+            self._finish(explain=False)
+        except Exception:
+            pass
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors, including those behind execute(), are profiled."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, factory=ProfiledCursor):
+        cursor = super().cursor(factory)
+        if isinstance(cursor, ProfiledCursor):
+            self._cursors.add(cursor)
+        return cursor
+
+    def finish_cursors(self):
+        """Record every execution still open; call while the connection is held."""
+        for cursor in list(self._cursors):
+            cursor._finish()
+
+    # The built-in shortcuts create their cursor internally, bypassing cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -1,8 +1,83 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
 from database.connection import db
+from utils.text import normalize_text
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def fts_query(term: str, column: Optional[str] = None) -> str:
+    """
+    Turn free text typed by a user into an FTS5 prefix query.
+    
+    Every word must match the start of a token: "hex m1" -> "hex"* "m1"*
+    Returns "" when the term has nothing searchable.
+    """
+    words = [w.replace('"', '') for w in term.split()]
+    phrases = " ".join(f'"{w}"*' for w in words if w)
+    if not phrases:
+        return ""
+    return f"{column} : ({phrases})" if column else phrases
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """
+    Ordering usable for keyset pagination.
+    
+    The columns must be NOT NULL and end with a unique column (normally the
+    id) so every row has a distinct position. All columns sort the same way,
+    which lets a single row-value comparison seek straight to a cursor.
+    """
+    columns: Tuple[str, ...]
+    descending: bool = False
+    
+    def order_by(self, reverse: bool = False) -> str:
+        """ORDER BY list for this key, optionally in the opposite direction."""
+        direction = " DESC" if self.descending != reverse else ""
+        return ", ".join(col + direction for col in self.columns)
+    
+    @property
+    def row_keys(self) -> Tuple[str, ...]:
+        # "o.order_date" is read back from the row as "order_date"
+        return tuple(col.split(".")[-1] for col in self.columns)
+
+
+@dataclass
+class Page:
+    """
+    One page of a keyset-paginated listing.
+    
+    Cursors are the sort-key values of the last (next_cursor) or first
+    (prev_cursor) row; None means there is nothing further that way.
+    Iterating a page iterates its rows, so it can stand in for a list.
+    """
+    rows: List = field(default_factory=list)
+    next_cursor: Optional[tuple] = None
+    prev_cursor: Optional[tuple] = None
+    
+    def __iter__(self):
+        return iter(self.rows)
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def __getitem__(self, index):
+        return self.rows[index]
+
 
 class BaseRepository(ABC):
     """Base repository with common CRUD operations."""
+    
+    # Query that listings and pages select from, and its id column
+    LISTING_SELECT: Optional[str] = None
+    ID_COLUMN = "id"
+    # Table (aliased as the sort columns expect) that get_cursor_at() probes.
+    # Sort keys and search filters may only use this table's columns
+    KEY_TABLE: Optional[str] = None
+    # Named orderings accepted by get_page(); the first entry is the default
+    SORT_KEYS: Dict[str, SortKey] = {"id": SortKey(("id",), descending=True)}
 
     def __init__(self):
         self.db = db
@@ -10,6 +85,9 @@ class BaseRepository(ABC):
     @abstractmethod
     def get_table_name(self) -> str:
         pass
+    
+    def get_listing_select(self) -> str:
+        return self.LISTING_SELECT or f"SELECT * FROM {self.get_table_name()}"
 
     def get_by_id(self, item_id: int):
         query = f"SELECT * FROM {self.get_table_name()} WHERE id = ?"
@@ -18,6 +96,16 @@ class BaseRepository(ABC):
             cursor.execute(query, (item_id,))
             return cursor.fetchone()
         
+    def get_listing_row(self, item_id: int):
+        """One record shaped like the rows of get_page()."""
+        if not self.LISTING_SELECT:
+            return self.get_by_id(item_id)
+        query = f"{self.LISTING_SELECT} WHERE {self.ID_COLUMN} = ?"
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (item_id,))
+            return cursor.fetchone()
+        
     def get_all(self, order_by="id DESC"):
         query = f"SELECT * FROM {self.get_table_name()} ORDER BY {order_by}"
         with self.db.get_connection() as conn:
@@ -25,6 +113,214 @@ class BaseRepository(ABC):
             cursor.execute(query)
             return cursor.fetchall()
         
+    def get_page(self, sort: Optional[str] = None, cursor: Optional[Sequence] = None,
+                 page_size: Optional[int] = DEFAULT_PAGE_SIZE, backward: bool = False) -> Page:
+        """
+        Fetch one page of the table in a named order.
+        
+        Args:
+            sort: Key of SORT_KEYS; defaults to the first one
+            cursor: next_cursor / prev_cursor of a previous page, or None to start at an end
+            page_size: Rows per page; None returns everything after the cursor
+            backward: Page towards the start (pass a prev_cursor)
+        """
+        return self._fetch_page(self._sort_key(sort), cursor=cursor,
+                                page_size=page_size, backward=backward)
+    
+    def get_cursor_at(self, position: int, sort: Optional[str] = None) -> Optional[tuple]:
+        """
+        Cursor for which get_page() starts at row position + 1 (0-based).
+        
+        Used to jump into the middle of a listing, e.g. when a scrollbar is
+        dragged. This is the one place that steps over rows with OFFSET. It
+        reads only the sort columns of KEY_TABLE, without the listing's
+        joins, so the rows skipped come from an index; paging on from the
+        cursor is keyset.
+        """
+        return self._cursor_at(self._sort_key(sort), position)
+    
+    def iter_chunks(self, sort: Optional[str] = None, chunk_size: int = 1000):
+        """
+        Yield the whole listing in sort order, chunk_size rows at a time.
+        
+        Reads through a single cursor with fetchmany, so only one chunk is
+        in memory at once. The connection is held until the generator is
+        exhausted or closed.
+        """
+        sort_key = self._sort_key(sort)
+        query = f"{self.get_listing_select()} ORDER BY {sort_key.order_by()}"
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+    
+    def count(self) -> int:
+        """Number of rows get_page() can return."""
+        return self._count()
+    
+    def search_page(self, term: str, sort: Optional[str] = None, cursor: Optional[Sequence] = None,
+                    page_size: Optional[int] = DEFAULT_PAGE_SIZE, backward: bool = False) -> Page:
+        """
+        One page of the rows matching a search term, in the same orders as
+        get_page(). Relevance is not a usable seek key, so unlike search()
+        the matches are listed by the sort rather than ranked.
+        """
+        search = self._search_filter(term)
+        if search is None:
+            return Page()
+        return self._fetch_page(self._sort_key(sort), *search, cursor=cursor,
+                                page_size=page_size, backward=backward)
+    
+    def search_count(self, term: str) -> int:
+        """Number of rows search_page() can return."""
+        search = self._search_filter(term)
+        return self._count(*search) if search is not None else 0
+    
+    def search_cursor_at(self, term: str, position: int, sort: Optional[str] = None) -> Optional[tuple]:
+        """get_cursor_at() within the rows matching a search term."""
+        search = self._search_filter(term)
+        if search is None:
+            return None
+        return self._cursor_at(self._sort_key(sort), position, *search)
+    
+    def _search_filter(self, term: str) -> Optional[Tuple[str, tuple]]:
+        """
+        WHERE clause and parameters selecting the listing rows that match a
+        search term, or None if the term has nothing searchable. By default
+        a prefix match on any column of the table's FTS5 index.
+        """
+        match = fts_query(normalize_text(term))
+        if not match:
+            return None
+        table = self.get_table_name()
+        return f"{self.ID_COLUMN} IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)", (match,)
+    
+    def _count(self, where: str = "", params: Sequence = ()) -> int:
+        query = self.get_listing_select()
+        if where:
+            query += f" WHERE {where}"
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM ({query})", tuple(params))
+            return cursor.fetchone()[0]
+    
+    def _cursor_at(self, sort_key: SortKey, position: int, where: str = "",
+                   params: Sequence = ()) -> Optional[tuple]:
+        query = f"SELECT {', '.join(sort_key.columns)} FROM {self.KEY_TABLE or self.get_table_name()}"
+        if where:
+            query += f" WHERE {where}"
+        query += f" ORDER BY {sort_key.order_by()} LIMIT 1 OFFSET ?"
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (*params, position))
+            row = cursor.fetchone()
+        return tuple(row[k] for k in sort_key.row_keys) if row else None
+    
+    def _find_by_name_norm(self, name: str):
+        """
+        Rows whose normalized name starts with name, or whose name words
+        start with its words, ordered by name.
+        
+        Both halves seek rather than scan: a range on the name_norm index
+        and the name_norm column of the table's FTS5 index.
+        """
+        norm = normalize_text(name).strip()
+        if not norm:
+            return []
+        table = self.get_table_name()
+        query = f"""
+            SELECT * FROM {table}
+            WHERE id IN (
+                SELECT id FROM {table}
+                WHERE name_norm >= ? AND name_norm < ? || char(0x10FFFF)
+                UNION
+                SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?
+            )
+            ORDER BY name
+        """
+        params = (norm, norm, fts_query(norm, column="name_norm") or '""')
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    
+    def _sort_key(self, sort: Optional[str]) -> SortKey:
+        if sort is None:
+            sort = next(iter(self.SORT_KEYS))
+        try:
+            return self.SORT_KEYS[sort]
+        except KeyError:
+            raise ValueError(f"Unknown sort '{sort}'. Available: {', '.join(self.SORT_KEYS)}")
+    
+    def _fetch_page(self, sort_key: SortKey, where: str = "", params: Sequence = (),
+                    cursor: Optional[Sequence] = None, page_size: Optional[int] = DEFAULT_PAGE_SIZE,
+                    backward: bool = False) -> Page:
+        """
+        Keyset (seek) pagination over get_listing_select().
+        
+        The cursor becomes a row-value comparison on the sort columns, so an
+        index on them is entered directly at the cursor position and a deep
+        page costs the same as the first one. OFFSET would instead read and
+        discard every earlier row.
+        """
+        conditions = [where] if where else []
+        params = list(params)
+        
+        # Walking backward flips both the comparison and the sort; rows are
+        # reversed afterwards so pages always come back in display order
+        descending = sort_key.descending != backward
+        if cursor is not None:
+            if len(cursor) != len(sort_key.columns):
+                raise ValueError(f"Cursor {tuple(cursor)!r} does not match sort columns {sort_key.columns}")
+            placeholders = ", ".join("?" * len(cursor))
+            conditions.append(
+                f"({', '.join(sort_key.columns)}) {'<' if descending else '>'} ({placeholders})"
+            )
+            params.extend(cursor)
+        
+        query = self.get_listing_select()
+        if conditions:
+            query += " WHERE " + " AND ".join(f"({c})" for c in conditions)
+        query += " ORDER BY " + sort_key.order_by(reverse=backward)
+        # One extra row tells whether another page exists
+        query += " LIMIT ?"
+        params.append(page_size + 1 if page_size is not None else -1)
+        
+        with self.db.get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            rows = cur.fetchall()
+        
+        has_more = page_size is not None and len(rows) > page_size
+        if has_more:
+            rows = rows[:page_size]
+        if backward:
+            rows.reverse()
+        
+        def key_of(row):
+            return tuple(row[k] for k in sort_key.row_keys)
+        
+        page = Page(rows)
+        if rows:
+            first, last = key_of(rows[0]), key_of(rows[-1])
+            if backward:
+                page.prev_cursor = first if has_more else None
+                page.next_cursor = last
+            else:
+                page.prev_cursor = first if cursor is not None else None
+                page.next_cursor = last if has_more else None
+        elif cursor is not None:
+            # Ran off the end: let the caller step back from where it was
+            if backward:
+                page.next_cursor = tuple(cursor)
+            else:
+                page.prev_cursor = tuple(cursor)
+        return page
+    
     def delete(self, item_id: int):
         query = f"DELETE FROM {self.get_table_name()} WHERE id = ?"
         with self.db.get_connection() as conn:
@@ -1,7 +1,13 @@
-from database.repositories.base_repo import BaseRepository
+from database.repositories.base_repo import BaseRepository, SortKey, fts_query, DEFAULT_PAGE_SIZE
 from models.bolt import Bolt
+from utils.text import normalize_text
 
 class BoltRepository(BaseRepository):
+    SORT_KEYS = {
+        "id": SortKey(("id",), descending=True),
+        "name": SortKey(("name", "id")),
+        "quantity": SortKey(("quantity", "id")),
+    }
 
     def get_table_name(self):
         return "bolts"
@@ -9,14 +15,15 @@ class BoltRepository(BaseRepository):
     def create(self, bolt: Bolt) -> int:
         query = """
             INSERT INTO bolts (name, type, metal_strip, screw, rod, plate, 
-                          square_mechanism, stamp, quantity)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                          square_mechanism, stamp, quantity, min_stock_level, name_norm)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         with self.db.get_connection()as conn:
             cursor = conn.cursor()
             cursor.execute(query, (
                 bolt.name, bolt.type, bolt.metal_strip, bolt.screw, bolt.rod,
-                bolt.plate, bolt.square_mechanism, bolt.stamp, bolt.quantity
+                bolt.plate, bolt.square_mechanism, bolt.stamp, bolt.quantity or 0,
+                bolt.min_stock_level or 0, normalize_text(bolt.name)
             ))
             return cursor.lastrowid
         
@@ -25,23 +32,38 @@ class BoltRepository(BaseRepository):
             UPDATE bolts 
             SET name = ?, type = ?, metal_strip = ?, screw = ?, rod = ?,
                 plate = ?, square_mechanism = ?, stamp = ?, quantity = ?,
-                last_updated = datetime('now')
+                min_stock_level = ?, name_norm = ?, last_updated = datetime('now')
             WHERE id = ?
         """
         with self.db.get_connection() as conn :
             cursor = conn.cursor()
             cursor.execute(query, (
             bolt.name, bolt.type, bolt.metal_strip, bolt.screw, bolt.rod,
-            bolt.plate, bolt.square_mechanism, bolt.stamp, bolt.quantity,
-            bolt.id
+            bolt.plate, bolt.square_mechanism, bolt.stamp, bolt.quantity or 0,
+            bolt.min_stock_level or 0, normalize_text(bolt.name), bolt.id
         ))
             return cursor.rowcount > 0
         
     def find_by_name(self, name: str):
-        query = "SELECT * FROM bolts WHERE name LIKE ? ORDER BY name"
+        """Case- and accent-insensitive match on the start of the name or of its words."""
+        return self._find_by_name_norm(name)
+        
+    def search(self, term: str, limit: int = DEFAULT_PAGE_SIZE):
+        """Ranked prefix search over name, type, stamp and components (FTS5)."""
+        match = fts_query(normalize_text(term))
+        if not match:
+            return []
+        query = """
+            SELECT b.*
+            FROM bolts_fts f
+            JOIN bolts b ON b.id = f.rowid
+            WHERE bolts_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
+        """
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (f"%{name}%",))
+            cursor.execute(query, (match, limit))
             return cursor.fetchall()
         
     def adjust_quantity(self, bolt_id: int, adjustment: int):
@@ -54,3 +76,44 @@ class BoltRepository(BaseRepository):
             cursor = conn.cursor()
             cursor.execute(query, (adjustment, bolt_id))
             return cursor.rowcount > 0
+
+    def get_low_stock(self):
+        """Bolts below their minimum stock level (served by idx_bolts_low_stock)."""
+        query = """
+            SELECT * FROM bolts
+            WHERE quantity < min_stock_level
+            ORDER BY quantity
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            return cursor.fetchall()
+
+    def find_by_quantity_range(self, min_quantity: int = None, max_quantity: int = None):
+        """Bolts whose quantity lies within an inclusive range; either bound may be omitted."""
+        conditions, params = [], []
+        if min_quantity is not None:
+            conditions.append("quantity >= ?")
+            params.append(min_quantity)
+        if max_quantity is not None:
+            conditions.append("quantity <= ?")
+            params.append(max_quantity)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT * FROM bolts {where} ORDER BY quantity"
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+    def get_stock_summary(self) -> dict:
+        """Bolt type count, total quantity and low-stock count in one query."""
+        query = """
+            SELECT COUNT(*) AS total_types,
+                   COALESCE(SUM(quantity), 0) AS total_quantity,
+                   (SELECT COUNT(*) FROM bolts WHERE quantity < min_stock_level) AS low_stock
+            FROM bolts
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            return dict(cursor.fetchone())
@@ -1,35 +1,57 @@
-from database.repositories.base_repo import BaseRepository
+from database.repositories.base_repo import BaseRepository, SortKey, fts_query, DEFAULT_PAGE_SIZE
 from models.customer import Customer
+from utils.text import normalize_text
 
 class CustomerRepository(BaseRepository):
+    SORT_KEYS = {
+        "id": SortKey(("id",), descending=True),
+        "name": SortKey(("name", "id")),
+    }
+    
     def get_table_name(self):
         return "customers"
     
     def create(self, customer: Customer) -> int:
         query = """
-            INSERT INTO customers (name, phone)
-            VALUES (?, ?)
+            INSERT INTO customers (name, phone, name_norm)
+            VALUES (?, ?, ?)
         """
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (customer.name, customer.phone))
+            cursor.execute(query, (customer.name, customer.phone, normalize_text(customer.name)))
             return cursor.lastrowid
         
     def update(self, customer: Customer):
         query = """
             UPDATE customers
-            SET name = ?, phone = ?
+            SET name = ?, phone = ?, name_norm = ?
             WHERE id = ?
         """
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (customer.name, customer.phone, customer.id))
+            cursor.execute(query, (customer.name, customer.phone,
+                                   normalize_text(customer.name), customer.id))
             return cursor.rowcount > 0
         
     def find_by_name(self, name: str):
-        query = "SELECT * FROM customers WHERE name LIKE ? ORDER BY name"
+        """Case- and accent-insensitive match on the start of the name or of its words."""
+        return self._find_by_name_norm(name)
+    
+    def search(self, term: str, limit: int = DEFAULT_PAGE_SIZE):
+        """Ranked prefix search over customer name and phone (FTS5)."""
+        match = fts_query(normalize_text(term))
+        if not match:
+            return []
+        query = """
+            SELECT c.*
+            FROM customers_fts f
+            JOIN customers c ON c.id = f.rowid
+            WHERE customers_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
+        """
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (f"%{name}%",))
+            cursor.execute(query, (match, limit))
             return cursor.fetchall()
         
\ No newline at end of file
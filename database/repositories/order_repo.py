@@ -1,14 +1,43 @@
-from database.repositories.base_repo import BaseRepository
+import json
+
+from database.repositories.base_repo import BaseRepository, Page, SortKey, fts_query, DEFAULT_PAGE_SIZE
 from models.order import Order, OrderItem
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable
+from utils.text import normalize_text
 
 
 class OrderRepository(BaseRepository):
     """Repository for order management with full CRUD and search capabilities."""
     
+    # Shared by every listing query. total_items / total_quantity are kept
+    # current by triggers on order_items, so listings need no aggregation.
+    # CROSS JOIN keeps orders as the outer loop, so the ORDER BY on orders
+    # columns is read from its indexes; the planner otherwise may walk
+    # customers first and sort every order in a temp B-tree
+    LISTING_SELECT = """
+        SELECT o.*, c.name as customer_name
+        FROM orders o
+        CROSS JOIN customers c ON o.customer_id = c.id
+    """
+    ID_COLUMN = "o.id"
+    KEY_TABLE = "orders o"
+    
+    # Listings are newest first; the order_date indexes all end in the rowid,
+    # so (order_date, id) pages seek directly within them
+    SORT_KEYS = {
+        "date": SortKey(("o.order_date", "o.id"), descending=True),
+        "id": SortKey(("o.id",), descending=True),
+    }
+    
     def get_table_name(self):
         return "orders"
     
+    def _listing(self, where: str = "", params=(), cursor: Optional[tuple] = None,
+                 page_size: Optional[int] = None, backward: bool = False) -> Page:
+        """Newest-first listing page. page_size=None returns every match."""
+        return self._fetch_page(self.SORT_KEYS["date"], where, params,
+                                cursor=cursor, page_size=page_size, backward=backward)
+    
     # CREATE OPERATIONS 
     
     def create(self, order: Order, items: List[OrderItem]) -> int:
@@ -25,11 +54,11 @@ class OrderRepository(BaseRepository):
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Insert order
+            # Insert order (item counters are maintained by triggers)
             cursor.execute("""
-                INSERT INTO orders (customer_id, status, notes, total_items)
-                VALUES (?, ?, ?, ?)
-            """, (order.customer_id, order.status, order.notes, len(items)))
+                INSERT INTO orders (customer_id, status, notes)
+                VALUES (?, ?, ?)
+            """, (order.customer_id, order.status, order.notes))
             
             order_id = cursor.lastrowid
             
@@ -58,21 +87,10 @@ class OrderRepository(BaseRepository):
     
     #  READ OPERATIONS 
     
-    def get_all_with_summary(self):
-        """Get all orders with customer names and item counts."""
-        query = """
-            SELECT o.*, c.name as customer_name,
-                   COUNT(oi.id) as total_items
-            FROM orders o
-            JOIN customers c ON o.customer_id = c.id
-            LEFT JOIN order_items oi ON o.id = oi.order_id
-            GROUP BY o.id
-            ORDER BY o.order_date DESC
-        """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query)
-            return cursor.fetchall()
+    def get_all_with_summary(self, cursor: Optional[tuple] = None, page_size: Optional[int] = None,
+                             backward: bool = False) -> Page:
+        """Get orders with customer names and item counts."""
+        return self._listing(cursor=cursor, page_size=page_size, backward=backward)
     
     def get_with_details(self, order_id: int) -> Optional[Dict]:
         """
@@ -107,7 +125,7 @@ class OrderRepository(BaseRepository):
                 ORDER BY oi.id
             """, (order_id,))
             
-            order_dict['items'] = [dict(row) for row in cursor.fetchall()]
+            order_dict['items'] = cursor.fetchall()
             
             # Get status history
             cursor.execute("""
@@ -116,10 +134,52 @@ class OrderRepository(BaseRepository):
                 ORDER BY changed_at DESC
             """, (order_id,))
             
-            order_dict['status_history'] = [dict(row) for row in cursor.fetchall()]
+            order_dict['status_history'] = cursor.fetchall()
             
             return order_dict
     
+    def get_items_summaries(self, order_ids: Iterable[int], limit: Optional[int] = 2) -> Dict[int, Dict]:
+        """
+        Get the first few items of many orders in a single query.
+        
+        Args:
+            order_ids: IDs of the orders to summarise (e.g. one listing page)
+            limit: Number of leading items to return per order (None for all)
+            
+        Returns:
+            {order_id: {'items': [rows with bolt_name, quantity],
+                        'remaining': count of items not returned}}
+            Orders without items are omitted.
+        """
+        ids = list(order_ids)
+        if not ids:
+            return {}
+        
+        query = """
+            SELECT order_id, bolt_name, quantity, item_count
+            FROM (
+                SELECT oi.order_id, b.name as bolt_name, oi.quantity,
+                       ROW_NUMBER() OVER (PARTITION BY oi.order_id ORDER BY oi.id) as rn,
+                       COUNT(*) OVER (PARTITION BY oi.order_id) as item_count
+                FROM order_items oi
+                JOIN bolts b ON oi.bolt_id = b.id
+                WHERE oi.order_id IN (SELECT value FROM json_each(?))
+            )
+            WHERE ? IS NULL OR rn <= ?
+            ORDER BY order_id, rn
+        """
+        summaries = {}
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (json.dumps(ids), limit, limit))
+            for row in cursor.fetchall():
+                summary = summaries.get(row['order_id'])
+                if summary is None:
+                    summary = summaries[row['order_id']] = {'items': [], 'remaining': 0}
+                summary['items'].append(row)
+                summary['remaining'] = row['item_count'] - len(summary['items'])
+        return summaries
+    
     # UPDATE OPERATIONS 
     
     def update_status(self, order_id: int, new_status: str, changed_by: str = "System"):
@@ -209,75 +269,79 @@ class OrderRepository(BaseRepository):
     
     #  SEARCH OPERATIONS 
     
-    def search_by_customer_name(self, name: str):
-        """Search orders by customer name (partial match)."""
-        query = """
-            SELECT o.*, c.name as customer_name,
-                   COUNT(oi.id) as total_items
-            FROM orders o
-            JOIN customers c ON o.customer_id = c.id
-            LEFT JOIN order_items oi ON o.id = oi.order_id
-            WHERE c.name LIKE ?
-            GROUP BY o.id
-            ORDER BY o.order_date DESC
-            LIMIT 100
+    def search_by_customer_name(self, name: str, cursor: Optional[tuple] = None, page_size: Optional[int] = None,
+                                backward: bool = False) -> Page:
+        """Search orders by customer name (word-prefix match via FTS5)."""
+        search = self._search_filter(name)
+        if search is None:
+            return Page()
+        return self._listing(*search, cursor, page_size, backward)
+    
+    def _search_filter(self, term: str):
+        """The orders view searches by customer name."""
+        match = fts_query(normalize_text(term), column="name_norm")
+        if not match:
+            return None
+        where = """
+            o.customer_id IN (
+                SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?
+            )
         """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, (f"%{name}%",))
-            return cursor.fetchall()
+        return where, (match,)
     
-    def find_by_customer(self, customer_id: int):
+    def find_by_customer(self, customer_id: int, cursor: Optional[tuple] = None, page_size: Optional[int] = None,
+                         backward: bool = False) -> Page:
         """Find all orders for a specific customer."""
-        query = """
-            SELECT o.*, c.name as customer_name,
-                   COUNT(oi.id) as total_items
-            FROM orders o
-            JOIN customers c ON o.customer_id = c.id
-            LEFT JOIN order_items oi ON o.id = oi.order_id
-            WHERE o.customer_id = ?
-            GROUP BY o.id
-            ORDER BY o.order_date DESC
-        """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, (customer_id,))
-            return cursor.fetchall()
+        return self._listing("o.customer_id = ?", (customer_id,), cursor, page_size, backward)
     
-    def find_by_status(self, status: str):
+    def find_by_status(self, status: str, cursor: Optional[tuple] = None, page_size: Optional[int] = None,
+                       backward: bool = False) -> Page:
         """Find orders by status."""
-        query = """
-            SELECT o.*, c.name as customer_name,
-                   COUNT(oi.id) as total_items
-            FROM orders o
-            JOIN customers c ON o.customer_id = c.id
-            LEFT JOIN order_items oi ON o.id = oi.order_id
-            WHERE o.status = ?
-            GROUP BY o.id
-            ORDER BY o.order_date DESC
-            LIMIT 100
+        return self._listing("o.status = ?", (status,), cursor, page_size, backward)
+    
+    def count_by_status(self, status: str) -> int:
+        """Number of orders find_by_status() returns, counted on the status index."""
+        return self._count("o.status = ?", (status,))
+    
+    def search_by_bolt_name(self, bolt_name: str, cursor: Optional[tuple] = None, page_size: Optional[int] = None,
+                            backward: bool = False) -> Page:
+        """Search orders containing a specific bolt (word-prefix match via FTS5)."""
+        match = fts_query(normalize_text(bolt_name), column="name_norm")
+        if not match:
+            return Page()
+        where = """
+            o.id IN (
+                SELECT oi.order_id
+                FROM order_items oi
+                WHERE oi.bolt_id IN (
+                    SELECT rowid FROM bolts_fts WHERE bolts_fts MATCH ?
+                )
+            )
         """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, (status,))
-            return cursor.fetchall()
+        return self._listing(where, (match,), cursor, page_size, backward)
     
-    def search_by_bolt_name(self, bolt_name: str):
-        """Search orders containing a specific bolt (partial match)."""
+    def search_notes(self, term: str, limit: int = DEFAULT_PAGE_SIZE):
+        """
+        Ranked prefix search over order notes (FTS5).
+        
+        Ordered by relevance, which has no stable seek key, so this one is
+        bounded by limit rather than paged.
+        """
+        match = fts_query(term)
+        if not match:
+            return []
         query = """
-            SELECT DISTINCT o.*, c.name as customer_name,
-                   (SELECT COUNT(*) FROM order_items WHERE order_id = o.id) as total_items
-            FROM orders o
+            SELECT o.*, c.name as customer_name
+            FROM orders_fts f
+            JOIN orders o ON o.id = f.rowid
             JOIN customers c ON o.customer_id = c.id
-            JOIN order_items oi ON o.id = oi.order_id
-            JOIN bolts b ON oi.bolt_id = b.id
-            WHERE b.name LIKE ?
-            ORDER BY o.order_date DESC
-            LIMIT 100
+            WHERE orders_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
         """
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (f"%{bolt_name}%",))
+            cursor.execute(query, (match, limit))
             return cursor.fetchall()
     
     # STATISTICS & REPORTING 
@@ -310,7 +374,7 @@ class OrderRepository(BaseRepository):
             
             # Total items ordered
             cursor.execute("""
-                SELECT SUM(quantity) as total FROM order_items
+                SELECT SUM(total_quantity) as total FROM orders
             """)
             result = cursor.fetchone()
             stats['total_items_ordered'] = result['total'] if result['total'] else 0
@@ -354,37 +418,13 @@ class OrderRepository(BaseRepository):
     
     def get_recent_orders(self, limit: int = 10):
         """Get most recent orders."""
-        query = """
-            SELECT o.*, c.name as customer_name,
-                   COUNT(oi.id) as total_items
-            FROM orders o
-            JOIN customers c ON o.customer_id = c.id
-            LEFT JOIN order_items oi ON o.id = oi.order_id
-            GROUP BY o.id
-            ORDER BY o.order_date DESC
-            LIMIT ?
-        """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, (limit,))
-            return cursor.fetchall()
+        return self._listing(page_size=limit).rows
     
-    def get_orders_by_date_range(self, start_date: str, end_date: str):
+    def get_orders_by_date_range(self, start_date: str, end_date: str, cursor: Optional[tuple] = None, page_size: Optional[int] = None,
+                                 backward: bool = False) -> Page:
         """Get orders within a date range."""
-        query = """
-            SELECT o.*, c.name as customer_name,
-                   COUNT(oi.id) as total_items
-            FROM orders o
-            JOIN customers c ON o.customer_id = c.id
-            LEFT JOIN order_items oi ON o.id = oi.order_id
-            WHERE o.order_date BETWEEN ? AND ?
-            GROUP BY o.id
-            ORDER BY o.order_date DESC
-        """
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, (start_date, end_date))
-            return cursor.fetchall()
+        return self._listing("o.order_date BETWEEN ? AND ?", (start_date, end_date),
+                             cursor, page_size, backward)
     
     # VALIDATION & HELPERS 
     
@@ -0,0 +1,185 @@
+# database/restore.py
+import logging
+import lzma
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Optional
+
+from config.settings import DB_FILE, BACKUP_PAGES_PER_STEP
+from database.backup import COMPRESSORS, BackupError, copy_database, open_backup
+from database.connection import ConnectionPool
+from database.migrations import latest_version, migrate
+from database import schema  # noqa: F401  (importing it registers the migrations)
+from database.snapshots import SnapshotStore
+
+logger = logging.getLogger("PowerLock.database")
+
+COMPRESSED_SUFFIXES = {suffix for suffix, _ in COMPRESSORS.values()}
+
+# A backup missing any of these is not a Power Lock database
+REQUIRED_TABLES = {"customers", "bolts", "orders", "order_items"}
+
+
+class RestoreError(BackupError):
+    """Raised when a backup is unusable; the live database is left untouched."""
+
+
+def _staging_file(target: Path) -> Path:
+    # Next to the target, so the staging copy is on the same disk
+    fd, path = tempfile.mkstemp(prefix=".restore_", suffix=".db", dir=target.parent)
+    os.close(fd)
+    return Path(path)
+
+
+def validate_backup(path) -> int:
+    """
+    Check that path holds an intact database this application can open.
+
+    Returns:
+        Its schema version
+    """
+    try:
+        conn = sqlite3.connect(f"file:{Path(path).as_posix()}?mode=ro", uri=True)
+    except sqlite3.Error as e:
+        raise RestoreError(f"Cannot open backup: {e}")
+    try:
+        result = [row[0] for row in conn.execute("PRAGMA integrity_check").fetchall()]
+        if result != ["ok"]:
+            raise RestoreError(f"Backup failed integrity check: {'; '.join(result[:5])}")
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        missing = REQUIRED_TABLES - tables
+        if missing:
+            raise RestoreError(f"Not a Power Lock database (missing {', '.join(sorted(missing))})")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        raise RestoreError(f"Not a valid database: {e}")
+    finally:
+        conn.close()
+
+    if version > latest_version():
+        raise RestoreError(
+            f"Backup schema version {version} is newer than this application "
+            f"supports ({latest_version()}). Please update the application."
+        )
+    return version
+
+
+def _prepare(staging: Path, page_size: int):
+    """Migrate the staging copy and match the live page size, outside the live database."""
+    conn = sqlite3.connect(staging)
+    try:
+        # A WAL database cannot change its page size, and the staging copy
+        # is read as one file below
+        conn.execute("PRAGMA journal_mode = DELETE")
+        if conn.execute("PRAGMA page_size").fetchone()[0] != page_size:
+            conn.execute(f"PRAGMA page_size = {page_size}")
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    # Same connection setup as the app, so migrations see normalize_text()
+    pool = ConnectionPool(staging, max_size=1, pragmas={"busy_timeout": 5000})
+    conn = pool.acquire()
+    try:
+        return migrate(conn)
+    finally:
+        pool.release(conn)
+        pool.close_all()
+
+
+def load_database(staging, target=DB_FILE, pages: int = BACKUP_PAGES_PER_STEP,
+                  progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Replace the contents of the live target database with staging.
+
+    Validates and migrates staging first, then copies it in with the backup
+    API on one write transaction: other connections see either the old or
+    the new database, never a mix, and keep their file handles. Connections
+    of this process still need db.reset() to drop cached state.
+
+    Returns:
+        The schema version of the restored database
+    """
+    staging, target = Path(staging), Path(target)
+    validate_backup(staging)
+
+    dst = sqlite3.connect(target)
+    try:
+        dst.execute("PRAGMA busy_timeout = 30000")
+        page_size = dst.execute("PRAGMA page_size").fetchone()[0]
+        version = _prepare(staging, page_size)
+
+        src = sqlite3.connect(staging)
+        try:
+            src.backup(dst, pages=pages,
+                       progress=lambda status, remaining, total:
+                           progress(total - remaining, total) if progress else None)
+        finally:
+            src.close()
+        # Fold the restored pages into the main file so the WAL does not linger at full size
+        dst.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        dst.close()
+    return version
+
+
+def restore_database(backup, target=DB_FILE, progress=None) -> int:
+    """
+    Restore a backup file (plain, .gz or .xz) into the live database.
+
+    Returns:
+        The schema version after restoring
+    """
+    if not Path(backup).is_file():
+        raise RestoreError(f"Backup not found: {backup}")
+    target = Path(target)
+    staging = _staging_file(target)
+    started = time.perf_counter()
+    try:
+        if Path(backup).suffix in COMPRESSED_SUFFIXES:
+            try:
+                with open_backup(backup) as src, open(staging, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1 << 20)
+            except (OSError, EOFError, lzma.LZMAError, zlib.error) as e:
+                raise RestoreError(f"Cannot read backup: {e}")
+        else:
+            # Through SQLite rather than a file copy: a database still in use
+            # may hold recent commits in its -wal file
+            conn = sqlite3.connect(staging)
+            try:
+                copy_database(backup, conn, pause=0)
+            except sqlite3.DatabaseError as e:
+                raise RestoreError(f"Not a valid database: {e}")
+            finally:
+                conn.close()
+        version = load_database(staging, target, progress=progress)
+    finally:
+        staging.unlink(missing_ok=True)
+    logger.info(f"Database restored from {backup} in {time.perf_counter() - started:.1f}s")
+    return version
+
+
+def restore_snapshot(snapshot_id: str, store: Optional[SnapshotStore] = None,
+                     target=DB_FILE, progress=None) -> int:
+    """
+    Restore an incremental snapshot into the live database.
+
+    Returns:
+        The schema version after restoring
+    """
+    store = store or SnapshotStore()
+    target = Path(target)
+    staging = _staging_file(target)
+    started = time.perf_counter()
+    try:
+        store.restore(snapshot_id, staging)
+        version = load_database(staging, target, progress=progress)
+    finally:
+        staging.unlink(missing_ok=True)
+    logger.info(f"Database restored from snapshot {snapshot_id} in {time.perf_counter() - started:.1f}s")
+    return version
@@ -0,0 +1,71 @@
+# database/rows.py
+from collections.abc import Mapping
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def _column_index(names: tuple) -> dict:
+    """Map column name -> position. Later duplicates win, like dict_factory."""
+    return {name: idx for idx, name in enumerate(names)}
+
+
+class Row(Mapping):
+    """Read-only mapping over a result tuple.
+
+    Rows produced by the same statement share one column index, so a row
+    costs a tuple plus two references instead of a fresh dict.
+    """
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index: dict, values: tuple):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._index[key]]
+        except KeyError:
+            # Positional access, as with tuples and sqlite3.Row
+            if isinstance(key, int):
+                return self._values[key]
+            raise
+
+    def get(self, key, default=None):
+        idx = self._index.get(key)
+        return default if idx is None else self._values[idx]
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        return self._index.keys()
+
+    def __repr__(self):
+        return f"Row({dict(self)!r})"
+
+
+class RowFactory:
+    """sqlite3 row factory that resolves column names once per statement.
+
+    Install one instance per connection; it is not shared across threads.
+    """
+
+    __slots__ = ("_description", "_index")
+
+    def __init__(self):
+        self._description = None
+        self._index = None
+
+    def __call__(self, cursor, values):
+        description = cursor.description
+        if description is not self._description:
+            self._description = description
+            self._index = _column_index(tuple(col[0] for col in description))
+        return Row(self._index, values)
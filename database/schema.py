@@ -1,78 +1,309 @@
+import sqlite3
+
 from database.connection import db
+from database.migrations import migration, migrate
+from utils.text import normalize_text
 
-def initialize_database():
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-
-        #customers table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                phone TEXT
-            )
-        ''')
-
-        # bolts table 
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS bolts(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                metal_strip TEXT,
-                rod TEXT,
-                screw TEXT,
-                plate TEXT,
-                square_mechanism TEXT,
-                stamp TEXT,
-                quantity TEXT,
-                Last_updated TEXT DEFAULT (datetime('now'))
-            )
-        ''')
-
-        #orders table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                customer_id INTEGER NOT NULL,
-                order_date TEXT NOT NULL DEFAULT (datetime('now')),
-                status TEXT NOT NULL DEFAULT 'pending',
-                notes TEXT,
-                total_items INTEGER DEFAULT 0,
-                last_updated TEXT NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY (customer_id) REFERENCES customers(id) ON DELETE RESTRICT
-            )
-        ''')
-
-        # Order items table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS order_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_id INTEGER NOT NULL,
-                bolt_id INTEGER NOT NULL,
-                quantity INTEGER NOT NULL CHECK (quantity > 0),
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
-                FOREIGN KEY (bolt_id) REFERENCES bolts(id) ON DELETE RESTRICT
-            )
-        ''')
-        
-        # Order status history
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS order_status_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_id INTEGER NOT NULL,
-                old_status TEXT,
-                new_status TEXT NOT NULL,
-                changed_at TEXT NOT NULL DEFAULT (datetime('now')),
-                changed_by TEXT,
-                FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Indexes
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_order_items_bolt ON order_items(bolt_id)')
+# Schema history. Each migration runs exactly once per database, in order,
+# and PRAGMA user_version records the last one applied. Never edit a
+# migration that has shipped; add a new one instead.
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+@migration(1, "Initial schema")
+def _initial_schema(conn):
+    # IF NOT EXISTS: databases created before migrations already have these tables
+    #customers table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT
+        )
+    ''')
+
+    # bolts table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS bolts(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            metal_strip TEXT,
+            rod TEXT,
+            screw TEXT,
+            plate TEXT,
+            square_mechanism TEXT,
+            stamp TEXT,
+            quantity TEXT,
+            Last_updated TEXT DEFAULT (datetime('now'))
+        )
+    ''')
+    # Early databases were created before the rod column existed
+    if "rod" not in _columns(conn, "bolts"):
+        conn.execute("ALTER TABLE bolts ADD COLUMN rod TEXT")
+
+    #orders table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_id INTEGER NOT NULL,
+            order_date TEXT NOT NULL DEFAULT (datetime('now')),
+            status TEXT NOT NULL DEFAULT 'pending',
+            notes TEXT,
+            total_items INTEGER DEFAULT 0,
+            last_updated TEXT NOT NULL DEFAULT (datetime('now')),
+            FOREIGN KEY (customer_id) REFERENCES customers(id) ON DELETE RESTRICT
+        )
+    ''')
+
+    # Order items table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            bolt_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL CHECK (quantity > 0),
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
+            FOREIGN KEY (bolt_id) REFERENCES bolts(id) ON DELETE RESTRICT
+        )
+    ''')
+
+    # Order status history
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS order_status_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            old_status TEXT,
+            new_status TEXT NOT NULL,
+            changed_at TEXT NOT NULL DEFAULT (datetime('now')),
+            changed_by TEXT,
+            FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Indexes
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_order_items_bolt ON order_items(bolt_id)')
+
+
+@migration(2, "Rebuild bolts with INTEGER quantity and stock indexes")
+def _bolts_integer_quantity(conn):
+    # STRICT makes SQLite reject non-integer quantities instead of storing text
+    strict = " STRICT" if sqlite3.sqlite_version_info >= (3, 37, 0) else ""
+    conn.execute(f'''
+        CREATE TABLE bolts_new(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            metal_strip TEXT,
+            rod TEXT,
+            screw TEXT,
+            plate TEXT,
+            square_mechanism TEXT,
+            stamp TEXT,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            min_stock_level INTEGER NOT NULL DEFAULT 0,
+            last_updated TEXT DEFAULT (datetime('now'))
+        ){strict}
+    ''')
+
+    # Quantities were free text: trim, parse the leading integer, clamp at zero
+    conn.execute('''
+        INSERT INTO bolts_new (id, name, type, metal_strip, rod, screw, plate,
+                               square_mechanism, stamp, quantity, last_updated)
+        SELECT id, name, type, metal_strip, rod, screw, plate, square_mechanism, stamp,
+               MAX(CAST(TRIM(COALESCE(quantity, '')) AS INTEGER), 0),
+               COALESCE(last_updated, datetime('now'))
+        FROM bolts
+    ''')
+
+    # Keep AUTOINCREMENT from reusing ids of bolts deleted before the rebuild
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'bolts'").fetchone()
+    if row is not None:
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'bolts_new'")
+        conn.execute(
+            "INSERT INTO sqlite_sequence (name, seq) "
+            "SELECT 'bolts_new', MAX(?, COALESCE((SELECT MAX(id) FROM bolts_new), 0))",
+            (row[0],)
+        )
+
+    conn.execute("DROP TABLE bolts")
+    conn.execute("ALTER TABLE bolts_new RENAME TO bolts")
+
+    conn.execute('CREATE INDEX idx_bolts_quantity ON bolts(quantity)')
+    # Partial index: only bolts below their threshold, so low-stock lookups stay tiny
+    conn.execute('''
+        CREATE INDEX idx_bolts_low_stock ON bolts(quantity, min_stock_level)
+        WHERE quantity < min_stock_level
+    ''')
+
+
+@migration(3, "Trigger-maintained order item counters")
+def _order_counters(conn):
+    conn.execute("ALTER TABLE orders ADD COLUMN total_quantity INTEGER NOT NULL DEFAULT 0")
+
+    # Backfill: total_items is the number of lines, total_quantity the units ordered
+    conn.execute('''
+        UPDATE orders SET
+            total_items = (SELECT COUNT(*) FROM order_items WHERE order_id = orders.id),
+            total_quantity = (SELECT COALESCE(SUM(quantity), 0) FROM order_items WHERE order_id = orders.id)
+    ''')
+
+    conn.execute('''
+        CREATE TRIGGER trg_order_items_insert AFTER INSERT ON order_items
+        BEGIN
+            UPDATE orders
+            SET total_items = total_items + 1,
+                total_quantity = total_quantity + NEW.quantity
+            WHERE id = NEW.order_id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER trg_order_items_delete AFTER DELETE ON order_items
+        BEGIN
+            UPDATE orders
+            SET total_items = total_items - 1,
+                total_quantity = total_quantity - OLD.quantity
+            WHERE id = OLD.order_id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER trg_order_items_update AFTER UPDATE OF order_id, quantity ON order_items
+        BEGIN
+            UPDATE orders
+            SET total_items = total_items - 1,
+                total_quantity = total_quantity - OLD.quantity
+            WHERE id = OLD.order_id;
+            UPDATE orders
+            SET total_items = total_items + 1,
+                total_quantity = total_quantity + NEW.quantity
+            WHERE id = NEW.order_id;
+        END
+    ''')
 
+    # Listings sort by date newest first; the composite indexes also serve
+    # the customer/status filters, so the single-column ones are redundant
+    conn.execute('CREATE INDEX idx_orders_order_date ON orders(order_date)')
+    conn.execute('CREATE INDEX idx_orders_customer_date ON orders(customer_id, order_date)')
+    conn.execute('CREATE INDEX idx_orders_status_date ON orders(status, order_date)')
+    conn.execute('DROP INDEX IF EXISTS idx_orders_customer')
+    conn.execute('DROP INDEX IF EXISTS idx_orders_status')
+
+
+def _create_fts_index(conn, table, columns, watch_columns=None):
+    """
+    Create an external-content FTS5 index over table(columns) plus the
+    triggers that keep it in sync. Updates only reindex when one of the
+    indexed columns changes.
+    """
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+    watch = ", ".join(watch_columns or columns)
+
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE {fts} USING fts5(
+            {cols},
+            content='{table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER trg_{fts}_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER trg_{fts}_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER trg_{fts}_update AFTER UPDATE OF {watch} ON {table}
+        BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    ''')
+    conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+@migration(4, "Full-text search indexes for customers, bolts and order notes")
+def _full_text_search(conn):
+    _create_fts_index(conn, "customers", ["name", "phone"])
+    _create_fts_index(conn, "bolts", ["name", "type", "stamp", "metal_strip", "rod",
+                                      "screw", "plate", "square_mechanism"])
+    _create_fts_index(conn, "orders", ["notes"])
+
+
+@migration(5, "Normalized name columns for accent-insensitive search")
+def _normalized_names(conn):
+    # Registered on pooled connections already; repeated here so the
+    # migration also works on a bare connection
+    conn.create_function("normalize_text", 1, normalize_text, deterministic=True)
+
+    for table in ("customers", "bolts"):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN name_norm TEXT NOT NULL DEFAULT ''")
+        conn.execute(f"UPDATE {table} SET name_norm = normalize_text(name)")
+        conn.execute(f"CREATE INDEX idx_{table}_name_norm ON {table}(name_norm)")
+
+        # Full-text indexes switch from name to name_norm so Greek accents fold too
+        conn.execute(f"DROP TABLE {table}_fts")
+        for action in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER trg_{table}_fts_{action}")
+
+    _create_fts_index(conn, "customers", ["name_norm", "phone"])
+    _create_fts_index(conn, "bolts", ["name_norm", "type", "stamp", "metal_strip", "rod",
+                                      "screw", "plate", "square_mechanism"])
+
+
+@migration(6, "Name indexes for keyset-paginated listings")
+def _listing_indexes(conn):
+    # (name, rowid) order lets name-sorted pages seek instead of sort
+    conn.execute('CREATE INDEX idx_customers_name ON customers(name)')
+    conn.execute('CREATE INDEX idx_bolts_name ON bolts(name)')
+
+
+# Tables whose modifications are counted in table_versions
+TRACKED_TABLES = ("customers", "bolts", "orders", "order_items", "order_status_history")
+
+
+@migration(7, "Per-table modification counters")
+def _table_versions(conn):
+    # Bumped by triggers, so writes from any connection or process are counted
+    conn.execute('''
+        CREATE TABLE table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    for table in TRACKED_TABLES:
+        conn.execute("INSERT INTO table_versions (name) VALUES (?)", (table,))
+        for action in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f'''
+                CREATE TRIGGER trg_{table}_version_{action.lower()} AFTER {action} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                END
+            ''')
+
+
+@migration(8, "Index status history by order")
+def _status_history_index(conn):
+    # Order details read it newest first, and deleting an order cascades into it
+    conn.execute('CREATE INDEX idx_order_status_history_order ON order_status_history(order_id, changed_at)')
+
+
+def initialize_database() -> int:
+    """Apply pending migrations. Returns the resulting schema version."""
+    with db.get_connection() as conn:
+        return migrate(conn)
@@ -0,0 +1,307 @@
+# database/snapshots.py
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import (
+    DB_FILE, SNAPSHOT_DIR, SNAPSHOT_INTERVAL_MIN, SNAPSHOT_RETENTION,
+    SNAPSHOT_CHUNK_PAGES, SNAPSHOT_MEMORY_LIMIT
+)
+from database.backup import BackupError, copy_database
+
+logger = logging.getLogger("PowerLock.database")
+
+ID_FORMAT = "%Y%m%dT%H%M%S_%f"
+
+# Retention tier -> function mapping a snapshot time to its bucket
+_BUCKETS = {
+    "hourly": lambda t: t.strftime("%Y%m%d%H"),
+    "daily": lambda t: t.strftime("%Y%m%d"),
+    "weekly": lambda t: "%d-%02d" % t.isocalendar()[:2],
+}
+
+
+class SnapshotStore:
+    """
+    Incremental, deduplicated database snapshots.
+
+    Each snapshot cuts a consistent copy of the database into runs of
+    chunk_pages pages and stores every run under its SHA-256, compressed.
+    A run already stored by an earlier snapshot is not written to the store
+    again, so the store grows with the amount of changed pages rather than
+    the database size. A snapshot itself is a small JSON manifest listing
+    its chunks in page order; restoring one concatenates them.
+
+    Taking a snapshot is still a full copy: the whole database is read
+    through the backup API and, above SNAPSHOT_MEMORY_LIMIT, written to a
+    temp file and read back for hashing. That is roughly three times the
+    database size in I/O per snapshot, whatever changed; only a snapshot
+    with no changes at all (see take()) is free.
+
+    Layout under root:
+        chunks/ab/abcdef...   zlib-compressed page runs
+        manifests/<id>.json   one per snapshot, id = local time YYYYmmddTHHMMSS_micros
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR, source=DB_FILE, chunk_pages: int = SNAPSHOT_CHUNK_PAGES):
+        self.root = Path(root)
+        self.source = source
+        self.chunk_pages = chunk_pages
+        self.chunk_dir = self.root / "chunks"
+        self.manifest_dir = self.root / "manifests"
+        # One snapshot, prune or restore at a time
+        self._lock = threading.Lock()
+
+    # ---- reading ----
+
+    def list(self) -> List[str]:
+        """Snapshot ids, oldest first."""
+        if not self.manifest_dir.exists():
+            return []
+        return sorted(path.stem for path in self.manifest_dir.glob("*.json"))
+
+    def manifest(self, snapshot_id: str) -> dict:
+        with open(self.manifest_dir / f"{snapshot_id}.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    def find(self, at: Optional[datetime] = None) -> Optional[str]:
+        """The newest snapshot taken at or before at (default: now)."""
+        limit = (at or datetime.now()).strftime(ID_FORMAT)
+        candidates = [snapshot_id for snapshot_id in self.list() if snapshot_id <= limit]
+        return candidates[-1] if candidates else None
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunk_dir / digest[:2] / digest
+
+    def _state(self) -> dict:
+        """What the source looks like now, to tell whether a snapshot is due."""
+        conn = sqlite3.connect(self.source)
+        try:
+            state = {"schema_version": conn.execute("PRAGMA schema_version").fetchone()[0],
+                     "user_version": conn.execute("PRAGMA user_version").fetchone()[0]}
+            try:
+                state["table_versions"] = dict(conn.execute("SELECT name, version FROM table_versions"))
+            except sqlite3.OperationalError:
+                state["table_versions"] = None
+            return state
+        finally:
+            conn.close()
+
+    # ---- writing ----
+
+    def take(self, force: bool = False, cancel=None) -> Optional[str]:
+        """
+        Store a snapshot of the source.
+
+        Unless force is set, nothing is read or written when the tracked
+        tables and the schema are unchanged since the latest snapshot.
+
+        Returns:
+            The new snapshot id, or None if it was skipped
+        """
+        with self._lock:
+            state = self._state()
+            snapshots = self.list()
+            if (not force and snapshots and state["table_versions"] is not None
+                    and self.manifest(snapshots[-1]).get("state") == state):
+                logger.debug("Snapshot skipped: no changes")
+                return None
+
+            started = time.perf_counter()
+            chunks, written, page_count, page_size = self._store_chunks(cancel)
+
+            snapshot_id = datetime.now().strftime(ID_FORMAT)
+            manifest = {
+                "id": snapshot_id,
+                "page_size": page_size,
+                "page_count": page_count,
+                "chunk_pages": self.chunk_pages,
+                "chunks": chunks,
+                "state": state,
+            }
+            self._write_atomic(self.manifest_dir / f"{snapshot_id}.json",
+                               json.dumps(manifest).encode("utf-8"))
+            logger.info(f"Snapshot {snapshot_id}: {page_count * page_size:,} bytes, "
+                        f"{written:,} new bytes in {time.perf_counter() - started:.1f}s")
+            return snapshot_id
+
+    def _store_chunks(self, cancel) -> tuple:
+        """Copy the source and store its page runs; returns (digests, bytes written, pages, page size)."""
+        conn = sqlite3.connect(self.source)
+        try:
+            size = (conn.execute("PRAGMA page_count").fetchone()[0]
+                    * conn.execute("PRAGMA page_size").fetchone()[0])
+        finally:
+            conn.close()
+
+        # Only small databases are copied in memory, where serialize()
+        # briefly holds a second copy; others go to a full-size temp file
+        # that is hashed one run at a time, trading I/O for memory
+        spill = None
+        if size > SNAPSHOT_MEMORY_LIMIT:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, spill = tempfile.mkstemp(suffix=".db", dir=self.root)
+            os.close(fd)
+        copy = sqlite3.connect(spill or ":memory:")
+        try:
+            page_count, page_size = copy_database(self.source, copy, cancel=cancel)
+            if spill is None:
+                stream = io.BytesIO(copy.serialize())
+            copy.close()
+            if spill is not None:
+                stream = open(spill, "rb")
+
+            chunks, written = [], 0
+            with stream:
+                for block in iter(lambda: stream.read(page_size * self.chunk_pages), b""):
+                    digest = hashlib.sha256(block).hexdigest()
+                    path = self._chunk_path(digest)
+                    if not path.exists():
+                        compressed = zlib.compress(block, 1)
+                        self._write_atomic(path, compressed)
+                        written += len(compressed)
+                    chunks.append(digest)
+            return chunks, written, page_count, page_size
+        finally:
+            copy.close()
+            if spill is not None:
+                os.unlink(spill)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part = path.with_name(path.name + ".part")
+        with open(part, "wb") as f:
+            f.write(data)
+        os.replace(part, path)
+
+    # ---- retention ----
+
+    def prune(self, retention: Dict[str, int] = SNAPSHOT_RETENTION) -> int:
+        """
+        Drop snapshots no retention tier keeps, then chunks nothing refers to.
+
+        Each tier keeps the newest snapshot of each of its most recent
+        buckets, e.g. {"hourly": 24} keeps one per hour for the last 24
+        hours that have snapshots. The newest snapshot is always kept.
+
+        Returns:
+            Number of snapshots removed
+        """
+        with self._lock:
+            snapshots = self.list()
+            if not snapshots:
+                return 0
+            keep = {snapshots[-1]}
+            for tier, count in retention.items():
+                bucket_of = _BUCKETS[tier]
+                newest = {}
+                for snapshot_id in snapshots:
+                    newest[bucket_of(datetime.strptime(snapshot_id, ID_FORMAT))] = snapshot_id
+                keep.update(newest[bucket] for bucket in sorted(newest)[-count:] if count > 0)
+
+            removed = [snapshot_id for snapshot_id in snapshots if snapshot_id not in keep]
+            for snapshot_id in removed:
+                (self.manifest_dir / f"{snapshot_id}.json").unlink()
+
+            if removed:
+                referenced = set()
+                for snapshot_id in keep:
+                    referenced.update(self.manifest(snapshot_id)["chunks"])
+                for path in self.chunk_dir.glob("*/*"):
+                    if path.name not in referenced:
+                        path.unlink()
+                logger.info(f"Pruned {len(removed)} snapshot(s)")
+            return len(removed)
+
+    # ---- restoring ----
+
+    def restore(self, snapshot_id: str, destination) -> Path:
+        """
+        Rebuild the database file of a snapshot at destination.
+
+        Chunks are checked against their hashes and the result with
+        PRAGMA quick_check before destination is replaced.
+        """
+        with self._lock:
+            manifest = self.manifest(snapshot_id)
+            destination = Path(destination)
+            part = destination.with_name(destination.name + ".part")
+            try:
+                with open(part, "wb") as f:
+                    for digest in manifest["chunks"]:
+                        block = zlib.decompress(self._chunk_path(digest).read_bytes())
+                        if hashlib.sha256(block).hexdigest() != digest:
+                            raise BackupError(f"Snapshot {snapshot_id}: chunk {digest[:12]} is corrupt")
+                        f.write(block)
+                conn = sqlite3.connect(part)
+                try:
+                    result = conn.execute("PRAGMA quick_check").fetchone()[0]
+                finally:
+                    conn.close()
+                if result != "ok":
+                    raise BackupError(f"Snapshot {snapshot_id} failed verification: {result}")
+                os.replace(part, destination)
+            except BaseException:
+                part.unlink(missing_ok=True)
+                raise
+            logger.info(f"Snapshot {snapshot_id} restored to {destination}")
+            return destination
+
+
+class BackupScheduler:
+    """
+    Takes a snapshot every interval on a daemon thread, then prunes.
+
+    Snapshots of an unchanged database are skipped, so an idle app does no
+    backup I/O at all.
+    """
+
+    def __init__(self, store: Optional[SnapshotStore] = None,
+                 interval_min: float = SNAPSHOT_INTERVAL_MIN):
+        self.store = store or SnapshotStore()
+        self.interval = interval_min * 60
+        self.last_error: Optional[Exception] = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshots", daemon=True)
+        self._thread.start()
+
+    def run_once(self) -> Optional[str]:
+        snapshot_id = self.store.take(cancel=self._stop.is_set)
+        if snapshot_id is not None:
+            self.store.prune()
+        return snapshot_id
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                self.last_error = e
+                logger.error(f"Scheduled snapshot failed: {e}")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the thread, aborting a snapshot in progress."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -13,9 +13,11 @@ class Bolt:
     square_mechanism: Optional[str] = None
     stamp: str = ""
     quantity: int = 0
+    min_stock_level: int = 0
+    name_norm: str = ""
     last_updated: Optional[str] = None
     
     @classmethod
     def from_db_row(cls, row):
         """Create Bolt from database row."""
-        return cls(**dict(row)) if row else None
\ No newline at end of file
+        return cls(**row) if row else None
\ No newline at end of file
@@ -6,7 +6,8 @@ class Customer:
     id: Optional[int] = None
     name: str = ""
     phone: str = ""
+    name_norm: str = ""
 
     @classmethod
     def from_db_row(cls, row):
-        return cls(**dict(row)) if row else None
\ No newline at end of file
+        return cls(**row) if row else None
\ No newline at end of file
@@ -18,6 +18,7 @@ class Order:
     status: str = "pending"
     notes: Optional[str] = None
     total_items: int = 0
+    total_quantity: int = 0
     last_updated: Optional[str] = None
     items: List[OrderItem] = field(default_factory=list)
     status_history: List[Dict] = field(default_factory=list)
@@ -25,4 +26,4 @@ class Order:
     @classmethod
     def from_db_row(cls, row):
         """Create Order from database row."""
-        return cls(**dict(row)) if row else None
\ No newline at end of file
+        return cls(**row) if row else None
\ No newline at end of file
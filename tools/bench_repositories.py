@@ -0,0 +1,366 @@
+"""
+Benchmark every public repository method on generated databases.
+
+Sizes count orders; customers and bolts scale with them and each order
+has about four items (tools.generate_data). Generated databases are kept
+under --data-dir and copied before each run, so write methods always
+start from the same rows. Each scenario is timed repeatedly with the SQL
+profiler off. One more call, with the profiler and tracemalloc on,
+records the statements it issued and its peak Python allocation.
+
+Results are written as JSON. With --baseline, every scenario is compared
+with a stored run, and the exit status is 1 if one regressed past the
+thresholds. It is also 1 if a public repository method has no scenario
+below (unless --only narrows the run), so the suite keeps covering every
+method. Needs no display: nothing from ui/ is imported.
+
+Usage (from the project root):
+    python -m tools.bench_repositories --sizes 1k 100k --output results.json
+    python -m tools.bench_repositories --sizes 1k --save-baseline baseline.json
+    python -m tools.bench_repositories --baseline baseline.json --time-threshold 0.5
+"""
+import argparse
+import gc
+import itertools
+import json
+import math
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from database.connection import db, get_pragma_profile
+from database.profiler import profiler
+from database.repositories.bolt_repo import BoltRepository
+from database.repositories.customer_repo import CustomerRepository
+from database.repositories.order_repo import OrderRepository
+from models.bolt import Bolt
+from models.customer import Customer
+from models.order import Order, OrderItem
+from tools.check_query_plans import repository_methods
+from tools.generate_data import generate_database
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+DEFAULT_SIZES = ("1k", "100k", "1M")
+DATA_DIR = Path(tempfile.gettempdir()) / "powerlock_bench"
+
+MIN_SAMPLES = 3
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One timed call. setup, if given, runs untimed and returns call's arguments."""
+    name: str
+    call: Callable
+    setup: Optional[Callable] = None
+
+
+def dimensions(orders: int) -> tuple:
+    """(customers, bolts, orders) of a size."""
+    return max(100, orders // 10), max(50, orders // 50), orders
+
+
+def _drain(iterable) -> int:
+    return sum(1 for _ in iterable)
+
+
+def build_scenarios(customer_count: int, bolt_count: int, order_count: int) -> List[Scenario]:
+    """Scenarios for every public repository method; reads first, then writes."""
+    customers, bolts, orders = CustomerRepository(), BoltRepository(), OrderRepository()
+    scenarios = []
+
+    def add(repo, method, *args, label=None, setup=None, **kwargs):
+        name = f"{type(repo).__name__}.{method}" + (f"[{label}]" if label else "")
+        function = getattr(repo, method)
+        scenarios.append(Scenario(name, lambda *extra: function(*extra, *args, **kwargs), setup))
+
+    for repo, count, term in ((customers, customer_count, "Παπαδόπουλος"), (bolts, bolt_count, "Ντίζα"),
+                              (orders, order_count, "Παπαδόπουλος")):
+        middle = count // 2
+        add(repo, "get_by_id", middle)
+        add(repo, "get_listing_row", middle)
+        add(repo, "count")
+        add(repo, "get_all")
+        # The view search box: a count, then pages of the matches
+        add(repo, "search_count", term)
+        for sort in repo.SORT_KEYS:
+            add(repo, "get_page", sort, label=sort)
+            # A page from the middle, as after scrolling down
+            add(repo, "get_page", label=f"{sort},middle",
+                setup=lambda repo=repo, sort=sort, middle=middle: (sort, repo.get_cursor_at(middle, sort)))
+            add(repo, "get_cursor_at", middle, sort, label=sort)
+            add(repo, "search_page", term, sort, label=sort)
+            add(repo, "search_page", label=f"{sort},middle",
+                setup=lambda repo=repo, sort=sort, term=term: (
+                    term, sort, repo.search_cursor_at(term, repo.search_count(term) // 2, sort)))
+            add(repo, "search_cursor_at", label=sort,
+                setup=lambda repo=repo, sort=sort, term=term: (term, repo.search_count(term) // 2, sort))
+            scenarios.append(Scenario(f"{type(repo).__name__}.iter_chunks[{sort}]",
+                                      lambda repo=repo, sort=sort: _drain(repo.iter_chunks(sort))))
+
+    middle_customer, middle_bolt, middle_order = customer_count // 2, bolt_count // 2, order_count // 2
+    add(customers, "find_by_name", "παπαδοπουλ")
+    add(customers, "search", "Αθήνα", limit=100)
+    add(bolts, "find_by_name", "ντιζα 12")
+    add(bolts, "search", "Ντίζα", limit=100)
+    add(bolts, "get_low_stock")
+    add(bolts, "find_by_quantity_range", 10, 20)
+    add(bolts, "get_stock_summary")
+    add(orders, "get_all_with_summary")
+    add(orders, "get_with_details", middle_order)
+    add(orders, "get_items_summaries", list(range(middle_order, middle_order + 100)))
+    add(orders, "search_by_customer_name", "Παπαδόπουλος")
+    add(orders, "find_by_customer", middle_customer)
+    add(orders, "find_by_status", "pending")
+    add(orders, "count_by_status", "pending")
+    add(orders, "search_by_bolt_name", "Σύρτης")
+    add(orders, "search_notes", "επείγον", limit=100)
+    add(orders, "get_statistics")
+    add(orders, "get_recent_orders", 10)
+    add(orders, "get_orders_by_date_range", "2024-01-01", "2024-03-31")
+    add(orders, "can_delete_order", middle_order)
+    add(orders, "get_order_summary", middle_order)
+
+    def new_customer():
+        return (customers.create(Customer(name="Δοκιμή Μετρήσεων", phone="2100000000")),)
+
+    def new_bolt():
+        return (bolts.create(Bolt(name="Ντίζα Μετρήσεων", type="Μονού", stamp="1", quantity=5)),)
+
+    def new_order():
+        return (orders.create(Order(customer_id=middle_customer),
+                              [OrderItem(bolt_id=middle_bolt, bolt_name="", quantity=1)]),)
+
+    statuses = itertools.cycle(["approved", "processing"])
+
+    add(customers, "create", Customer(name="Δοκιμή Μετρήσεων", phone="2100000000"))
+    add(customers, "update", Customer(id=middle_customer, name="Πελάτης Μετρήσεων", phone="2100000001"))
+    add(bolts, "create", Bolt(name="Ντίζα Μετρήσεων", type="Μονού", stamp="1", quantity=5))
+    add(bolts, "update", Bolt(id=middle_bolt, name="Ντίζα Μετρήσεων", type="Μονού", stamp="1", quantity=7))
+    add(bolts, "adjust_quantity", middle_bolt, 1)
+    add(orders, "create", Order(customer_id=middle_customer),
+        [OrderItem(bolt_id=middle_bolt, bolt_name="", quantity=1)])
+    add(orders, "update_status", setup=lambda: (middle_order, next(statuses)))
+    add(orders, "update_notes", middle_order, "Μέτρηση")
+    add(orders, "update_customer", middle_order, middle_customer)
+    add(orders, "delete", setup=new_order)
+    add(bolts, "delete", setup=new_bolt)
+    add(customers, "delete", setup=new_customer)
+    return scenarios
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return values[max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))]
+
+
+def _time(scenario: Scenario, repeat: int, budget: float) -> List[float]:
+    """
+    Seconds per call: one warm-up, then repeat calls or as many as fit in
+    budget. Only the timed calls count against the budget, not setup.
+    """
+    scenario.call(*(scenario.setup() if scenario.setup else ()))
+    samples = []
+    spent = 0.0
+    while len(samples) < repeat and (len(samples) < MIN_SAMPLES or spent < budget):
+        args = scenario.setup() if scenario.setup else ()
+        started = time.perf_counter()
+        scenario.call(*args)
+        samples.append(time.perf_counter() - started)
+        spent += samples[-1]
+    return sorted(samples)
+
+
+def _measure(scenario: Scenario) -> tuple:
+    """(statements issued, peak bytes allocated) for one call; the profiler must be on."""
+    args = scenario.setup() if scenario.setup else ()
+    profiler.reset()
+    tracemalloc.start()
+    try:
+        scenario.call(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return sum(stats.calls for stats in profiler.statements()), peak
+
+
+def prepare_database(size: str, seed: int, data_dir: Path) -> Path:
+    """The generated database of a size, generating it on first use."""
+    path = data_dir / f"orders_{SIZES[size]}_seed{seed}.db"
+    if not path.exists():
+        data_dir.mkdir(parents=True, exist_ok=True)
+        part = path.with_name(path.name + ".part")
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{part}{suffix}").unlink(missing_ok=True)
+        print(f"Generating {size} database in {path} ...", flush=True)
+        profiler.enabled = False
+        try:
+            generate_database(str(part), *dimensions(SIZES[size]), seed=seed)
+        finally:
+            db.close()
+        for suffix in ("-wal", "-shm"):
+            Path(f"{part}{suffix}").unlink(missing_ok=True)
+        os.replace(part, path)
+    return path
+
+
+def run_size(size: str, seed: int, data_dir: Path, repeat: int, budget: float,
+             only: Optional[str] = None) -> dict:
+    """Results of every scenario on one size, keyed by scenario name."""
+    source = prepare_database(size, seed, data_dir)
+    fd, work = tempfile.mkstemp(suffix=".db", prefix="bench_", dir=data_dir)
+    os.close(fd)
+    shutil.copyfile(source, work)
+    results = {}
+    try:
+        # Timing runs on plain connections; measuring on profiled ones
+        profiler.enabled = False
+        profiler.slow_ms = float("inf")
+        db.open(work, pragmas=get_pragma_profile())
+        scenarios = build_scenarios(*dimensions(SIZES[size]))
+        for scenario in scenarios:
+            if only and only not in scenario.name:
+                continue
+            gc.collect()
+            samples = _time(scenario, repeat, budget)
+            results[scenario.name] = {
+                "samples": len(samples),
+                "min_ms": samples[0] * 1000,
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p90_ms": percentile(samples, 90) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+                "max_ms": samples[-1] * 1000,
+                "mean_ms": sum(samples) / len(samples) * 1000,
+            }
+            if sys.stdout.isatty():
+                print(f"\r{size}: {scenario.name:<60}", end="", flush=True)
+
+        profiler.enabled = True
+        db.reset()
+        # Open the profiled connection now, so its setup PRAGMAs are not charged to a scenario
+        with db.get_connection():
+            pass
+        for scenario in scenarios:
+            if scenario.name in results:
+                gc.collect()
+                queries, peak = _measure(scenario)
+                results[scenario.name].update(queries=queries, peak_kb=peak / 1024)
+        if sys.stdout.isatty():
+            print("\r" + " " * 80 + "\r", end="")
+    finally:
+        profiler.enabled = False
+        db.close()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{work}{suffix}").unlink(missing_ok=True)
+    return {name: {key: round(value, 4) if isinstance(value, float) else value
+                   for key, value in result.items()}
+            for name, result in results.items()}
+
+
+def compare(baseline: dict, current: dict, metric: str = "p50_ms", time_threshold: float = 0.25,
+            min_ms: float = 0.5, query_threshold: int = 0, memory_threshold: float = 0.25,
+            min_kb: float = 64) -> List[str]:
+    """
+    Regressions of current against baseline, as printable lines.
+
+    A time regression must exceed both time_threshold (relative) and
+    min_ms (absolute), so sub-millisecond noise does not fail a run;
+    memory likewise with memory_threshold and min_kb. Any query count
+    above the baseline's by more than query_threshold is a regression.
+    """
+    regressions = []
+    for size, results in current["results"].items():
+        base_results = baseline.get("results", {}).get(size, {})
+        for name, result in results.items():
+            base = base_results.get(name)
+            if base is None:
+                continue
+            now, before = result[metric], base[metric]
+            if now - before > min_ms and now > before * (1 + time_threshold):
+                regressions.append(f"{size} {name}: {metric} {before:.2f} -> {now:.2f} ms "
+                                   f"(+{(now / before - 1) * 100 if before else math.inf:.0f}%)")
+            if "queries" in result and "queries" in base and result["queries"] > base["queries"] + query_threshold:
+                regressions.append(f"{size} {name}: queries {base['queries']} -> {result['queries']}")
+            if "peak_kb" in result and "peak_kb" in base:
+                now_kb, before_kb = result["peak_kb"], base["peak_kb"]
+                if now_kb - before_kb > min_kb and now_kb > before_kb * (1 + memory_threshold):
+                    regressions.append(f"{size} {name}: peak memory {before_kb:,.0f} -> {now_kb:,.0f} KB")
+    return regressions
+
+
+def _print_results(size: str, results: dict):
+    print(f"\n{size} ({', '.join(f'{n:,}' for n in dimensions(SIZES[size]))} customers/bolts/orders)")
+    print(f"{'scenario':<52}{'n':>4}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'queries':>9}{'peak KB':>10}")
+    for name, r in results.items():
+        print(f"{name:<52}{r['samples']:>4}{r['p50_ms']:>10.2f}{r['p90_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r.get('queries', 0):>9}{r.get('peak_kb', 0):>10,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=30, help="timed calls per scenario")
+    parser.add_argument("--budget", type=float, default=2.0,
+                        help=f"seconds per scenario; slow ones stop early, after at least {MIN_SAMPLES} calls")
+    parser.add_argument("--only", help="run only scenarios whose name contains this")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="where generated databases are kept")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare with this results file")
+    parser.add_argument("--save-baseline", type=Path, help="also write results here, as the next baseline")
+    parser.add_argument("--metric", choices=["p50_ms", "p90_ms", "p99_ms", "mean_ms"], default="p50_ms")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="relative slowdown that fails")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="absolute slowdown that fails")
+    parser.add_argument("--query-threshold", type=int, default=0, help="extra statements per call that fail")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="relative growth that fails")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "budget": args.budget,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        report["results"][size] = run_size(size, args.seed, args.data_dir, args.repeat, args.budget, args.only)
+        _print_results(size, report["results"][size])
+
+    missing = []
+    if not args.only:
+        covered = {name.split("[")[0] for results in report["results"].values() for name in results}
+        missing = sorted(repository_methods() - covered)
+        for method in missing:
+            print(f"[FAIL] {method}: no scenario in tools/bench_repositories.py")
+
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+            print(f"Results written to {path}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(baseline, report, args.metric, args.time_threshold, args.min_ms,
+                              args.query_threshold, args.memory_threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(regressions)} regression(s) against {args.baseline}")
+        return 1 if regressions or missing else 0
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Micro-benchmark: legacy dict_factory vs RowFactory vs raw tuples.
+
+Usage (from the project root):
+    python -m tools.bench_row_factory
+    python -m tools.bench_row_factory --sizes 10000 100000 --repeat 5 --memory
+"""
+import argparse
+import sqlite3
+import time
+import tracemalloc
+
+from database.connection import dict_factory
+from database.rows import RowFactory
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+def _build_database(rows: int) -> sqlite3.Connection:
+    # Mirrors the bolts table, which is the widest listing in the app
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE bolts (id INTEGER PRIMARY KEY, name TEXT, type TEXT, "
+        "metal_strip TEXT, screw TEXT, rod TEXT, plate TEXT, "
+        "square_mechanism TEXT, stamp TEXT, quantity INTEGER, last_updated TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO bolts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (i, f"Ντίζα {i}", "Μονόυ", "Λ1", "Β2", "Λ3", None, "Κ4",
+             f"S{i % 97}", i % 500, "2024-01-01 00:00:00")
+            for i in range(1, rows + 1)
+        ),
+    )
+    conn.commit()
+    return conn
+
+
+def _run(conn: sqlite3.Connection, factory, keyed: bool) -> float:
+    conn.row_factory = factory
+    start = time.perf_counter()
+    rows = conn.execute("SELECT * FROM bolts").fetchall()
+    # Touch the columns a listing view actually reads
+    if keyed:
+        for row in rows:
+            row["name"], row["type"], row["stamp"], row["quantity"]
+    else:
+        for row in rows:
+            row[1], row[2], row[8], row[9]
+    return time.perf_counter() - start
+
+
+def _peak_memory(conn: sqlite3.Connection, factory) -> int:
+    conn.row_factory = factory
+    tracemalloc.start()
+    rows = conn.execute("SELECT * FROM bolts").fetchall()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del rows
+    return peak
+
+
+def benchmark(sizes=DEFAULT_SIZES, repeat: int = 3, memory: bool = False) -> list:
+    """Return one result dict per (size, factory) with the best time in seconds."""
+    results = []
+    for size in sizes:
+        conn = _build_database(size)
+        variants = (
+            ("dict_factory", lambda: dict_factory, True),
+            ("RowFactory", RowFactory, True),
+            ("raw tuples", lambda: None, False),
+        )
+        for label, make_factory, keyed in variants:
+            best = min(_run(conn, make_factory(), keyed) for _ in range(repeat))
+            result = {"rows": size, "factory": label, "seconds": best}
+            if memory:
+                result["peak_bytes"] = _peak_memory(conn, make_factory())
+            results.append(result)
+        conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--memory", action="store_true", help="also measure peak allocation")
+    args = parser.parse_args()
+
+    results = benchmark(args.sizes, args.repeat, args.memory)
+    baseline = {r["rows"]: r["seconds"] for r in results if r["factory"] == "dict_factory"}
+
+    header = f"{'rows':>10}  {'factory':<14}{'seconds':>10}{'vs dict':>10}"
+    print(header + (f"{'peak MB':>10}" if args.memory else ""))
+    for r in results:
+        ratio = r["seconds"] / baseline[r["rows"]] if baseline[r["rows"]] else 0
+        line = f"{r['rows']:>10}  {r['factory']:<14}{r['seconds']:>10.4f}{ratio:>9.2f}x"
+        if args.memory:
+            line += f"{r['peak_bytes'] / 1048576:>10.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Query-plan regression check for every statement the repositories issue.
+
+Generates a scratch database with tools.generate_data, runs every public
+repository method through the SQL profiler so each statement is captured
+with real parameters, and runs EXPLAIN QUERY PLAN on it. A plan that
+scans a table or a whole index, rather than seeking into it, or sorts
+through a temp B-tree fails the check, unless ALLOWED lists it with a
+reason. So does a repository method without a scenario below, so new
+queries cannot slip past unchecked.
+
+Usage (from the project root):
+    python -m tools.check_query_plans
+    python -m tools.check_query_plans --orders 50000 --verbose
+
+Exits with status 1 when a plan regressed.
+"""
+import argparse
+import inspect
+import os
+import re
+import sys
+import tempfile
+
+from database.connection import db, get_pragma_profile
+from database.profiler import profiler
+from database.repositories.bolt_repo import BoltRepository
+from database.repositories.customer_repo import CustomerRepository
+from database.repositories.order_repo import OrderRepository
+from models.bolt import Bolt
+from models.customer import Customer
+from models.order import Order, OrderItem
+from tools.generate_data import generate_database
+
+# (caller, table or "TEMP B-TREE") -> why that step is expected
+ALLOWED = {
+    ("CustomerRepository.get_all", "customers"): "whole-table listing, read in rowid order",
+    ("BoltRepository.get_all", "bolts"): "whole-table listing, read in rowid order",
+    ("CustomerRepository.count", "customers"): "COUNT(*) has to visit every row",
+    ("BoltRepository.count", "bolts"): "COUNT(*) has to visit every row",
+    ("OrderRepository.count", "orders"): "COUNT(*) has to visit every row",
+    ("BoltRepository.get_stock_summary", "bolts"): "aggregates over every bolt",
+    ("OrderRepository.get_statistics", "orders"): "aggregates over every order",
+    ("OrderRepository.get_statistics", "order_items"): "aggregates over every item",
+    ("OrderRepository.get_statistics", "TEMP B-TREE"): "ranks the per-customer and per-bolt totals",
+    ("CustomerRepository.find_by_name", "TEMP B-TREE"): "sorts only the matching customers",
+    ("BoltRepository.find_by_name", "TEMP B-TREE"): "sorts only the matching bolts",
+    ("OrderRepository.search_by_customer_name", "TEMP B-TREE"): "sorts only the matching orders",
+    ("OrderRepository.search_by_bolt_name", "TEMP B-TREE"): "sorts only the matching orders",
+    ("CustomerRepository.search_page", "TEMP B-TREE"): "sorts only the matching customers",
+    ("CustomerRepository.search_cursor_at", "TEMP B-TREE"): "sorts only the matching customers",
+    ("BoltRepository.search_page", "TEMP B-TREE"): "sorts only the matching bolts",
+    ("BoltRepository.search_cursor_at", "TEMP B-TREE"): "sorts only the matching bolts",
+    ("OrderRepository.search_page", "TEMP B-TREE"): "sorts only the matching orders",
+    ("OrderRepository.search_cursor_at", "TEMP B-TREE"): "sorts only the matching orders",
+    ("OrderRepository.get_items_summaries", "TEMP B-TREE"): "numbers the items of the requested orders",
+}
+
+# Public repository methods that issue no SQL of their own
+NO_SQL = {"get_table_name", "get_listing_select"}
+
+_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_ORDER_BY = re.compile(r"\bORDER BY\b", re.IGNORECASE)
+_KEYWORDS = {"on", "where", "join", "left", "inner", "cross", "order", "group",
+             "limit", "using", "natural", "outer", "set", "values", "union"}
+
+
+def run_scenarios():
+    """Call every public repository method once; returns the methods covered."""
+    customers, bolts, orders = CustomerRepository(), BoltRepository(), OrderRepository()
+    covered = set()
+
+    def call(repo, name, *args, **kwargs):
+        covered.add(f"{type(repo).__name__}.{name}")
+        return getattr(repo, name)(*args, **kwargs)
+
+    for repo, sorts, term in ((customers, ("id", "name"), "Αθήνα"),
+                              (bolts, ("id", "name", "quantity"), "Ντίζα"),
+                              (orders, ("date", "id"), "Παπαδόπουλος")):
+        call(repo, "get_by_id", 1)
+        call(repo, "get_listing_row", 1)
+        call(repo, "get_all")
+        call(repo, "count")
+        call(repo, "search_count", term)
+        for sort in sorts:
+            page = call(repo, "get_page", sort, page_size=100)
+            call(repo, "get_page", sort, page.next_cursor, page_size=100)
+            call(repo, "get_page", sort, page.next_cursor, page_size=100, backward=True)
+            call(repo, "get_cursor_at", 500, sort)
+            page = call(repo, "search_page", term, sort, page_size=100)
+            call(repo, "search_page", term, sort, page.next_cursor, page_size=100)
+            call(repo, "search_cursor_at", term, 50, sort)
+            for _ in call(repo, "iter_chunks", sort, chunk_size=500):
+                break
+
+    customer_id = call(customers, "create", Customer(name="Δοκιμή Ελέγχου", phone="2100000000"))
+    call(customers, "update", Customer(id=customer_id, name="Δοκιμή Ελέγχου 2", phone="2100000001"))
+    call(customers, "find_by_name", "παπαδοπουλ")
+    call(customers, "search", "Αθήνα", limit=50)
+
+    bolt_id = call(bolts, "create", Bolt(name="Κλειδαριά Δοκιμής", type="Μονό", stamp="S1", quantity=5))
+    call(bolts, "update", Bolt(id=bolt_id, name="Κλειδαριά Δοκιμής 2", type="Μονό", stamp="S1", quantity=6))
+    call(bolts, "find_by_name", "ντιζα 12")
+    call(bolts, "search", "Ντίζα", limit=50)
+    call(bolts, "adjust_quantity", bolt_id, -1)
+    call(bolts, "get_low_stock")
+    call(bolts, "find_by_quantity_range", 10, 20)
+    call(bolts, "find_by_quantity_range", None, 20)
+    call(bolts, "get_stock_summary")
+
+    order_id = call(orders, "create", Order(customer_id=customer_id, notes="έλεγχος"),
+                    [OrderItem(bolt_id=bolt_id, bolt_name="", quantity=2)])
+    page = call(orders, "get_all_with_summary", page_size=200)
+    call(orders, "get_all_with_summary", page.next_cursor, page_size=200)
+    call(orders, "get_with_details", order_id)
+    call(orders, "get_items_summaries", [row["id"] for row in page])
+    call(orders, "get_items_summaries", [row["id"] for row in page][:10], limit=None)
+    call(orders, "update_status", order_id, "approved")
+    call(orders, "update_notes", order_id, "αλλαγή")
+    call(orders, "update_customer", order_id, 1)
+    call(orders, "search_by_customer_name", "Παπαδόπουλος", page_size=200)
+    call(orders, "find_by_customer", 1, page_size=200)
+    call(orders, "find_by_status", "pending", page_size=200)
+    call(orders, "count_by_status", "pending")
+    call(orders, "search_by_bolt_name", "Σύρτης", page_size=200)
+    call(orders, "search_notes", "επείγον", limit=50)
+    call(orders, "get_statistics")
+    call(orders, "get_recent_orders", 10)
+    call(orders, "get_orders_by_date_range", "2023-01-01", "2023-03-31", page_size=200)
+    call(orders, "can_delete_order", order_id)
+    call(orders, "get_order_summary", order_id)
+    call(orders, "delete", order_id)
+    call(bolts, "delete", bolt_id)
+    call(customers, "delete", customer_id)
+    return covered
+
+
+def repository_methods() -> set:
+    """Every public method of the repository classes, as Class.method."""
+    methods = set()
+    for cls in (CustomerRepository, BoltRepository, OrderRepository):
+        for name, member in inspect.getmembers(cls, inspect.isfunction):
+            if not name.startswith("_") and name not in NO_SQL:
+                methods.add(f"{cls.__name__}.{name}")
+    return methods
+
+
+def _tables_of(sql: str) -> dict:
+    """Alias or name -> table, from the FROM and JOIN clauses."""
+    tables = {}
+    for table, alias in _ALIAS.findall(sql):
+        tables[table] = table
+        if alias and alias.lower() not in _KEYWORDS:
+            tables[alias] = table
+    return tables
+
+
+def check_plan(conn, stats, real_tables: set) -> tuple:
+    """The plan of one statement, and its problems as (table or marker, plan line)."""
+    plan = profiler.explain(conn, stats.statement, stats.params)
+    tables = _tables_of(stats.statement)
+    # Sorted without a temp B-tree: the outer table is walked in ORDER BY order
+    ordered = _ORDER_BY.search(stats.statement) and not any("USE TEMP B-TREE" in line for line in plan)
+    problems = []
+    for line in plan:
+        detail = line.strip()
+        if "USE TEMP B-TREE" in detail:
+            problems.append(("TEMP B-TREE", detail))
+        elif detail.startswith("SCAN ") and "VIRTUAL TABLE" not in detail:
+            # A SCAN reads the whole table or index, covering or not; only SEARCH seeks
+            name = detail.split()[1]
+            table = tables.get(name, name)
+            # ...which is what a listing does with its outer table, stopping at the page size
+            if ordered and line == detail and table == next(iter(tables.values()), None):
+                continue
+            if table in real_tables:
+                problems.append((table, detail))
+    return plan, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--bolts", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only failures")
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="plan_check_")
+    os.close(fd)
+    try:
+        profiler.enabled = False
+        generate_database(path, args.customers, args.bolts, args.orders, seed=args.seed)
+        # Reopen on the app's own settings, with every connection profiled
+        profiler.enabled = True
+        # Plans are checked here; the slow-query log would only add noise
+        profiler.slow_ms = float("inf")
+        db.open(path, pragmas=get_pragma_profile())
+        covered = run_scenarios()
+        statements = [stats for stats in profiler.statements()
+                      if "." in stats.caller and not stats.sql.upper().startswith("PRAGMA")]
+
+        failures = 0
+        with db.get_connection() as conn:
+            real_tables = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for stats in statements:
+                plan, problems = check_plan(conn, stats, real_tables)
+                unexpected = [(what, line) for what, line in problems
+                              if (stats.caller, what) not in ALLOWED]
+                if unexpected or args.verbose:
+                    status = "FAIL" if unexpected else "ok"
+                    print(f"[{status}] {stats.caller}: {stats.sql[:150]}")
+                    for line in plan:
+                        print(f"        {line}")
+                    for what, line in unexpected:
+                        print(f"    -> unexpected {'temp B-tree' if what == 'TEMP B-TREE' else 'scan of ' + what}")
+                failures += bool(unexpected)
+
+        missing = sorted(repository_methods() - covered)
+        for method in missing:
+            print(f"[FAIL] {method}: no scenario in tools/check_query_plans.py")
+
+        print(f"\n{len(statements)} statement(s) checked, {failures} with regressed plans, "
+              f"{len(missing)} method(s) without a scenario")
+        return 1 if failures or missing else 0
+    finally:
+        db.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
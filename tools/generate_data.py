@@ -0,0 +1,351 @@
+"""
+Deterministic synthetic data for scale testing.
+
+Fills a new database with customers, bolts, orders, their items and
+status histories. The same seed and sizes always produce the same rows,
+timestamps included, so benchmarks on generated data are reproducible.
+Rows go in through executemany in large transactions on the bulk-load
+pragma profile. The schema's triggers are dropped for the load, which
+they would otherwise slow down about threefold, and re-created after it;
+what they maintain (order item counters, full-text indexes, table
+versions) is written directly or rebuilt in one pass instead.
+
+Usage (from the project root):
+    python -m tools.generate_data scale.db --preset large
+    python -m tools.generate_data scale.db --customers 5000 --orders 50000 --seed 3
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from database.connection import db, get_pragma_profile
+from database.profiler import profiler
+from database.schema import initialize_database
+from utils.text import normalize_text
+
+# customers, bolts, orders, average items per order
+PRESETS = {
+    "small": (1_000, 500, 10_000, 3),
+    "medium": (20_000, 5_000, 250_000, 4),
+    "large": (100_000, 20_000, 1_250_000, 4),     # ~5M order items
+}
+
+BATCH_SIZE = 20_000
+
+# Every timestamp counts back from here rather than from now()
+END_DATE = datetime(2025, 12, 31, 18, 0)
+HISTORY_DAYS = 3 * 365
+
+FIRST_NAMES = [
+    "Γιώργος", "Δημήτρης", "Κωνσταντίνος", "Νίκος", "Παναγιώτης", "Βασίλης", "Χρήστος",
+    "Αντώνης", "Σπύρος", "Μιχάλης", "Θανάσης", "Ηλίας", "Μαρία", "Ελένη", "Αικατερίνη",
+    "Βασιλική", "Σοφία", "Αγγελική", "Γεωργία", "Δέσποινα", "Ευαγγελία", "Ιωάννα",
+]
+SURNAMES = [
+    "Παπαδόπουλος", "Βλάχος", "Οικονόμου", "Γεωργίου", "Παπαγεωργίου", "Νικολάου",
+    "Καραγιάννης", "Μακρής", "Αθανασίου", "Πετρόπουλος", "Δημητρίου", "Κωνσταντίνου",
+    "Ιωαννίδης", "Αλεξίου", "Χατζής", "Σταματόπουλος", "Λαμπράκης", "Μαυρίδης",
+]
+BUSINESSES = ["Σιδηρικά", "Κλειδαράδικο", "Κατασκευές", "Αλουμίνια", "Πόρτες", "Κουφώματα"]
+LEGAL_FORMS = ["Ο.Ε.", "Ε.Ε.", "Α.Ε.", "Ι.Κ.Ε."]
+CITIES = ["Αθήνα", "Θεσσαλονίκη", "Πάτρα", "Ηράκλειο", "Λάρισα", "Βόλος", "Ιωάννινα",
+          "Χανιά", "Καλαμάτα", "Σέρρες", "Κομοτηνή", "Ρόδος"]
+
+BOLT_KINDS = ["Ντίζα", "Κλειδαριά", "Σύρτης", "Μπάρα", "Γλώσσα", "Αφαλός"]
+BOLT_TYPES = ["Μονού", "Διπλού", "Τριπλού", "Ασφαλείας", "Χωνευτή"]
+
+NOTES = [None, None, None, "Επείγον", "Παράδοση Δευτέρα", "Παραλαβή από κατάστημα",
+         "Τηλεφωνήστε πριν την παράδοση", "Τιμολόγιο", "Αντικατάσταση ελαττωματικού"]
+
+# Forward path of an order; any step before shipping may end in cancellation
+FLOW = ["pending", "approved", "processing", "shipped", "delivered"]
+CANCEL_RATE = 0.02
+# Hours between consecutive steps, as (low, high)
+STEP_HOURS = {"approved": (1, 48), "processing": (2, 72), "shipped": (12, 96),
+              "delivered": (24, 120), "cancelled": (1, 96)}
+
+
+def _timestamp(moment: datetime) -> str:
+    # Same text as strftime("%Y-%m-%d %H:%M:%S") for whole seconds, several times faster
+    return moment.isoformat(" ")
+
+
+def customer_rows(rng: random.Random, count: int):
+    """(id, name, phone, name_norm) tuples."""
+    for customer_id in range(1, count + 1):
+        person = f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}"
+        if rng.random() < 0.25:
+            name = f"{rng.choice(BUSINESSES)} {rng.choice(SURNAMES)} {rng.choice(LEGAL_FORMS)}"
+        else:
+            name = person
+        if rng.random() < 0.3:
+            name = f"{name} - {rng.choice(CITIES)}"
+        if rng.random() < 0.7:
+            phone = f"69{rng.randrange(10**8):08d}"
+        else:
+            phone = f"2{rng.randrange(10**9):09d}"
+        yield customer_id, name, phone, normalize_text(name)
+
+
+def bolt_rows(rng: random.Random, count: int):
+    """(id, name, type, metal_strip, rod, screw, plate, square_mechanism, stamp,
+    quantity, min_stock_level, last_updated, name_norm) tuples."""
+    for bolt_id in range(1, count + 1):
+        # Names are a kind plus a length in mm; the id keeps them unique
+        name = f"{rng.choice(BOLT_KINDS)} {rng.randrange(60, 400, 5)}-{bolt_id}"
+        min_stock = rng.choice([0, 0, 5, 10, 20, 50])
+        updated = END_DATE - timedelta(minutes=rng.randrange(HISTORY_DAYS * 1440))
+        yield (
+            bolt_id, name, rng.choice(BOLT_TYPES),
+            str(rng.randrange(10, 40)),
+            str(rng.randrange(1, 8)) if rng.random() < 0.4 else None,
+            f"{rng.randrange(25, 60) / 10:.1f}",
+            f"{rng.randrange(150, 400) / 10:.1f}" if rng.random() < 0.8 else None,
+            str(rng.randrange(30, 70)),
+            str(rng.randrange(1, 20)),
+            rng.randrange(0, 1000) if rng.random() < 0.9 else rng.randrange(0, 10),
+            min_stock,
+            _timestamp(updated),
+            normalize_text(name),
+        )
+
+
+def _timeline(rng: random.Random, placed: datetime) -> list:
+    """Status changes of one order as (old, new, moment); recent orders stop early."""
+    changes = [(None, "pending", placed)]
+    moment = placed
+    for step in FLOW[1:]:
+        if step in ("approved", "processing", "shipped") and rng.random() < CANCEL_RATE:
+            step = "cancelled"
+        low, high = STEP_HOURS[step]
+        moment = moment + timedelta(minutes=rng.randrange(low * 60, high * 60))
+        if moment > END_DATE:
+            break
+        changes.append((changes[-1][1], step, moment))
+        if step == "cancelled":
+            break
+    return changes
+
+
+def order_rows(rng: random.Random, count: int, customers: int, bolts: int, items_per_order: float):
+    """
+    One (order, items, history) per order, in id order.
+
+    Orders are spread over HISTORY_DAYS with ids following their dates,
+    as they would be when entered over time.
+    """
+    span = HISTORY_DAYS * 86400
+    item_id = history_id = 0
+    # Uniform from 1 to about twice the average
+    max_items = max(1, round(items_per_order * 2) - 1)
+    for order_id in range(1, count + 1):
+        offset = span * (order_id - 1) // count + rng.randrange(max(span // count, 1))
+        placed = END_DATE - timedelta(seconds=span - offset)
+        changes = _timeline(rng, placed)
+        status, last_updated = changes[-1][1], changes[-1][2]
+
+        created = _timestamp(placed)
+        items = []
+        for bolt_id in rng.sample(range(1, bolts + 1), min(rng.randint(1, max_items), bolts)):
+            item_id += 1
+            quantity = rng.choice([1, 1, 2, 2, 3, 4, 5, 10, 20, 50])
+            items.append((item_id, order_id, bolt_id, quantity, created))
+
+        history = []
+        for old, new, moment in changes:
+            history_id += 1
+            history.append((history_id, order_id, old, new, _timestamp(moment),
+                            "System" if old is None else "User"))
+
+        # Item counters as the order_items triggers would have left them
+        order = (order_id, rng.randrange(1, customers + 1), created, status,
+                 rng.choice(NOTES), len(items), sum(item[3] for item in items),
+                 _timestamp(last_updated))
+        yield order, items, history
+
+
+def _batches(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@contextmanager
+def _triggers_suspended():
+    """Drop every trigger for the duration, then re-create it from its stored SQL."""
+    with db.get_connection(raw=True) as conn:
+        triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall()
+        for name, _ in triggers:
+            conn.execute(f"DROP TRIGGER {name}")
+    try:
+        yield
+    finally:
+        with db.get_connection() as conn:
+            for _, sql in triggers:
+                conn.execute(sql)
+
+
+def _rebuild_derived():
+    """Bring what the suspended triggers maintain up to date."""
+    with db.get_connection(raw=True) as conn:
+        fts_tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%fts5%'")]
+        for fts in fts_tables:
+            conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        # Every table changed, so every cached view must reload
+        conn.execute("UPDATE table_versions SET version = version + 1")
+
+
+def generate(customers: int, bolts: int, orders: int, items_per_order: float = 4,
+             seed: int = 1, batch_size: int = BATCH_SIZE, progress=None) -> dict:
+    """
+    Insert the generated rows into the database db points at.
+
+    The database must have the current schema and no data. progress, if
+    given, is called as progress(table, rows_done).
+
+    Returns:
+        Row counts per table
+    """
+    if min(customers, bolts, orders) < 1:
+        raise ValueError("customers, bolts and orders must be at least 1")
+    # One stream per table, so resizing one table leaves the others' rows alone
+    streams = {table: random.Random(f"{seed}:{table}") for table in ("customers", "bolts", "orders")}
+    with _triggers_suspended():
+        counts = _load(streams, customers, bolts, orders, items_per_order, batch_size, progress)
+    _rebuild_derived()
+
+    with db.get_connection() as conn:
+        conn.execute("ANALYZE")
+    return counts
+
+
+def _load(streams, customers, bolts, orders, items_per_order, batch_size, progress) -> dict:
+    counts = {}
+    done = 0
+    for batch in _batches(customer_rows(streams["customers"], customers), batch_size):
+        with db.get_connection(raw=True) as conn:
+            conn.executemany(
+                "INSERT INTO customers (id, name, phone, name_norm) VALUES (?, ?, ?, ?)", batch
+            )
+        done += len(batch)
+        if progress:
+            progress("customers", done)
+    counts["customers"] = done
+
+    done = 0
+    for batch in _batches(bolt_rows(streams["bolts"], bolts), batch_size):
+        with db.get_connection(raw=True) as conn:
+            conn.executemany(
+                "INSERT INTO bolts (id, name, type, metal_strip, rod, screw, plate, square_mechanism, "
+                "stamp, quantity, min_stock_level, last_updated, name_norm) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch
+            )
+        done += len(batch)
+        if progress:
+            progress("bolts", done)
+    counts["bolts"] = done
+
+    counts.update(orders=0, order_items=0, order_status_history=0)
+    # Batches hold about batch_size item rows, whatever the order size
+    per_batch = max(1, int(batch_size // items_per_order))
+    rows = order_rows(streams["orders"], orders, customers, bolts, items_per_order)
+    for batch in _batches(rows, per_batch):
+        with db.get_connection(raw=True) as conn:
+            conn.executemany(
+                "INSERT INTO orders (id, customer_id, order_date, status, notes, total_items, "
+                "total_quantity, last_updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (order for order, _, _ in batch)
+            )
+            conn.executemany(
+                "INSERT INTO order_items (id, order_id, bolt_id, quantity, created_at) "
+                "VALUES (?, ?, ?, ?, ?)", (item for _, items, _ in batch for item in items)
+            )
+            conn.executemany(
+                "INSERT INTO order_status_history "
+                "(id, order_id, old_status, new_status, changed_at, changed_by) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (change for _, _, history in batch for change in history)
+            )
+        counts["orders"] += len(batch)
+        counts["order_items"] += sum(len(items) for _, items, _ in batch)
+        counts["order_status_history"] += sum(len(history) for _, _, history in batch)
+        if progress:
+            progress("orders", counts["orders"])
+    return counts
+
+
+def generate_database(path, customers: int, bolts: int, orders: int, items_per_order: float = 4,
+                      seed: int = 1, progress=None) -> dict:
+    """
+    Create a database at path and fill it; db is left pointing at it.
+
+    Returns:
+        Row counts per table
+    """
+    if os.path.exists(path) and os.path.getsize(path):
+        raise FileExistsError(f"{path} already exists")
+    db.open(path, pragmas=get_pragma_profile("bulk-load"))
+    initialize_database()
+    counts = generate(customers, bolts, orders, items_per_order, seed, progress=progress)
+    with db.get_connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="database file to create")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--customers", type=int)
+    parser.add_argument("--bolts", type=int)
+    parser.add_argument("--orders", type=int)
+    parser.add_argument("--items-per-order", type=float)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--force", action="store_true", help="overwrite an existing file")
+    args = parser.parse_args()
+
+    customers, bolts, orders, items_per_order = PRESETS[args.preset]
+    customers = args.customers or customers
+    bolts = args.bolts or bolts
+    orders = args.orders or orders
+    items_per_order = args.items_per_order or items_per_order
+
+    if os.path.exists(args.path) and not args.force:
+        print(f"{args.path} already exists; use --force to overwrite")
+        return 1
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.path + suffix):
+            os.unlink(args.path + suffix)
+
+    # Per-statement timing would only slow the load down
+    profiler.enabled = False
+    started = time.perf_counter()
+
+    def progress(table, done):
+        print(f"\r{table}: {done:,} rows ({time.perf_counter() - started:.0f}s)", end="", flush=True)
+
+    try:
+        counts = generate_database(args.path, customers, bolts, orders, items_per_order,
+                                   args.seed, progress=progress)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"\r{args.path} (seed {args.seed}) in {elapsed:.1f}s, {total / elapsed:,.0f} rows/s")
+    for table, count in counts.items():
+        print(f"    {table:<22}{count:>12,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
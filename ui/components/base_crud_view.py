@@ -2,16 +2,171 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import messagebox
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import List, Optional
 
+from config.settings import EXPORT_CHUNK_SIZE, EXPORT_GZIP
+from database.change_tracker import tracker
+from database.repositories.base_repo import Page
+from ui.components.data_table import TreeReconciler
+from ui.components.loader import BackgroundLoader
+from ui.components.search_bar import SearchPipeline
+
+
+class ListRowSource:
+    """Row source over rows that are already in memory."""
+
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def rows(self, start: int, stop: int) -> list:
+        return self._rows[start:stop]
+
+    def replace(self, row):
+        """Swap in a fresh copy of a row already in the list."""
+        for index, existing in enumerate(self._rows):
+            if existing['id'] == row['id']:
+                self._rows[index] = row
+
+    def remove(self, item_id: int) -> bool:
+        """Drop a deleted row; False if it is not in the list."""
+        for index, existing in enumerate(self._rows):
+            if existing['id'] == item_id:
+                del self._rows[index]
+                return True
+        return False
+
+
+class PagedRowSource:
+    """
+    Random access by row position over a repository's keyset pages.
+
+    Pages are loaded on demand and kept in a small LRU cache. A page next to
+    a cached one is fetched from that page's cursor, and the last page is
+    read backward from the end; only a jump into the middle needs a
+    get_cursor_at() probe first. With a search term, the same is done over
+    the repository's search_* methods.
+    """
+
+    def __init__(self, repository, sort: Optional[str] = None,
+                 page_size: int = 200, max_pages: int = 16, search: str = ""):
+        self.repository = repository
+        self.sort = sort
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.search = search
+        self._pages = OrderedDict()
+        self._total = repository.search_count(search) if search else repository.count()
+
+    def __len__(self):
+        return self._total
+
+    def rows(self, start: int, stop: int) -> list:
+        stop = min(stop, self._total)
+        if start >= stop:
+            return []
+        first, last = start // self.page_size, (stop - 1) // self.page_size
+        rows = []
+        for number in range(first, last + 1):
+            rows.extend(self._page(number).rows)
+        offset = start - first * self.page_size
+        return rows[offset:offset + (stop - start)]
+
+    def _page(self, number: int) -> Page:
+        page = self._pages.get(number)
+        if page is not None:
+            self._pages.move_to_end(number)
+            return page
+
+        before, after = self._pages.get(number - 1), self._pages.get(number + 1)
+        if before is not None:
+            page = (self._fetch(before.next_cursor) if before.next_cursor is not None
+                    else Page())
+        elif after is not None and after.prev_cursor is not None:
+            page = self._fetch(after.prev_cursor, backward=True)
+        elif number == 0:
+            page = self._fetch(None)
+        elif number == (self._total - 1) // self.page_size:
+            page = self._fetch(None, backward=True, size=self._total - number * self.page_size)
+        else:
+            position = number * self.page_size - 1
+            if self.search:
+                cursor = self.repository.search_cursor_at(self.search, position, self.sort)
+            else:
+                cursor = self.repository.get_cursor_at(position, self.sort)
+            page = self._fetch(cursor) if cursor is not None else Page()
+
+        self._pages[number] = page
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def replace(self, row):
+        """Swap in a fresh copy of a row held in the page cache."""
+        for page in self._pages.values():
+            for index, existing in enumerate(page.rows):
+                if existing['id'] == row['id']:
+                    page.rows[index] = row
+                    return
+
+    def remove(self, item_id: int) -> bool:
+        """
+        Drop a deleted row held in the page cache; False if it is not cached.
+
+        Its page is topped up with the next row, one single-row query, so it
+        stays full. Later cached pages would start one row late, so they are
+        dropped and re-read from this page's cursor when scrolled to.
+        """
+        for number, page in self._pages.items():
+            index = next((i for i, row in enumerate(page.rows) if row['id'] == item_id), None)
+            if index is None:
+                continue
+            del page.rows[index]
+            if page.next_cursor is not None:
+                tail = self._fetch(page.next_cursor, size=1)
+                page.rows.extend(tail.rows)
+                page.next_cursor = tail.next_cursor if tail.rows else None
+            for later in [n for n in self._pages if n > number]:
+                del self._pages[later]
+            self._total -= 1
+            return True
+        return False
+
+    def _fetch(self, cursor, backward: bool = False, size: Optional[int] = None) -> Page:
+        size = size or self.page_size
+        if self.search:
+            return self.repository.search_page(self.search, self.sort, cursor, size, backward)
+        return self.repository.get_page(self.sort, cursor, size, backward)
+
 
 class BaseView(ttk.Frame, ABC):
     """base class for all CRUD views"""
 
+    # The table only holds Treeview items for the rows on screen plus this
+    # many extra; everything else is fetched a page at a time while scrolling
+    VIRTUAL_BUFFER = 10
+    PAGE_SIZE = 200
+    # Quiet time after the last keystroke before the search runs
+    SEARCH_DEBOUNCE_MS = 250
+
     def __init__(self, parent, repository, model_class):
         super().__init__(parent)
         self.repository = repository
         self.model_class = model_class
+        self._source = ListRowSource([])
+        self._offset = 0
+        self._row_metrics = None
+        self._selected_id = None
+        self._window_size = 25 + self.VIRTUAL_BUFFER
+        # Scrollbar position waiting to be rendered, and its after_idle job
+        self._pending_moveto = None
+        self._moveto_job = None
+        # Table versions the rows on screen were loaded at
+        self._loaded_version = None
+        self.loader = BackgroundLoader(self, on_busy=self._set_loading)
         self.setup_ui()
         self.refresh()
 
@@ -61,6 +216,13 @@ class BaseView(ttk.Frame, ABC):
         
         self.search_var = ttk.StringVar()
         self.search_var.trace_add("write", lambda *args: self.on_search())
+        self.search = SearchPipeline(
+            self,
+            self._load_source,
+            self._apply_search,
+            on_error=lambda e: messagebox.showerror("Error", f"Search failed: {e}"),
+            debounce_ms=self.SEARCH_DEBOUNCE_MS,
+        )
         
         search_entry = ttk.Entry(
             search_frame,
@@ -70,6 +232,14 @@ class BaseView(ttk.Frame, ABC):
         )
         search_entry.pack(side=LEFT, padx=(0, 15))
         
+        self.loading_label = ttk.Label(
+            toolbar,
+            text="",
+            font=("Segoe UI", 10),
+            bootstyle="secondary"
+        )
+        self.loading_label.pack(side=RIGHT)
+        
         # Action buttons (right side)
         ttk.Button(
             search_frame,
@@ -112,14 +282,15 @@ class BaseView(ttk.Frame, ABC):
                 anchor=self.get_column_anchor(col)
             )
         
-        # Scrollbars
-        vsb = ttk.Scrollbar(table_frame, orient=VERTICAL, command=self.tree.yview)
+        # Scrollbars. The vertical one tracks the position in the whole
+        # listing, not in the few rows the Treeview actually holds
+        self.vsb = ttk.Scrollbar(table_frame, orient=VERTICAL, command=self._on_scrollbar)
         hsb = ttk.Scrollbar(table_frame, orient=HORIZONTAL, command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.tree.configure(xscrollcommand=hsb.set)
         
         # Grid layout
         self.tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
+        self.vsb.grid(row=0, column=1, sticky="ns")
         hsb.grid(row=1, column=0, sticky="ew")
         
         table_frame.grid_rowconfigure(0, weight=1)
@@ -128,6 +299,18 @@ class BaseView(ttk.Frame, ABC):
         # Double-click to view details
         self.tree.bind("<Double-1>", lambda e: self.on_read())
         
+        self.table = TreeReconciler(self.tree)
+        
+        # Scrolling is handled here so the Treeview never scrolls on its own
+        self.tree.bind("<Configure>", lambda e: self._scroll_to(self._offset, force=True))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_to(self._offset - 3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_to(self._offset + 3))
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"),
+                          ("<Next>", "page"), ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(key, lambda e, step=step: self._on_key(step))
+        
         # Alternating row colors
         self.tree.tag_configure('oddrow', background='#f8f9fa')
         self.tree.tag_configure('evenrow', background='#ffffff')
@@ -202,45 +385,259 @@ class BaseView(ttk.Frame, ABC):
         return []
     
     def refresh(self):
-        """Refresh the table data."""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """
+        Reload the table in the background, keeping the scroll position and
+        selection. The current rows stay on screen until the new ones arrive.
+        """
+        search_term = self.search_var.get().strip()
+        offset = self._offset
+        # Read before loading: a write that lands mid-load leaves the view stale
+        self._loaded_version = self.data_version()
+        self.loader.load(
+            lambda: self._load_source(search_term, offset),
+            self._apply_source,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load data: {e}"),
+        )
 
-        try:
-            search_term = self.search_var.get().strip()
-            items = self.fetch_data(search_term)
+    def get_tracked_tables(self) -> tuple:
+        """Tables whose changes make this view stale."""
+        return (self.get_table_name(),)
 
-            # Insert items with alternating row colors
-            for idx, item in enumerate(items):
-                values = self.format_row(item)
-                tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-                self.tree.insert("", END, values=values, tags=(tag,))
+    def data_version(self):
+        """Token that changes whenever one of the tracked tables is modified."""
+        return tracker.snapshot(self.get_tracked_tables())
+
+    def refresh_if_stale(self) -> bool:
+        """Refresh only if the data changed since the last load. Returns True if it did."""
+        if self._loaded_version == self.data_version():
+            return False
+        self.refresh()
+        return True
 
+    def destroy(self):
+        self.search.close()
+        self.loader.cancel()
+        if self._moveto_job is not None:
+            self.after_cancel(self._moveto_job)
+        super().destroy()
+
+    def _load_source(self, search_term: str, offset: int = 0):
+        """Worker side of refresh and search: build the row source."""
+        source = self.get_row_source(search_term)
+        # Warm the page cache so the first redraw does not hit the database
+        source.rows(offset, offset + self._window_size)
+        return source
+
+    def _apply_source(self, source):
+        self._source = source
+        try:
+            self._render()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load data: {e}")
 
-    @abstractmethod
-    def fetch_data(self, search_term: str = ""):
-        """Fetch data from repository."""
-        pass
+    def _set_loading(self, busy: bool):
+        self.loading_label.configure(text="⏳ Loading..." if busy else "")
+
+    def get_row_source(self, search_term: str = ""):
+        """
+        Rows for the table, paged from the repository: the full listing, or
+        the rows matching search_term. A one-letter search can match most of
+        the table, so results are not held in memory either. Called on a
+        worker thread, so it must not touch any widget.
+        """
+        return PagedRowSource(self.repository, self.get_sort(), self.PAGE_SIZE, search=search_term)
+
+    def get_sort(self) -> Optional[str]:
+        """Repository sort key for the listing (None for its default)."""
+        return None
 
     @abstractmethod
     def format_row(self, item) -> tuple:
         """Format item as row tuple."""
         pass
 
+    def prepare_rows(self, items: list):
+        """Hook called with the rows about to be shown, before format_row."""
+        pass
+
+    def get_row_tags(self, item, position: int) -> tuple:
+        """Return Treeview tags for the row at the given listing position."""
+        return ('evenrow',) if position % 2 == 0 else ('oddrow',)
+
     def get_selected_id(self) -> Optional[int]:
-        """Get ID of selected item."""
+        """Get ID of selected item (rows use the record id as their iid)."""
         selection = self.tree.selection()
         if not selection:
             return None
-        values = self.tree.item(selection[0])["values"]
-        return values[0] if values else None
+        try:
+            return int(selection[0])
+        except ValueError:
+            return None
+
+    # VIRTUAL SCROLLING
+
+    def _visible_rows(self) -> int:
+        """How many rows fit in the Treeview at its current size."""
+        if self._row_metrics is None:
+            children = self.tree.get_children()
+            bbox = self.tree.bbox(children[0]) if children else ""
+            if not bbox:
+                # Not drawn yet: render a screenful and measure next time
+                return 25
+            self._row_metrics = (bbox[1], bbox[3])  # heading height, row height
+        heading, row_height = self._row_metrics
+        return max(1, (self.tree.winfo_height() - heading) // row_height)
+
+    def _render(self):
+        """Materialize the rows in the visible window and sync the scrollbar."""
+        total = len(self._source)
+        visible = self._visible_rows()
+        self._offset = max(0, min(self._offset, total - visible))
+
+        self._window_size = visible + self.VIRTUAL_BUFFER
+        items = self._source.rows(self._offset, self._offset + self._window_size)
+        self.prepare_rows(items)
+
+        # Only rows that changed, appeared or went away touch the Treeview
+        self.table.reconcile(
+            (item['id'], self.format_row(item), self.get_row_tags(item, position))
+            for position, item in enumerate(items, start=self._offset)
+        )
+
+        # The selected row may have scrolled back into the window
+        selected = str(self._selected_id)
+        if (self._selected_id is not None and selected in self.table
+                and selected not in self.tree.selection()):
+            self.tree.selection_set(selected)
+
+        if total:
+            self.vsb.set(self._offset / total, min(1.0, (self._offset + visible) / total))
+        else:
+            self.vsb.set(0, 1)
+
+    def _scroll_to(self, offset: int, force: bool = False):
+        offset = max(0, int(offset))
+        if force or offset != self._offset:
+            self._offset = offset
+            try:
+                self._render()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load data: {e}")
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            # A drag sends a burst of these; render only the latest position
+            # once the event queue is drained, so each one is not a page load
+            self._pending_moveto = float(amount)
+            if self._moveto_job is None:
+                self._moveto_job = self.after_idle(self._apply_moveto)
+        elif unit == "pages":
+            self._scroll_to(self._offset + int(amount) * self._visible_rows())
+        else:
+            self._scroll_to(self._offset + int(amount))
+
+    def _apply_moveto(self):
+        self._moveto_job = None
+        fraction, self._pending_moveto = self._pending_moveto, None
+        if fraction is not None:
+            self._scroll_to(fraction * len(self._source))
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        notches = event.delta / 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_to(self._offset - round(notches * 3))
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self._selected_id = self.get_selected_id()
+
+    def _on_key(self, step):
+        """Move the selection by keyboard, scrolling the window along with it."""
+        total = len(self._source)
+        if not total:
+            return "break"
+        visible = self._visible_rows()
+        children = self.tree.get_children()
+        selection = self.tree.selection()
+        current = (self._offset + children.index(selection[0])
+                   if selection and selection[0] in children else self._offset)
+
+        if step == "home":
+            target = 0
+        elif step == "end":
+            target = total - 1
+        elif step == "page":
+            target = current + visible
+        elif step == "-page":
+            target = current - visible
+        else:
+            target = current + step
+        target = max(0, min(total - 1, target))
+
+        if target < self._offset:
+            self._scroll_to(target)
+        elif target >= self._offset + visible:
+            self._scroll_to(target - visible + 1)
+
+        children = self.tree.get_children()
+        index = target - self._offset
+        if 0 <= index < len(children):
+            self.tree.selection_set(children[index])
+            self.tree.focus(children[index])
+        return "break"
     
+    def refresh_item(self, item_id: int):
+        """Re-read one record after an edit and patch just its row."""
+        try:
+            row = self.repository.get_listing_row(item_id)
+            if row is None:
+                self.remove_item(item_id)
+                return
+            self._source.replace(row)
+            iid = str(item_id)
+            if iid in self.table:
+                position = self._offset + self.tree.index(iid)
+                self.prepare_rows([row])
+                self.table.patch(iid, self.format_row(row), self.get_row_tags(row, position))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load data: {e}")
+
+    def remove_item(self, item_id: int, version_before=None):
+        """
+        Drop a deleted record's row and move the rows below it up, without a
+        reload. version_before is data_version() from just before the
+        delete: if the rows were current then, the delete is the only change
+        and the change poll is told not to reload the listing for it.
+        """
+        self.table.remove(item_id)
+        if self._selected_id == item_id:
+            self._selected_id = None
+        try:
+            if not self._source.remove(item_id):
+                # Not loaded, so where it sat in the listing is unknown
+                self.refresh()
+                return
+            if version_before is not None and version_before == self._loaded_version:
+                self._loaded_version = self.data_version()
+            self._render()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load data: {e}")
+
     def on_search(self):
-        """Handle search input."""
-        self.refresh()
+        """Handle search input (debounced, runs off the Tk thread)."""
+        self.search.submit(self.search_var.get().strip())
+
+    def _apply_search(self, source):
+        # A refresh still in flight was started for the previous term
+        self.loader.cancel()
+        self._offset = 0
+        self._apply_source(source)
+
+    def search_stats(self) -> dict:
+        """Search latency metrics, for tuning SEARCH_DEBOUNCE_MS."""
+        return self.search.stats()
 
     @abstractmethod
     def on_add(self):
@@ -263,9 +660,10 @@ class BaseView(ttk.Frame, ABC):
             return
         
         try:
+            version = self.data_version()
             self.repository.delete(item_id)
+            self.remove_item(item_id, version_before=version)
             messagebox.showinfo("Success", "Item deleted successfully!")
-            self.refresh()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to delete: {e}")
 
@@ -274,16 +672,55 @@ class BaseView(ttk.Frame, ABC):
         """Handle view/read action."""
         pass
     
+    def get_export_columns(self) -> List[str]:
+        """Row keys written by on_export."""
+        return self.get_columns()
+    
+    def iter_export_chunks(self):
+        """Batches of rows to export; runs on a worker thread."""
+        return self.repository.iter_chunks(self.get_sort(), EXPORT_CHUNK_SIZE)
+    
     def on_export(self):
-        """Handle export action."""
-        from utils.exports import export_to_csv
-        try:
-            items = self.fetch_data()
-            filename = f"{self.get_table_name()}_export.csv"
-            export_to_csv(items, self.get_columns(), filename)
+        """Export the whole table to CSV, streamed in the background."""
+        from utils.exports import stream_to_csv
+        
+        table = self.get_table_name()
+        filename = f"{table}_export.csv" + (".gz" if EXPORT_GZIP else "")
+        columns = self.get_export_columns()
+        headers = [col.replace("_", " ").title() for col in columns]
+        progress = {"rows": 0, "total": 0, "done": False}
+        status = getattr(self.winfo_toplevel(), "update_status", None)
+        
+        def run():
+            progress["total"] = self.repository.count()
+            chunks = self.iter_export_chunks()
+            try:
+                return stream_to_csv(chunks, columns, filename, headers=headers, compress=EXPORT_GZIP,
+                                     progress=lambda n: progress.__setitem__("rows", n))
+            finally:
+                chunks.close()
+        
+        def show_progress():
+            if progress["done"] or status is None:
+                return
+            total = progress["total"]
+            percent = f" ({progress['rows'] * 100 // total}%)" if total else ""
+            status(f"Exporting {table}: {progress['rows']:,} rows{percent}")
+            self.after(250, show_progress)
+        
+        def finished(count):
+            progress["done"] = True
+            if status is not None:
+                status(f"Exported {count:,} rows to {filename}")
             messagebox.showinfo("Success", f"Data exported to {filename}")
-        except Exception as e:
+        
+        def failed(e):
+            progress["done"] = True
             messagebox.showerror("Error", f"Export failed: {e}")
+        
+        # A loader of its own, so a refresh cannot supersede the export
+        BackgroundLoader(self).load(run, finished, on_error=failed)
+        show_progress()
     
     @abstractmethod
     def get_table_name(self) -> str:
@@ -0,0 +1,81 @@
+class TreeReconciler:
+    """
+    Keeps a Treeview in step with rows keyed by database id.
+
+    Instead of deleting every item and inserting them again, reconcile()
+    compares the wanted rows with what was last written and only touches
+    items that were added, removed, moved or changed. Items keep their iid
+    (the record id), so selection and focus survive a refresh.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        # iid -> (values, tags) as last written to the tree
+        self._written = {}
+        self.last_changes = {"inserted": 0, "updated": 0, "moved": 0, "deleted": 0}
+
+    def reconcile(self, rows):
+        """
+        Make the tree show exactly these rows, in this order.
+
+        Args:
+            rows: Iterable of (iid, values, tags) tuples
+        """
+        rows = [(str(iid), tuple(values), tuple(tags)) for iid, values, tags in rows]
+        wanted = {iid for iid, _, _ in rows}
+        changes = {"inserted": 0, "updated": 0, "moved": 0, "deleted": 0}
+
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                self._written.pop(iid, None)
+            changes["deleted"] = len(stale)
+
+        current = list(self.tree.get_children())
+        for index, (iid, values, tags) in enumerate(rows):
+            if iid not in self._written:
+                self.tree.insert("", index, iid=iid, values=values, tags=tags)
+                current.insert(index, iid)
+                changes["inserted"] += 1
+            else:
+                if self._written[iid] != (values, tags):
+                    self.tree.item(iid, values=values, tags=tags)
+                    changes["updated"] += 1
+                if index >= len(current) or current[index] != iid:
+                    self.tree.move(iid, "", index)
+                    current.remove(iid)
+                    current.insert(index, iid)
+                    changes["moved"] += 1
+            self._written[iid] = (values, tags)
+
+        self.last_changes = changes
+        return changes
+
+    def patch(self, iid, values, tags=None) -> bool:
+        """Update one row in place. Returns False if it is not in the tree."""
+        iid = str(iid)
+        if iid not in self._written:
+            return False
+        values = tuple(values)
+        tags = tuple(tags) if tags is not None else self._written[iid][1]
+        if self._written[iid] != (values, tags):
+            self.tree.item(iid, values=values, tags=tags)
+            self._written[iid] = (values, tags)
+        return True
+
+    def remove(self, iid) -> bool:
+        """Remove one row. Returns False if it is not in the tree."""
+        iid = str(iid)
+        if iid not in self._written:
+            return False
+        self.tree.delete(iid)
+        del self._written[iid]
+        return True
+
+    def __contains__(self, iid):
+        return str(iid) in self._written
+
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self._written.clear()
@@ -1,7 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from datetime import datetime
 from typing import Dict, List, Callable, Optional
 from config.translation import GREEK as t
+from database.snapshots import ID_FORMAT as SNAPSHOT_ID_FORMAT
+from ui.components.loader import BackgroundLoader, feed_in_chunks
+from ui.components.search_bar import SearchPipeline
 
 class FormDialog(tk.Toplevel):
     def __init__(self, parent, title: str, fields: List[Dict], initial_data: Optional[Dict] = None,
@@ -141,6 +145,9 @@ class FormDialog(tk.Toplevel):
 class DetailsDialog(tk.Toplevel):
     """Generic dialog for displaying item details."""
     
+    # Internal columns that mean nothing to the user
+    HIDDEN_FIELDS = {"name_norm"}
+    
     def __init__(self, parent, title: str, data: Dict,field_translations: Optional[Dict] = None):
         super().__init__(parent)
         self.title(title)
@@ -158,7 +165,8 @@ class DetailsDialog(tk.Toplevel):
         frame.pack(fill="both", expand=True)
         
         # Create label-value pairs
-        for idx, (key, value) in enumerate(data.items()):
+        visible = [(k, v) for k, v in data.items() if k not in self.HIDDEN_FIELDS]
+        for idx, (key, value) in enumerate(visible):
             if key in self.field_translations:
                 label = self.field_translations[key]
             elif key in t:
@@ -187,19 +195,32 @@ class DetailsDialog(tk.Toplevel):
             self.geometry(f"+{x}+{y}")
 
 class CustomerSelectDialog(tk.Toplevel):
-    """Dialog for selecting a customer."""
+    """
+    Dialog for selecting a customer.
+    
+    Args:
+        search: Callable(term) -> at most limit customers matching term
+                ("" for the first ones); runs off the Tk thread
+        limit: How many customers search returns at most
+    """
     
-    def __init__(self, parent, customers: list):
+    def __init__(self, parent, search, limit: Optional[int] = None):
         super().__init__(parent)
         self.title("Select Customer")
         self.result = None
-        self.customers = customers
+        self.customers = []
+        self.limit = limit
+        self.search = SearchPipeline(
+            self, search, self._show_customers,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load customers:\n{e}", parent=self),
+        )
         
         self.transient(parent)
         self.grab_set()
         
         self.setup_ui()
         self.center_on_parent(parent)
+        self.search.submit("")
     
     def setup_ui(self):
         """Create UI."""
@@ -208,6 +229,16 @@ class CustomerSelectDialog(tk.Toplevel):
         
         ttk.Label(frame, text="Choose a customer:", font=("", 10, "bold")).pack(anchor="w", pady=(0, 10))
         
+        # Search by name or phone
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.search.submit(self.search_var.get().strip()))
+        search_entry = ttk.Entry(frame, textvariable=self.search_var)
+        search_entry.pack(fill="x", pady=(0, 5))
+        search_entry.focus_set()
+        
+        self.count_label = ttk.Label(frame, text="")
+        self.count_label.pack(anchor="w", pady=(0, 5))
+        
         # Create listbox with customer names
         listbox_frame = ttk.Frame(frame)
         listbox_frame.pack(fill="both", expand=True, pady=(0, 10))
@@ -219,10 +250,6 @@ class CustomerSelectDialog(tk.Toplevel):
         self.listbox.pack(side="left", fill="both", expand=True)
         scrollbar.config(command=self.listbox.yview)
         
-        for customer in self.customers:
-            display_text = f"{customer['name']} - {customer['phone']}"
-            self.listbox.insert("end", display_text)
-        
         self.listbox.bind("<Double-1>", lambda e: self.on_ok())
         
         # Buttons
@@ -252,6 +279,95 @@ class CustomerSelectDialog(tk.Toplevel):
         self.result = None
         self.destroy()
     
+    def destroy(self):
+        self.search.close()
+        super().destroy()
+    
+    def _show_customers(self, customers):
+        """Replace the list with a search result."""
+        self.customers = list(customers)
+        self.listbox.delete(0, "end")
+        for customer in self.customers:
+            self.listbox.insert("end", f"{customer['name']} - {customer['phone']}")
+        if self.limit and len(self.customers) >= self.limit:
+            self.count_label.configure(text=f"Showing the first {len(self.customers)}; type to narrow")
+        elif not self.customers:
+            self.count_label.configure(text="No matching customers")
+        else:
+            self.count_label.configure(text="")
+    
+    def center_on_parent(self, parent):
+        """Center dialog on parent."""
+        self.update_idletasks()
+        if parent.winfo_ismapped():
+            x = parent.winfo_rootx() + (parent.winfo_width() // 2) - (self.winfo_width() // 2)
+            y = parent.winfo_rooty() + (parent.winfo_height() // 2) - (self.winfo_height() // 2)
+            self.geometry(f"+{x}+{y}")
+
+
+class SnapshotSelectDialog(tk.Toplevel):
+    """Dialog for picking a snapshot to restore, newest first."""
+    
+    def __init__(self, parent, snapshots: list):
+        super().__init__(parent)
+        self.title("Restore Snapshot")
+        self.result = None
+        self.snapshots = sorted(snapshots, reverse=True)
+        
+        self.transient(parent)
+        self.grab_set()
+        
+        self.setup_ui()
+        self.center_on_parent(parent)
+    
+    def setup_ui(self):
+        """Create UI."""
+        frame = ttk.Frame(self, padding=20)
+        frame.pack(fill="both", expand=True)
+        
+        ttk.Label(frame, text="Restore the database as it was at:", font=("", 10, "bold")).pack(anchor="w", pady=(0, 10))
+        
+        listbox_frame = ttk.Frame(frame)
+        listbox_frame.pack(fill="both", expand=True, pady=(0, 10))
+        
+        scrollbar = ttk.Scrollbar(listbox_frame)
+        scrollbar.pack(side="right", fill="y")
+        
+        self.listbox = tk.Listbox(listbox_frame, yscrollcommand=scrollbar.set, height=12)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar.config(command=self.listbox.yview)
+        
+        for snapshot_id in self.snapshots:
+            taken = datetime.strptime(snapshot_id, SNAPSHOT_ID_FORMAT)
+            self.listbox.insert("end", taken.strftime("%Y-%m-%d %H:%M:%S"))
+        
+        self.listbox.bind("<Double-1>", lambda e: self.on_ok())
+        
+        # Buttons
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill="x")
+        
+        ttk.Button(btn_frame, text="Cancel", command=self.on_cancel).pack(side="right", padx=(5, 0))
+        ttk.Button(btn_frame, text="Restore", command=self.on_ok).pack(side="right")
+        
+        self.bind("<Return>", lambda e: self.on_ok())
+        self.bind("<Escape>", lambda e: self.on_cancel())
+    
+    def on_ok(self):
+        """Confirm selection."""
+        selection = self.listbox.curselection()
+        if not selection:
+            messagebox.showwarning("No Selection", "Please select a snapshot.")
+            return
+        
+        self.result = self.snapshots[selection[0]]
+        self.destroy()
+    
+    def on_cancel(self):
+        """Cancel selection."""
+        self.result = None
+        self.destroy()
+    
     def center_on_parent(self, parent):
         """Center dialog on parent."""
         self.update_idletasks()
@@ -364,6 +480,8 @@ class OrderSearchDialog(tk.Toplevel):
                        value="status").pack(anchor="w", pady=2)
         ttk.Radiobutton(frame, text="Bolt/Product Name", variable=self.search_type, 
                        value="bolt").pack(anchor="w", pady=2)
+        ttk.Radiobutton(frame, text="Order Notes", variable=self.search_type, 
+                       value="notes").pack(anchor="w", pady=2)
         
         # Search value
         ttk.Label(frame, text="Search Value:", font=("", 10)).pack(anchor="w", pady=(15, 5))
@@ -409,21 +527,47 @@ class OrderSearchDialog(tk.Toplevel):
 
 
 class OrderDetailsDialog(tk.Toplevel):
-    """Dialog for displaying complete order details."""
+    """Dialog for displaying complete order details.
+    
+    Pass either the order dict or a load callable returning it; a load runs
+    in the background while the dialog shows a loading message.
+    """
     
-    def __init__(self, parent, order: dict):
+    def __init__(self, parent, order: Optional[dict] = None, load: Optional[Callable[[], dict]] = None):
         super().__init__(parent)
-        self.title(f"Order #{order['id']} Details")
+        self.title("Order Details")
         self.order = order
+        self.parent = parent
         
         self.transient(parent)
         self.grab_set()
         
-        self.setup_ui()
+        if order is not None:
+            self.setup_ui()
+        else:
+            self.loading_label = ttk.Label(self, text="⏳ Loading order...", padding=40)
+            self.loading_label.pack()
+            self.loader = BackgroundLoader(self)
+            self.loader.load(load, self._on_loaded, on_error=self._on_load_error)
         self.center_on_parent(parent)
     
+    def _on_loaded(self, order):
+        if not order:
+            messagebox.showerror("Error", "Order not found.", parent=self.parent)
+            self.destroy()
+            return
+        self.order = order
+        self.loading_label.destroy()
+        self.setup_ui()
+        self.center_on_parent(self.parent)
+    
+    def _on_load_error(self, error):
+        messagebox.showerror("Error", f"Failed to load order details:\n{error}", parent=self.parent)
+        self.destroy()
+    
     def setup_ui(self):
         """Create UI."""
+        self.title(f"Order #{self.order['id']} Details")
         main_frame = ttk.Frame(self, padding=20)
         main_frame.pack(fill="both", expand=True)
         
@@ -464,11 +608,14 @@ class OrderDetailsDialog(tk.Toplevel):
         items_tree.column("bolt", width=300)
         items_tree.column("quantity", width=100, anchor="e")
         
-        for item in self.order.get('items', []):
-            items_tree.insert("", "end", values=(
-                item.get('bolt_name', 'Unknown'),
-                item.get('quantity', 0)
-            ))
+        def insert_items(chunk):
+            for item in chunk:
+                items_tree.insert("", "end", values=(
+                    item.get('bolt_name', 'Unknown'),
+                    item.get('quantity', 0)
+                ))
+        
+        feed_in_chunks(self, self.order.get('items', []), insert_items)
         
         items_tree.pack(fill="both", expand=True)
         
@@ -513,11 +660,13 @@ class OrderDetailsDialog(tk.Toplevel):
 class OrderListDialog(tk.Toplevel):
     """Dialog for displaying a list of orders from search results."""
     
-    def __init__(self, parent, orders: list, on_open=None):
+    def __init__(self, parent, orders: list, on_open=None, limit: Optional[int] = None):
         super().__init__(parent)
         self.title("Search Results")
         self.orders = orders
         self.on_open = on_open
+        # The search was cut off at this many orders
+        self.limit = limit
         
         self.transient(parent)
         self.grab_set()
@@ -530,8 +679,12 @@ class OrderListDialog(tk.Toplevel):
         frame = ttk.Frame(self, padding=15)
         frame.pack(fill="both", expand=True)
         
-        ttk.Label(frame, text=f"Found {len(self.orders)} order(s)", 
-                 font=("", 10, "bold")).pack(pady=(0, 10))
+        found = len(self.orders)
+        if self.limit and found >= self.limit:
+            summary = f"Showing the first {found} orders"
+        else:
+            summary = f"Found {found} order(s)"
+        ttk.Label(frame, text=summary, font=("", 10, "bold")).pack(pady=(0, 10))
         
         # Create treeview
         cols = ("id", "customer", "status", "date", "items")
@@ -548,14 +701,18 @@ class OrderListDialog(tk.Toplevel):
         self.tree.column("date", width=140)
         self.tree.column("items", width=80, anchor="e")
         
-        for order in self.orders:
-            self.tree.insert("", "end", values=(
-                order.get('id'),
-                order.get('customer_name', 'Unknown'),
-                order.get('status', ''),
-                order.get('order_date', '')[:16],
-                order.get('total_items', 0)
-            ))
+        def insert_orders(chunk):
+            for order in chunk:
+                self.tree.insert("", "end", values=(
+                    order.get('id'),
+                    order.get('customer_name', 'Unknown'),
+                    order.get('status', ''),
+                    order.get('order_date', '')[:16],
+                    order.get('total_items', 0)
+                ))
+        
+        # Up to a few hundred rows; insert without blocking the UI
+        feed_in_chunks(self, self.orders, insert_orders)
         
         self.tree.pack(fill="both", expand=True)
         self.tree.bind("<Double-1>", lambda e: self._open_selected())
@@ -593,20 +750,33 @@ class OrderListDialog(tk.Toplevel):
             self.geometry(f"+{x}+{y}")
     
 class OrderItemsDialog(tk.Toplevel):
-    """Dialog for selecting order items with dropdown and quantity."""
+    """
+    Dialog for selecting order items with dropdown and quantity.
+    
+    Args:
+        search: Callable(term) -> at most limit bolts matching term
+                ("" for the first ones); runs off the Tk thread
+        limit: How many bolts search returns at most
+    """
     
-    def __init__(self, parent, bolts: list):
+    def __init__(self, parent, search, limit: Optional[int] = None):
         super().__init__(parent)
         self.title("Add Order Items")
         self.result = None
-        self.bolts = bolts
+        self.bolts = []
+        self.limit = limit
         self.items = {}  
+        self.search = SearchPipeline(
+            self, search, self._show_bolts,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load bolts:\n{e}", parent=self),
+        )
         
         self.transient(parent)
         self.grab_set()
         
         self.setup_ui()
         self.center_on_parent(parent)
+        self.search.submit("")
     
     def setup_ui(self):
         """Create UI."""
@@ -624,26 +794,31 @@ class OrderItemsDialog(tk.Toplevel):
         input_frame = ttk.LabelFrame(main_frame, text="Add Item", padding=15)
         input_frame.pack(fill="x", pady=(0, 10))
         
+        # Narrows the bolt dropdown by name, type or stamp
+        ttk.Label(input_frame, text="Find:").grid(row=0, column=0, sticky="w", pady=5, padx=(0, 10))
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.search.submit(self.search_var.get().strip()))
+        ttk.Entry(input_frame, textvariable=self.search_var, width=40).grid(row=0, column=1, sticky="ew", pady=5)
+        
         # Bolt selection
-        ttk.Label(input_frame, text="Bolt:").grid(row=0, column=0, sticky="w", pady=5, padx=(0, 10))
+        ttk.Label(input_frame, text="Bolt:").grid(row=1, column=0, sticky="w", pady=5, padx=(0, 10))
         self.bolt_var = tk.StringVar()
-        bolt_names = [f"{b['name']} (Stock: {b['quantity']})" for b in self.bolts]
         self.bolt_combo = ttk.Combobox(
             input_frame,
             textvariable=self.bolt_var,
-            values=bolt_names,
+            values=[],
             state="readonly",
             width=40
         )
-        self.bolt_combo.grid(row=0, column=1, sticky="ew", pady=5)
-        if bolt_names:
-            self.bolt_combo.current(0)
+        self.bolt_combo.grid(row=1, column=1, sticky="ew", pady=5)
+        self.count_label = ttk.Label(input_frame, text="")
+        self.count_label.grid(row=2, column=1, sticky="w")
         
         # Quantity
-        ttk.Label(input_frame, text="Quantity:").grid(row=1, column=0, sticky="w", pady=5, padx=(0, 10))
+        ttk.Label(input_frame, text="Quantity:").grid(row=3, column=0, sticky="w", pady=5, padx=(0, 10))
         self.quantity_var = tk.StringVar(value="1")
         quantity_entry = ttk.Entry(input_frame, textvariable=self.quantity_var, width=15)
-        quantity_entry.grid(row=1, column=1, sticky="w", pady=5)
+        quantity_entry.grid(row=3, column=1, sticky="w", pady=5)
         
         input_frame.columnconfigure(1, weight=1)
         
@@ -653,7 +828,7 @@ class OrderItemsDialog(tk.Toplevel):
             text="➕ Add Item",
             command=self.add_item,
             bootstyle="success"
-        ).grid(row=2, column=0, columnspan=2, pady=(10, 0))
+        ).grid(row=4, column=0, columnspan=2, pady=(10, 0))
         
         # Items list frame
         list_frame = ttk.LabelFrame(main_frame, text="Order Items", padding=15)
@@ -779,6 +954,161 @@ class OrderItemsDialog(tk.Toplevel):
         self.result = None
         self.destroy()
     
+    def destroy(self):
+        self.search.close()
+        super().destroy()
+    
+    def _show_bolts(self, bolts):
+        """Offer a search result in the dropdown, keeping the choice if it is still there."""
+        self.bolts = list(bolts)
+        names = [f"{b['name']} (Stock: {b['quantity']})" for b in self.bolts]
+        self.bolt_combo.configure(values=names)
+        if self.bolt_var.get() not in names:
+            self.bolt_var.set(names[0] if names else "")
+        if self.limit and len(self.bolts) >= self.limit:
+            self.count_label.configure(text=f"Showing the first {len(self.bolts)}; type to narrow")
+        elif not self.bolts:
+            self.count_label.configure(text="No matching bolts")
+        else:
+            self.count_label.configure(text="")
+    
+    def center_on_parent(self, parent):
+        """Center dialog on parent."""
+        self.update_idletasks()
+        if parent.winfo_ismapped():
+            x = parent.winfo_rootx() + (parent.winfo_width() // 2) - (self.winfo_width() // 2)
+            y = parent.winfo_rooty() + (parent.winfo_height() // 2) - (self.winfo_height() // 2)
+            self.geometry(f"+{x}+{y}")
+
+
+class QueryProfilerDialog(tk.Toplevel):
+    """Live view of the SQL statements and repository methods that cost the most time."""
+    
+    REFRESH_MS = 2000
+    
+    def __init__(self, parent, profiler, on_disable=None):
+        super().__init__(parent)
+        self.title("Query Profiler")
+        self.geometry("1000x600")
+        self.profiler = profiler
+        # Called by "Stop Profiling"; the button is hidden without it
+        self.on_disable = on_disable
+        self._after_id = None
+        # Not modal: it is meant to stay open while the app is used
+        self.transient(parent)
+        
+        self.setup_ui()
+        self.refresh()
+        self.center_on_parent(parent)
+    
+    def setup_ui(self):
+        """Create UI."""
+        frame = ttk.Frame(self, padding=15)
+        frame.pack(fill="both", expand=True)
+        
+        self.summary_label = ttk.Label(frame, font=("", 10, "bold"))
+        self.summary_label.pack(anchor="w", pady=(0, 10))
+        
+        notebook = ttk.Notebook(frame)
+        notebook.pack(fill="both", expand=True)
+        
+        # Statements, by total time
+        statements_frame = ttk.Frame(notebook, padding=5)
+        notebook.add(statements_frame, text="Statements")
+        cols = ("total", "calls", "avg", "max", "rows", "slow", "caller", "sql")
+        self.statements = ttk.Treeview(statements_frame, columns=cols, show="headings", height=14)
+        for col, text, width, anchor in (
+            ("total", "Total ms", 80, "e"), ("calls", "Calls", 60, "e"), ("avg", "Avg ms", 70, "e"),
+            ("max", "Max ms", 70, "e"), ("rows", "Rows", 70, "e"), ("slow", "Slow", 50, "e"),
+            ("caller", "Caller", 220, "w"), ("sql", "Statement", 400, "w"),
+        ):
+            self.statements.heading(col, text=text)
+            self.statements.column(col, width=width, anchor=anchor, stretch=(col == "sql"))
+        self.statements.pack(fill="both", expand=True)
+        self.statements.bind("<<TreeviewSelect>>", self._show_statement)
+        
+        self.sql_text = tk.Text(statements_frame, height=6, wrap="word")
+        self.sql_text.pack(fill="x", pady=(5, 0))
+        
+        # Repository methods, by time spent holding a connection
+        callers_frame = ttk.Frame(notebook, padding=5)
+        notebook.add(callers_frame, text="Repository Methods")
+        cols = ("caller", "calls", "total", "avg")
+        self.callers = ttk.Treeview(callers_frame, columns=cols, show="headings")
+        for col, text, width, anchor in (
+            ("caller", "Method", 400, "w"), ("calls", "Calls", 80, "e"),
+            ("total", "Total ms", 100, "e"), ("avg", "Avg ms", 100, "e"),
+        ):
+            self.callers.heading(col, text=text)
+            self.callers.column(col, width=width, anchor=anchor)
+        self.callers.pack(fill="both", expand=True)
+        
+        # Buttons
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill="x", pady=(10, 0))
+        
+        ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side="right", padx=(5, 0))
+        ttk.Button(btn_frame, text="Reset", command=self.on_reset).pack(side="right", padx=(5, 0))
+        ttk.Button(btn_frame, text="Refresh", command=self.refresh).pack(side="right")
+        if self.on_disable:
+            ttk.Button(btn_frame, text="Stop Profiling", command=self._stop).pack(side="left")
+        
+        self.bind("<Escape>", lambda e: self.destroy())
+    
+    def _stop(self):
+        """Turn profiling off and close."""
+        self.on_disable()
+        self.destroy()
+    
+    def refresh(self):
+        """Reload the statistics, keeping the selection."""
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+        self._top = self.profiler.top(100)
+        selected = self.statements.selection()
+        
+        self.statements.delete(*self.statements.get_children())
+        for index, row in enumerate(self._top):
+            self.statements.insert("", "end", iid=str(index), values=(
+                f"{row['total_ms']:.1f}", row['calls'], f"{row['avg_ms']:.2f}", f"{row['max_ms']:.2f}",
+                row['rows'], row['slow'], row['caller'], row['sql'][:200]
+            ))
+        if selected and self.statements.exists(selected[0]):
+            self.statements.selection_set(selected[0])
+        
+        self.callers.delete(*self.callers.get_children())
+        for row in self.profiler.callers(100):
+            self.callers.insert("", "end", values=(
+                row['caller'], row['calls'], f"{row['total_ms']:.1f}", f"{row['avg_ms']:.2f}"
+            ))
+        
+        total = sum(row['total_ms'] for row in self._top)
+        self.summary_label.configure(
+            text=f"{len(self._top)} statement(s), {total:,.0f} ms in SQL "
+                 f"(slow-query threshold {self.profiler.slow_ms:g} ms)"
+        )
+        self._after_id = self.after(self.REFRESH_MS, self.refresh)
+    
+    def destroy(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        super().destroy()
+    
+    def _show_statement(self, event=None):
+        """Show the full text of the selected statement."""
+        selection = self.statements.selection()
+        if not selection:
+            return
+        self.sql_text.delete("1.0", "end")
+        self.sql_text.insert("1.0", self._top[int(selection[0])]['sql'])
+    
+    def on_reset(self):
+        """Start counting from zero."""
+        self.profiler.reset()
+        self.sql_text.delete("1.0", "end")
+        self.refresh()
+    
     def center_on_parent(self, parent):
         """Center dialog on parent."""
         self.update_idletasks()
@@ -0,0 +1,148 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import tkinter as tk
+
+from config.settings import LOADER_WORKERS
+
+logger = logging.getLogger("PowerLock.ui")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=LOADER_WORKERS, thread_name_prefix="loader")
+        return _executor
+
+
+def shutdown_loaders():
+    """Stop the shared worker threads; queued loads are dropped."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _alive(widget) -> bool:
+    try:
+        return bool(widget.winfo_exists())
+    except tk.TclError:
+        return False
+
+
+def feed_in_chunks(widget, rows, consume, chunk_size: int = 200,
+                   is_current=None, on_done=None):
+    """
+    Hand rows to consume() a chunk per Tk event-loop turn.
+
+    Long inserts into a Treeview otherwise block redraws and input until the
+    last row is in. Stops quietly once is_current() turns False or the
+    widget is destroyed.
+    """
+    rows = list(rows)
+
+    def step(start):
+        if not _alive(widget) or (is_current is not None and not is_current()):
+            return
+        consume(rows[start:start + chunk_size])
+        if start + chunk_size < len(rows):
+            widget.after(1, step, start + chunk_size)
+        elif on_done is not None:
+            on_done()
+
+    step(0)
+
+
+class BackgroundLoader:
+    """
+    Runs blocking loads on the shared worker pool for one widget.
+
+    Worker threads never touch Tk: the widget polls the future with after()
+    and calls back on the Tk thread. Each load() supersedes the previous
+    one, whose result is discarded when it arrives.
+
+    Args:
+        widget: Widget the callbacks belong to; nothing runs after it is destroyed
+        on_busy: Optional callable(bool) to show or hide a loading state
+    """
+
+    POLL_MS = 15
+
+    def __init__(self, widget, on_busy=None):
+        self.widget = widget
+        self.on_busy = on_busy
+        self._generation = 0
+        self._busy = False
+
+    def load(self, fetch, on_done, on_error=None, on_chunk=None, chunk_size: int = 200) -> int:
+        """
+        Run fetch() on a worker thread.
+
+        Args:
+            fetch: Callable returning the data; runs off the Tk thread
+            on_done: Called with the result on the Tk thread. With on_chunk
+                     set, it is called without arguments after the last chunk
+            on_error: Called with the exception; defaults to logging it
+            on_chunk: Optional callable(rows) to receive a list result in
+                      chunks, one per event-loop turn
+
+        Returns:
+            The request number; compare with current() to detect staleness
+        """
+        self._generation += 1
+        generation = self._generation
+        future = _get_executor().submit(fetch)
+        self._set_busy(True)
+        self.widget.after(self.POLL_MS, self._poll, generation, future,
+                          on_done, on_error, on_chunk, chunk_size)
+        return generation
+
+    def current(self) -> int:
+        return self._generation
+
+    def cancel(self):
+        """Forget any load in flight; its result will be discarded."""
+        self._generation += 1
+        self._set_busy(False)
+
+    def _poll(self, generation, future, on_done, on_error, on_chunk, chunk_size):
+        if generation != self._generation or not _alive(self.widget):
+            future.cancel()
+            return
+        if not future.done():
+            self.widget.after(self.POLL_MS, self._poll, generation, future,
+                              on_done, on_error, on_chunk, chunk_size)
+            return
+
+        try:
+            result = future.result()
+        except Exception as e:
+            self._set_busy(False)
+            logger.error(f"Background load failed: {e}")
+            if on_error is not None:
+                on_error(e)
+            return
+
+        if on_chunk is None:
+            self._set_busy(False)
+            on_done(result)
+            return
+
+        def finish():
+            self._set_busy(False)
+            on_done()
+
+        feed_in_chunks(self.widget, result or [], on_chunk, chunk_size,
+                       is_current=lambda: generation == self._generation, on_done=finish)
+
+    def _set_busy(self, busy: bool):
+        if busy != self._busy:
+            self._busy = busy
+            if self.on_busy is not None and _alive(self.widget):
+                self.on_busy(busy)
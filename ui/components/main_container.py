@@ -1,10 +1,18 @@
+import time
+from collections import OrderedDict
+
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 
+from config.settings import VIEW_CACHE_SIZE, VIEW_IDLE_MINUTES
+
 
 class MainContainer(ttk.Frame):
     """Main application container with sidebar navigation"""
     
+    # How often hidden views are checked for idleness
+    IDLE_CHECK_MS = 60 * 1000
+    
     def __init__(self, parent):
         super().__init__(parent)
         self.pack(fill=BOTH, expand=YES)
@@ -13,7 +21,16 @@ class MainContainer(ttk.Frame):
         self.current_view = None
         self.current_view_widget = None
         
+        # Views stay alive while hidden; name -> widget, least recently shown first
+        self.view_cache = OrderedDict()
+        self.max_cached_views = VIEW_CACHE_SIZE
+        # name -> monotonic time the view was hidden
+        self.hidden_since = {}
+        self.view_idle_seconds = VIEW_IDLE_MINUTES * 60
+        
         self._setup_ui()
+        if self.view_idle_seconds > 0:
+            self.after(self.IDLE_CHECK_MS, self._evict_idle_views)
         
     def _setup_ui(self):
         """Setup the main UI structure"""
@@ -119,16 +136,54 @@ class MainContainer(ttk.Frame):
         if hasattr(self.master, 'on_view_change'):
             self.master.on_view_change(view_name)
         
-    def load_view(self, view_widget):
-        """Load a view widget into the content area"""
-        # Clear existing view
-        if self.current_view_widget:
-            self.current_view_widget.destroy()
-        
-        # Load new view
+    def show_view(self, name, factory):
+        """
+        Show a view, creating it with factory(content_frame) only if it is not cached.
+        
+        Returns:
+            (view_widget, created)
+        """
+        view_widget = self.view_cache.get(name)
+        created = view_widget is None
+        if created:
+            view_widget = factory(self.content_frame)
+            self.view_cache[name] = view_widget
+        self.view_cache.move_to_end(name)
+        
+        # Hide, don't destroy, the previous view
+        if self.current_view_widget is not None and self.current_view_widget is not view_widget:
+            self.current_view_widget.pack_forget()
+            for cached_name, cached in self.view_cache.items():
+                if cached is self.current_view_widget:
+                    self.hidden_since[cached_name] = time.monotonic()
+        self.hidden_since.pop(name, None)
         self.current_view_widget = view_widget
-        self.current_view_widget.pack(fill=BOTH, expand=YES)
+        view_widget.pack(fill=BOTH, expand=YES)
         
+        self._evict_views()
+        return view_widget, created
+    
+    def _evict_views(self):
+        """Destroy the least recently shown views beyond the cache size."""
+        while len(self.view_cache) > max(1, self.max_cached_views):
+            name, view_widget = next(iter(self.view_cache.items()))
+            if view_widget is self.current_view_widget:
+                break
+            self._destroy_view(name)
+    
+    def _evict_idle_views(self):
+        """Destroy views that have been hidden for longer than view_idle_seconds."""
+        now = time.monotonic()
+        for name, hidden_at in list(self.hidden_since.items()):
+            if now - hidden_at >= self.view_idle_seconds:
+                self._destroy_view(name)
+        self.after(self.IDLE_CHECK_MS, self._evict_idle_views)
+    
+    def _destroy_view(self, name):
+        self.hidden_since.pop(name, None)
+        view_widget = self.view_cache.pop(name)
+        view_widget.destroy()
+    
     def get_content_frame(self):
         """Get the content frame for loading views"""
         return self.content_frame
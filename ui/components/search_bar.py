@@ -0,0 +1,180 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from database.connection import db
+
+logger = logging.getLogger("PowerLock.ui")
+
+# Returned by a worker whose search was superseded before it started
+_SUPERSEDED = object()
+
+
+def _percentile(values, pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class SearchPipeline:
+    """
+    Debounced search that runs off the Tk thread.
+
+    submit() is called on every keystroke. The query only starts once the
+    input has been quiet for debounce_ms; starting a new one interrupts the
+    previous query if it is still running, and only the newest result is
+    handed to on_result (on the Tk thread).
+
+    Args:
+        widget: Any Tk widget, used for after() scheduling
+        search: Callable(term) -> result, run on a worker thread
+        on_result: Callable(result), run on the Tk thread
+        on_error: Callable(exception), run on the Tk thread
+        debounce_ms: Quiet period before a query starts
+    """
+
+    POLL_MS = 15
+
+    def __init__(self, widget, search, on_result, on_error=None,
+                 debounce_ms: int = 250, history: int = 200):
+        self.widget = widget
+        self.search = search
+        self.on_result = on_result
+        self.on_error = on_error
+        self.debounce_ms = debounce_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._running = None        # (generation, thread ident) of the query in flight
+        self._pending = None        # latest submitted query awaiting its result
+        self._after_id = None
+        self._poll_id = None
+        self._typed_at = None
+        self._counts = {"submitted": 0, "executed": 0, "interrupted": 0,
+                        "superseded": 0, "applied": 0, "errors": 0}
+        self._query_times = deque(maxlen=history)
+        self._total_times = deque(maxlen=history)
+
+    def submit(self, term: str):
+        """Schedule a search for term, replacing any search not yet started."""
+        self._counts["submitted"] += 1
+        self._typed_at = time.perf_counter()
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(self.debounce_ms, self._start, term)
+
+    def _start(self, term: str):
+        self._after_id = None
+        self._generation += 1
+        generation = self._generation
+
+        # Must follow the generation bump: a worker that has not registered
+        # yet will see the new generation and skip its query
+        with self._lock:
+            running = self._running
+        if running is not None and running[0] != generation:
+            if db.interrupt(running[1]):
+                self._counts["interrupted"] += 1
+
+        if self._pending is not None:
+            self._counts["superseded"] += 1
+        future = self._executor.submit(self._run, generation, term)
+        self._pending = (generation, term, future, self._typed_at)
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.POLL_MS, self._poll)
+
+    def _run(self, generation: int, term: str):
+        """Worker side: run the search unless it is already out of date."""
+        with self._lock:
+            if generation != self._generation:
+                return _SUPERSEDED
+            self._running = (generation, threading.get_ident())
+        try:
+            started = time.perf_counter()
+            result = self.search(term)
+            return result, time.perf_counter() - started
+        finally:
+            with self._lock:
+                self._running = None
+
+    def _poll(self):
+        """Tk side: wait for the newest query and apply its result."""
+        self._poll_id = None
+        if self._pending is None:
+            return
+        generation, term, future, typed_at = self._pending
+        if not future.done():
+            self._poll_id = self.widget.after(self.POLL_MS, self._poll)
+            return
+        self._pending = None
+
+        try:
+            outcome = future.result()
+        except sqlite3.OperationalError as e:
+            if generation != self._generation or "interrupted" in str(e):
+                self._counts["superseded"] += 1
+                return
+            self._report_error(e)
+            return
+        except Exception as e:
+            self._report_error(e)
+            return
+
+        if outcome is _SUPERSEDED or generation != self._generation:
+            self._counts["superseded"] += 1
+            return
+
+        result, query_time = outcome
+        self._counts["executed"] += 1
+        try:
+            self.on_result(result)
+        except Exception as e:
+            self._report_error(e)
+            return
+        self._counts["applied"] += 1
+
+        total = time.perf_counter() - typed_at
+        self._query_times.append(query_time)
+        self._total_times.append(total)
+        logger.debug(f"Search '{term}': query {query_time * 1000:.1f} ms, "
+                     f"keystroke to screen {total * 1000:.1f} ms")
+
+    def _report_error(self, error: Exception):
+        self._counts["errors"] += 1
+        logger.error(f"Search failed: {error}")
+        if self.on_error:
+            self.on_error(error)
+
+    def stats(self) -> dict:
+        """
+        Counters and latency percentiles (milliseconds) of recent searches.
+
+        total_ms runs from the last keystroke to the result on screen, so it
+        includes the debounce window; query_ms is the worker time alone.
+        """
+        stats = dict(self._counts)
+        stats["debounce_ms"] = self.debounce_ms
+        for name, sample in (("query_ms", self._query_times), ("total_ms", self._total_times)):
+            stats[f"{name}_p50"] = round(_percentile(sample, 50) * 1000, 2)
+            stats[f"{name}_p95"] = round(_percentile(sample, 95) * 1000, 2)
+            stats[f"{name}_max"] = round(max(sample, default=0.0) * 1000, 2)
+        return stats
+
+    def close(self):
+        """Drop pending work and stop the worker thread."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._generation += 1
+        self._pending = None
+        with self._lock:
+            running = self._running
+        if running is not None:
+            db.interrupt(running[1])
+        self._executor.shutdown(wait=False)
@@ -1,20 +1,26 @@
+import logging
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import Menu, messagebox, filedialog, Text
 from datetime import datetime
-from shutil import copy2
 
-from config.settings import APP_TITLE, APP_GEOMETRY, DB_FILE
+from config.settings import APP_TITLE, APP_GEOMETRY, DB_FILE, CHANGE_POLL_MS, BACKUP_COMPRESSION
+from database.backup import COMPRESSORS, backup_database, backup_suffix
+from database.restore import restore_database, restore_snapshot
+from database.snapshots import BackupScheduler
 from database.schema import initialize_database
 from database.connection import db
+from database.profiler import profiler
+from database.change_tracker import tracker
+from database.repositories.bolt_repo import BoltRepository
+from ui.components.loader import BackgroundLoader, shutdown_loaders
+from ui.components.dialogs import QueryProfilerDialog, SnapshotSelectDialog
 from ui.components.main_container import MainContainer
 from ui.views.customer_view import CustomerView
 from ui.views.bolts_view import BoltsView
 from ui.views.orders_view import OrdersView
-from utils.logger import setup_logger
 
-# Setup logger
-logger = setup_logger()
+logger = logging.getLogger("PowerLock.ui")
 
 
 class MainWindow(ttk.Window):
@@ -28,6 +34,7 @@ class MainWindow(ttk.Window):
         self.title(APP_TITLE)
         self.geometry(APP_GEOMETRY)
         self.minsize(900, 600)
+        self._status_reset = None
         
         # Initialize database
         self._initialize_database()
@@ -43,13 +50,23 @@ class MainWindow(ttk.Window):
         # Handle window close
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
         
+        # Pick up writes made by other instances
+        self._last_data_version = None
+        if CHANGE_POLL_MS > 0:
+            self.after(CHANGE_POLL_MS, self._poll_changes)
+        
+        # Incremental snapshots in the background
+        self.backup_scheduler = BackupScheduler()
+        self.backup_scheduler.start()
+        
         logger.info("Application started successfully - Part 3")
     
     def _initialize_database(self):
         """Initialize the database and handle errors."""
         try:
-            initialize_database()
-            logger.info("Database initialized successfully")
+            version = initialize_database()
+            db.verify_pragmas()
+            logger.info(f"Database initialized successfully (schema v{version})")
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
             messagebox.showerror(
@@ -92,6 +109,7 @@ class MainWindow(ttk.Window):
         file_menu.add_separator()
         file_menu.add_command(label="Backup Database...", command=self._backup_database)
         file_menu.add_command(label="Restore Database...", command=self._restore_database)
+        file_menu.add_command(label="Restore Snapshot...", command=self._restore_snapshot)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self._on_closing)
         
@@ -110,8 +128,10 @@ class MainWindow(ttk.Window):
         # Tools menu
         tools_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Low Stock", command=self._show_low_stock)
         tools_menu.add_command(label="Pending Orders", command=self._show_pending_orders)
         tools_menu.add_command(label="Order Statistics", command=self._show_order_statistics)
+        tools_menu.add_command(label="Query Profiler", command=self._show_query_profiler)
         tools_menu.add_separator()
         tools_menu.add_command(label="Settings...", command=self._show_settings)
         
@@ -153,31 +173,31 @@ class MainWindow(ttk.Window):
     def on_view_change(self, view_name):
         """Handle navigation clicks - load real views"""
         try:
-            # Get content frame
-            content_frame = self.container.get_content_frame()
-            
-            # Create the appropriate view
+            # Pick the appropriate view
             if view_name == "customers":
-                view_widget = CustomerView(content_frame)
+                view_class = CustomerView
                 display_name = "Customers"
                 
             elif view_name == "bolts":
-                view_widget = BoltsView(content_frame)
+                view_class = BoltsView
                 display_name = "Bolts Inventory"
                 
             elif view_name == "orders":
-                view_widget = OrdersView(content_frame)
+                view_class = OrdersView
                 display_name = "Orders"
             else:
                 return
             
+            # Views are built once and kept; a cached one reloads only if data changed
+            view_widget, created = self.container.show_view(view_name, view_class)
+            if not created:
+                view_widget.refresh_if_stale()
+            
             # Store reference to current view
             self.current_view_widget = view_widget
             
-            # Load the view
-            self.container.load_view(view_widget)
             self.update_status(f"Viewing {display_name}")
-            logger.info(f"Loaded view: {display_name}")
+            logger.info(f"{'Loaded' if created else 'Switched to'} view: {display_name}")
             
         except Exception as e:
             logger.error(f"Failed to load view {view_name}: {e}")
@@ -191,10 +211,12 @@ class MainWindow(ttk.Window):
         """Refresh the currently active view."""
         try:
             current_view = self._get_current_view()
-            if current_view and hasattr(current_view, 'refresh'):
-                current_view.refresh()
-                self.update_status("Refreshed")
-                logger.info("Current view refreshed")
+            if current_view and hasattr(current_view, 'refresh_if_stale'):
+                if current_view.refresh_if_stale():
+                    self.update_status("Refreshed")
+                    logger.info("Current view refreshed")
+                else:
+                    self.update_status("Already up to date")
             else:
                 self.update_status("Nothing to refresh")
         except Exception as e:
@@ -254,62 +276,141 @@ class MainWindow(ttk.Window):
             #messagebox.showerror("Error", f"Failed to generate report:\n{e}")
     
     def _backup_database(self):
-        """Backup database to file."""
-        default_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+        """Backup database to file, in the background while work continues."""
+        suffix = ".db" + backup_suffix(BACKUP_COMPRESSION)
+        default_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}"
         filename = filedialog.asksaveasfilename(
-            defaultextension=".db",
+            defaultextension=suffix,
             initialfile=default_name,
-            filetypes=[("Database files", "*.db"), ("All files", "*.*")]
+            filetypes=[("Database files", "*.db"), ("Compressed backups", "*.db.gz *.db.xz"),
+                       ("All files", "*.*")]
         )
         
-        if filename:
-            try:
-                copy2(DB_FILE, filename)
-                messagebox.showinfo(
-                    "Success",
-                    f"Database backed up successfully!\n\nLocation:\n{filename}"
-                )
-                logger.info(f"Database backed up to {filename}")
-            except Exception as e:
-                logger.error(f"Backup failed: {e}")
-                messagebox.showerror("Backup Error", f"Failed to backup database:\n{e}")
+        if not filename:
+            return
+        
+        # The chosen extension wins over the configured compression
+        compress = next((name for name, (ext, _) in COMPRESSORS.items() if filename.endswith(ext)), None)
+        progress = {"done": 0, "total": 0, "finished": False}
+        
+        def run():
+            return backup_database(filename, compress=compress,
+                                   progress=lambda done, total: progress.update(done=done, total=total))
+        
+        def show_progress():
+            if progress["finished"]:
+                return
+            if progress["total"]:
+                self.update_status(f"Backing up database: {progress['done'] * 100 // progress['total']}%")
+            self.after(250, show_progress)
+        
+        def finished(result):
+            progress["finished"] = True
+            self.update_status("Backup complete")
+            messagebox.showinfo(
+                "Success",
+                f"Database backed up successfully!\n\nLocation:\n{result.path}"
+            )
+        
+        def failed(e):
+            progress["finished"] = True
+            self.update_status("Backup failed")
+            logger.error(f"Backup failed: {e}")
+            messagebox.showerror("Backup Error", f"Failed to backup database:\n{e}")
+        
+        BackgroundLoader(self).load(run, finished, on_error=failed)
+        show_progress()
     
     def _restore_database(self):
-        """Restore database from backup file."""
+        """Restore database from a backup file while the application keeps running."""
         if not messagebox.askyesno(
             "Confirm Restore",
-            "WARNING: Restoring will overwrite the current database.\n"
-            "All current data will be lost!\n\n"
-            "Make sure you have a backup of the current database.\n\n"
+            "WARNING: Restoring will replace all current data with the backup.\n\n"
+            "A snapshot of the current data is taken first, so it can be\n"
+            "brought back with File → Restore Snapshot.\n\n"
             "Do you want to continue?"
         ):
             return
         
         filename = filedialog.askopenfilename(
             title="Select Backup File",
-            filetypes=[("Database files", "*.db"), ("All files", "*.*")]
+            filetypes=[("Database files", "*.db"), ("Compressed backups", "*.db.gz *.db.xz"),
+                       ("All files", "*.*")]
         )
         
         if filename:
-            try:
-                copy2(filename, DB_FILE)
-                messagebox.showinfo(
-                    "Success",
-                    "Database restored successfully!\n\n"
-                    "Please restart the application for changes to take effect."
-                )
-                logger.info(f"Database restored from {filename}")
-                self._on_closing()
-            except Exception as e:
-                logger.error(f"Restore failed: {e}")
-                messagebox.showerror("Restore Error", f"Failed to restore database:\n{e}")
+            self._run_restore(lambda progress: restore_database(filename, progress=progress), filename)
+    
+    def _restore_snapshot(self):
+        """Restore one of the scheduled snapshots."""
+        store = self.backup_scheduler.store
+        snapshots = store.list()
+        if not snapshots:
+            messagebox.showinfo("Restore Snapshot", "No snapshots have been taken yet.")
+            return
+        
+        dialog = SnapshotSelectDialog(self, snapshots)
+        self.wait_window(dialog)
+        snapshot_id = dialog.result
+        if snapshot_id is None:
+            return
+        
+        if messagebox.askyesno(
+            "Confirm Restore",
+            "All current data will be replaced with the selected snapshot.\n"
+            "A snapshot of the current data is taken first.\n\n"
+            "Do you want to continue?"
+        ):
+            self._run_restore(lambda progress: restore_snapshot(snapshot_id, store, progress=progress),
+                              f"snapshot {snapshot_id}")
+    
+    def _run_restore(self, restore, source: str):
+        """Run a restore in the background, then bring every open view up to date."""
+        progress = {"done": 0, "total": 0, "finished": False}
+        
+        def run():
+            # Keep a way back; skipped when nothing changed since the last snapshot
+            self.backup_scheduler.store.take()
+            return restore(lambda done, total: progress.update(done=done, total=total))
+        
+        def show_progress():
+            if progress["finished"]:
+                return
+            if progress["total"]:
+                self.update_status(f"Restoring database: {progress['done'] * 100 // progress['total']}%")
+            else:
+                self.update_status("Preparing restore...")
+            self.after(250, show_progress)
+        
+        def finished(version):
+            progress["finished"] = True
+            self._reload_after_restore()
+            self.update_status("Database restored")
+            messagebox.showinfo("Success", f"Database restored successfully from:\n{source}")
+            logger.info(f"Database restored from {source} (schema v{version})")
+        
+        def failed(e):
+            progress["finished"] = True
+            self.update_status("Restore failed")
+            logger.error(f"Restore failed: {e}")
+            messagebox.showerror("Restore Error", f"Failed to restore database:\n{e}")
+        
+        BackgroundLoader(self).load(run, finished, on_error=failed)
+        show_progress()
+    
+    def _reload_after_restore(self):
+        """Drop everything cached from the old database and reload the open views."""
+        db.reset()
+        tracker.close()
+        self._last_data_version = None
+        for view_widget in self.container.view_cache.values():
+            if hasattr(view_widget, 'refresh'):
+                view_widget.refresh()
     
     # VIEW MENU ACTIONS 
     
     def _show_dashboard(self):
-        """Show dashboard with statistics."""
-        stats = self._get_statistics()
-        
+        """Show dashboard with statistics (loaded in the background)."""
         # Create dashboard window
         dashboard = ttk.Toplevel(self)
         dashboard.title("Dashboard")
@@ -337,24 +438,31 @@ class MainWindow(ttk.Window):
         )
         stats_frame.pack(fill=BOTH, expand=YES, padx=20, pady=10)
         
+        loading_label = ttk.Label(stats_frame, text="⏳ Loading...", font=("Segoe UI", 10))
+        loading_label.pack(anchor=W)
+        
         # Add statistics
-        for key, value in stats.items():
-            row_frame = ttk.Frame(stats_frame)
-            row_frame.pack(fill=X, pady=8)
-            
-            ttk.Label(
-                row_frame,
-                text=f"{key}:",
-                font=("Segoe UI", 10, "bold"),
-                width=22
-            ).pack(side=LEFT)
-            
-            ttk.Label(
-                row_frame,
-                text=str(value),
-                font=("Segoe UI", 10),
-                bootstyle="info"
-            ).pack(side=LEFT)
+        def show_statistics(stats):
+            loading_label.destroy()
+            for key, value in stats.items():
+                row_frame = ttk.Frame(stats_frame)
+                row_frame.pack(fill=X, pady=8)
+                
+                ttk.Label(
+                    row_frame,
+                    text=f"{key}:",
+                    font=("Segoe UI", 10, "bold"),
+                    width=22
+                ).pack(side=LEFT)
+                
+                ttk.Label(
+                    row_frame,
+                    text=str(value),
+                    font=("Segoe UI", 10),
+                    bootstyle="info"
+                ).pack(side=LEFT)
+        
+        BackgroundLoader(dashboard).load(self._get_statistics, show_statistics)
         
         # Close button
         ttk.Button(
@@ -368,12 +476,49 @@ class MainWindow(ttk.Window):
         self._center_dialog(dashboard)
     
     #  TOOLS MENU ACTIONS   
+    def _show_low_stock(self):
+        """Show bolts below their minimum stock level."""
+        try:
+            low_stock = BoltRepository().get_low_stock()
+            
+            if not low_stock:
+                messagebox.showinfo("Low Stock", "✅ All bolts are above their minimum stock level!")
+                return
+            
+            lines = [
+                f"• {bolt['name']}: {bolt['quantity']} (min {bolt['min_stock_level']})"
+                for bolt in low_stock[:20]
+            ]
+            if len(low_stock) > 20:
+                lines.append(f"... and {len(low_stock) - 20} more")
+            
+            messagebox.showwarning(
+                "Low Stock",
+                f"{len(low_stock)} bolt(s) below minimum stock:\n\n" + "\n".join(lines)
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to show low stock: {e}")
+            messagebox.showerror("Error", f"Failed to load low stock items:\n{e}")
+    
+    def _show_query_profiler(self):
+        """Show which SQL statements and repository methods take the most time."""
+        if not profiler.enabled:
+            if not messagebox.askyesno(
+                "Query Profiler",
+                "SQL profiling is off. Turn it on for this session?\n\n"
+                "Every query is timed while it is on, which makes the app slightly slower."
+            ):
+                return
+            db.set_profiling(True)
+        QueryProfilerDialog(self, profiler, on_disable=lambda: db.set_profiling(False))
+    
     def _show_pending_orders(self):
         """Show pending orders."""
         try:
             from database.repositories.order_repo import OrderRepository
             repo = OrderRepository()
-            pending = repo.find_by_status("pending")
+            pending = repo.count_by_status("pending")
             
             if not pending:
                 messagebox.showinfo("Pending Orders", "✅ No pending orders!")
@@ -384,7 +529,7 @@ class MainWindow(ttk.Window):
             
             messagebox.showinfo(
                 "Pending Orders",
-                f"Found {len(pending)} pending order(s).\n\n"
+                f"Found {pending} pending order(s).\n\n"
                 "Switched to Orders view."
             )
             
@@ -646,15 +791,10 @@ Developed with Python & ttkbootstrap
                 stats["Total Customers"] = cursor.fetchone()['count']
                 
                 # Bolt count and low stock
-                cursor.execute("SELECT COUNT(*) as count FROM bolts")
-                stats["Total Bolt Types"] = cursor.fetchone()['count']
-                
-                cursor.execute("SELECT SUM(quantity) as total FROM bolts")
-                result = cursor.fetchone()
-                stats["Total Bolt Quantity"] = result['total'] if result['total'] else 0
-                
-                cursor.execute("SELECT COUNT(*) as count FROM bolts WHERE quantity < min_stock_level")
-                stats["Low Stock Items"] = cursor.fetchone()['count']
+                stock = BoltRepository().get_stock_summary()
+                stats["Total Bolt Types"] = stock['total_types']
+                stats["Total Bolt Quantity"] = stock['total_quantity']
+                stats["Low Stock Items"] = stock['low_stock']
                 
                 # Order statistics
                 cursor.execute("SELECT COUNT(*) as count FROM orders")
@@ -675,10 +815,30 @@ Developed with Python & ttkbootstrap
         
         return stats
     
+    def _poll_changes(self):
+        """Refresh the visible view when its tables changed; one PRAGMA when idle."""
+        try:
+            data_version = tracker.data_version()
+            if data_version != self._last_data_version:
+                self._last_data_version = data_version
+                current_view = self._get_current_view()
+                if current_view and hasattr(current_view, 'refresh_if_stale'):
+                    current_view.refresh_if_stale()
+        except Exception as e:
+            logger.warning(f"Change polling failed: {e}")
+        self.after(CHANGE_POLL_MS, self._poll_changes)
+    
     def update_status(self, message: str):
         """Update status bar message."""
         self.status_label.configure(text=message)
-        self.after(3000, lambda: self.status_label.configure(text="Ready"))
+        # Only the latest message resets, so frequent updates do not flicker
+        if self._status_reset is not None:
+            self.after_cancel(self._status_reset)
+        self._status_reset = self.after(3000, self._reset_status)
+    
+    def _reset_status(self):
+        self._status_reset = None
+        self.status_label.configure(text="Ready")
     
     def _center_dialog(self, dialog):
         """Center dialog on parent window."""
@@ -701,4 +861,9 @@ Developed with Python & ttkbootstrap
         """Handle application closing."""
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
             logger.info("Application closed by user")
+            logger.info(f"Connection pool stats: {db.pool_stats()}")
+            self.backup_scheduler.stop()
+            shutdown_loaders()
+            tracker.close()
+            db.close()
             self.destroy()
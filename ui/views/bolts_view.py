@@ -1,7 +1,6 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import messagebox
-from typing import Optional
 
 from ui.components.base_crud_view import BaseView
 from ui.components.dialogs import FormDialog, DetailsDialog
@@ -12,14 +11,6 @@ from config.translation import GREEK as t
 
 
 class BoltsView(BaseView):
-    @staticmethod
-    def _to_int(value, default=0):
-        try:
-            return int(value)
-        except (TypeError, ValueError):
-            return default
-
-    
     def __init__(self, parent):
         repository = BoltRepository()
         super().__init__(parent, repository, Bolt)
@@ -49,48 +40,14 @@ class BoltsView(BaseView):
             (t["full_details_button"], self.show_full_details)
         ]
     
-    def fetch_data(self, search_term=""):
-        """Fetch bolts data with optional search."""
-        if search_term:
-            return self.repository.find_by_name(search_term)
-        return self.repository.get_all()
-    
     def format_row(self, item):
-        d = dict(item)                      
-        qty = self._to_int(d.get('quantity'), 0) 
         return (
-            d.get('name'),
-            d.get('type'),
-            d.get('stamp'),
-            qty
+            item.get('name'),
+            item.get('type'),
+            item.get('stamp'),
+            item.get('quantity')
         )
     
-    def refresh(self):
-        """Refresh table with low stock highlighting."""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        try:
-            search_term = self.search_var.get().strip()
-            items = self.fetch_data(search_term)
-
-            # Configure tags
-            self.tree.tag_configure('oddrow', background='#f8f9fa')
-            self.tree.tag_configure('evenrow', background='#ffffff')
-
-            for idx, item in enumerate(items):
-                values = self.format_row(item)
-
-                tags = ('evenrow',) if idx % 2 == 0 else ('oddrow',)
-
-                self.tree.insert("", END, values=values, tags=tags)
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load data: {e}")
-
-
-    
     def get_form_fields(self, is_edit=False):
         """Define form fields for bolt."""
         return [
@@ -104,6 +61,7 @@ class BoltsView(BaseView):
             {'name': 'square_mechanism', 'label': t['square_mechanism'], 'label_gr': t['square_mechanism'], 'type': 'text', 'required': False},
             {'name': 'stamp', 'label': t['stamp'], 'label_gr': t['stamp'], 'type': 'text', 'required': True},
             {'name': 'quantity', 'label': t['quantity'], 'label_gr': t['quantity'], 'type': 'number', 'required': False},
+            {'name': 'min_stock_level', 'label': t['min_stock_level'], 'label_gr': t['min_stock_level'], 'type': 'number', 'required': False},
         ]
     
     def validate_bolt_data(self, data):
@@ -148,7 +106,7 @@ class BoltsView(BaseView):
                     bolt = Bolt(id=bolt_id, **data)
                     self.repository.update(bolt)
                     messagebox.showinfo(t["success"], t["bolt_updated"])
-                    self.refresh()
+                    self.refresh_item(bolt_id)
                 except Exception as e:
                     messagebox.showerror(t["error"], f"{t['failed_to_update']}: {e}")
                     raise
@@ -191,37 +149,3 @@ class BoltsView(BaseView):
             DetailsDialog(self, f"{t['bolt_details']} #{bolt_id} - {t['full_details']}", data)
         except Exception as e:
             messagebox.showerror(t["error"], f"{t['failed_to_load']}: {e}")
-
-    
-    def refresh(self):
-        """Refresh table data - override to store ID in item."""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        try:
-            search_term = self.search_var.get().strip()
-            items = self.fetch_data(search_term)
-
-            # Configure tags
-            self.tree.tag_configure('oddrow', background='#f8f9fa')
-            self.tree.tag_configure('evenrow', background='#ffffff')
-
-            for idx, item in enumerate(items):
-                values = self.format_row(item)
-                tags = ('evenrow',) if idx % 2 == 0 else ('oddrow',)
-                # Store the bolt ID as the tree item identifier
-                self.tree.insert("", END, iid=str(item['id']), values=values, tags=tags)
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load data: {e}")
-
-    def get_selected_id(self) -> Optional[int]:
-        """Get ID of selected bolt from tree iid."""
-        selection = self.tree.selection()
-        if not selection:
-            return None
-        try:
-            return int(selection[0])
-        except (ValueError, IndexError):
-            return None
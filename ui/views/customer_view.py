@@ -1,7 +1,6 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import messagebox
-from typing import Optional
 
 from ui.components.base_crud_view import BaseView
 from ui.components.dialogs import FormDialog, DetailsDialog
@@ -27,11 +26,6 @@ class CustomerView(BaseView):
     def get_table_name(self):
         return "customers"
     
-    def fetch_data(self, search_term=""):
-        if search_term:
-            return self.repository.find_by_name(search_term)
-        return self.repository.get_all()
-    
     def format_row(self, item):
         return (item['name'], item['phone'])
     
@@ -88,7 +82,7 @@ class CustomerView(BaseView):
                     customer = Customer(id=customer_id, **data)
                     self.repository.update(customer)
                     messagebox.showinfo("Success", "Customer updated successfully!")
-                    self.refresh()
+                    self.refresh_item(customer_id)
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to update customer: {e}")
                     raise
@@ -115,30 +109,3 @@ class CustomerView(BaseView):
             DetailsDialog(self, f"Customer #{customer_id}", dict(row))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load customer: {e}")
-
-    def refresh(self):
-        """Refresh the table data - override to store ID in item."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        try:
-            search_term = self.search_var.get().strip() if hasattr(self, 'search_var') else ""
-            items = self.fetch_data(search_term)
-
-            for idx, item in enumerate(items):
-                values = self.format_row(item)
-                tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-                self.tree.insert("", END, iid=str(item['id']), values=values, tags=(tag,))
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load data: {e}")
-
-    def get_selected_id(self) -> Optional[int]:
-        """Get ID of selected customer from tree iid."""
-        selection = self.tree.selection()
-        if not selection:
-            return None
-        try:
-            return int(selection[0])
-        except (ValueError, IndexError):
-            return None
@@ -4,6 +4,7 @@ from tkinter import messagebox, simpledialog
 from typing import Optional, Dict, List
 
 from ui.components.base_crud_view import BaseView
+from ui.components.loader import BackgroundLoader
 from ui.components.dialogs import (
     FormDialog, DetailsDialog, CustomerSelectDialog,
     StatusUpdateDialog, OrderSearchDialog, OrderDetailsDialog, OrderListDialog, OrderItemsDialog
@@ -19,11 +20,21 @@ from config.settings import ORDER_STATUSES
 class OrdersView(BaseView):
     """Modern order management view with simplified architecture"""
     
+    # Advanced search shows at most this many orders, newest first
+    SEARCH_RESULT_LIMIT = 500
+    # Customer and bolt pickers list this many matches, sorted by name
+    PICKER_LIMIT = 200
+    # Item summaries kept while scrolling; cleared on every refresh
+    ITEMS_CACHE_SIZE = 2000
+    
     def __init__(self, parent):
         self.customer_repo = CustomerRepository()
         self.bolt_repo = BoltRepository()
+        self._items_summaries = {}
         repository = OrderRepository()
         super().__init__(parent, repository, Order)
+        # Separate from self.loader so a search does not supersede a refresh
+        self.search_loader = BackgroundLoader(self, on_busy=self._set_loading)
     
     def get_columns(self):
         return ["id", "customer", "status", "order_date", "items", "total_items"]
@@ -45,6 +56,10 @@ class OrdersView(BaseView):
     def get_table_name(self):
         return "orders"
     
+    def get_tracked_tables(self):
+        # Rows show customer names and item summaries with bolt names
+        return ("orders", "customers", "order_items", "bolts")
+    
     def get_custom_buttons(self):
         """Add custom buttons for order-specific actions."""
         return [
@@ -53,13 +68,6 @@ class OrdersView(BaseView):
             ("🔎 Advanced Search", self.on_advanced_search),
         ]
     
-    def fetch_data(self, search_term=""):
-        """Fetch orders with customer names and item summary."""
-        if search_term:
-            # Search by customer name
-            return self.repository.search_by_customer_name(search_term)
-        return self.repository.get_all_with_summary()
-    
     def format_row(self, item):
         """Format order for display."""
         items_summary = self._get_items_summary(item.get('id'))
@@ -73,55 +81,75 @@ class OrdersView(BaseView):
             item.get('total_items', 0)
         )
     
-    def refresh(self):
-        """Refresh table with status-based highlighting."""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        try:
-            search_term = self.search_var.get().strip()
-            items = self.fetch_data(search_term)
-
-            # Configure status tags
-            self.tree.tag_configure('pending', background='#fff3cd', foreground='#856404')
-            self.tree.tag_configure('approved', background='#d1ecf1', foreground='#0c5460')
-            self.tree.tag_configure('shipped', background='#d4edda', foreground='#155724')
-            self.tree.tag_configure('delivered', background='#d4edda', foreground='#155724')
-            self.tree.tag_configure('cancelled', background='#f8d7da', foreground='#721c24')
-            self.tree.tag_configure('oddrow', background='#f8f9fa')
-            self.tree.tag_configure('evenrow', background='#ffffff')
-
-            # Insert items with appropriate tags
-            for idx, item in enumerate(items):
-                values = self.format_row(item)
-                
-                status = item.get('status', 'pending').lower()
-                if status in ['pending', 'approved', 'shipped', 'delivered', 'cancelled']:
-                    tags = [status]
-                else:
-                    tags = ['evenrow' if idx % 2 == 0 else 'oddrow']
-                
-                self.tree.insert("", END, values=values, tags=tuple(tags))
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load data: {e}")
+    def get_export_columns(self):
+        return ["id", "customer_name", "status", "order_date", "items", "total_items", "notes"]
+    
+    def iter_export_chunks(self):
+        """Listing chunks with the complete item list of every order."""
+        for rows in super().iter_export_chunks():
+            summaries = self.repository.get_items_summaries([row['id'] for row in rows], limit=None)
+            chunk = []
+            for row in rows:
+                summary = summaries.get(row['id'])
+                items = summary['items'] if summary else []
+                chunk.append({**row, 'items': "; ".join(f"{item['bolt_name']} x{item['quantity']}"
+                                                        for item in items)})
+            yield chunk
+    
+    def setup_ui(self):
+        super().setup_ui()
+        
+        # Status tags
+        self.tree.tag_configure('pending', background='#fff3cd', foreground='#856404')
+        self.tree.tag_configure('approved', background='#d1ecf1', foreground='#0c5460')
+        self.tree.tag_configure('shipped', background='#d4edda', foreground='#155724')
+        self.tree.tag_configure('delivered', background='#d4edda', foreground='#155724')
+        self.tree.tag_configure('cancelled', background='#f8d7da', foreground='#721c24')
+    
+    def prepare_rows(self, items):
+        """Load the item summaries of rows scrolled into view in one query."""
+        order_ids = [item['id'] for item in items]
+        missing = [order_id for order_id in order_ids if order_id not in self._items_summaries]
+        if not missing:
+            return
+        if len(self._items_summaries) + len(missing) > self.ITEMS_CACHE_SIZE:
+            # Keep only the rows still on screen
+            self._items_summaries = {order_id: self._items_summaries[order_id]
+                                     for order_id in order_ids if order_id in self._items_summaries}
+        summaries = self.repository.get_items_summaries(missing)
+        # Orders without items are recorded as None so they are not re-queried
+        self._items_summaries.update((order_id, summaries.get(order_id)) for order_id in missing)
+    
+    def _apply_source(self, source):
+        # A refresh or search: the cached summaries may be out of date
+        self._items_summaries = {}
+        super()._apply_source(source)
+    
+    def refresh_item(self, item_id: int):
+        self._items_summaries.pop(item_id, None)
+        super().refresh_item(item_id)
+    
+    def get_row_tags(self, item, position):
+        """Highlight rows by order status."""
+        status = item.get('status', 'pending').lower()
+        if status in ['pending', 'approved', 'shipped', 'delivered', 'cancelled']:
+            return (status,)
+        return super().get_row_tags(item, position)
     
     def _get_items_summary(self, order_id: int) -> str:
-        """Get brief summary of order items."""
+        """Get brief summary of order items from the batch loaded by prepare_rows()."""
         try:
-            order_details = self.repository.get_with_details(order_id)
-            if not order_details or not order_details.get('items'):
+            summary = self._items_summaries.get(order_id)
+            if summary is None and order_id not in self._items_summaries:
+                summary = self.repository.get_items_summaries([order_id]).get(order_id)
+            if not summary:
                 return "No items"
             
-            items = order_details['items']
-            if len(items) == 1:
-                return f"{items[0]['bolt_name']} x{items[0]['quantity']}"
-            elif len(items) == 2:
-                return f"{items[0]['bolt_name']} x{items[0]['quantity']}, {items[1]['bolt_name']} x{items[1]['quantity']}"
-            else:
-                return f"{items[0]['bolt_name']} x{items[0]['quantity']}, {items[1]['bolt_name']} x{items[1]['quantity']}, +{len(items)-2} more"
-        except:
+            text = ", ".join(f"{item['bolt_name']} x{item['quantity']}" for item in summary['items'])
+            if summary['remaining']:
+                text += f", +{summary['remaining']} more"
+            return text
+        except Exception:
             return "Error loading items"
     
     def on_add(self):
@@ -144,12 +172,11 @@ class OrdersView(BaseView):
             if not order_items:
                 return
             
-            # Create order
+            # Create order (item totals are maintained by the database)
             order = Order(
                 customer_id=customer_id,
                 status="pending",
-                notes=notes,
-                total_items=sum(item.quantity for item in order_items)
+                notes=notes
             )
             
             order_id = self.repository.create(order, order_items)
@@ -165,16 +192,25 @@ class OrdersView(BaseView):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to create order:\n{e}")
 
+    def _picker_search(self, repository):
+        """Search function for a picker dialog: the first PICKER_LIMIT matches by name."""
+        limit = self.PICKER_LIMIT
+        
+        def search(term):
+            if term:
+                return repository.search_page(term, "name", page_size=limit).rows
+            return repository.get_page("name", page_size=limit).rows
+        return search
+    
     def _select_order_items_dialog(self) -> Optional[Dict[str, int]]:
         """Show dialog to select order items."""
         try:
-            bolts = list(self.bolt_repo.get_all())
-            if not bolts:
+            if not self.bolt_repo.get_page(page_size=1):
                 messagebox.showerror("No Bolts", "Please add bolts to inventory first!")
                 return None
         
 
-            dialog = OrderItemsDialog(self, bolts)
+            dialog = OrderItemsDialog(self, self._picker_search(self.bolt_repo), limit=self.PICKER_LIMIT)
             self.wait_window(dialog)
             return dialog.result
         
@@ -185,12 +221,12 @@ class OrdersView(BaseView):
     def _select_customer(self) -> tuple[Optional[int], Optional[str]]:
         """Show customer selection dialog."""
         try:
-            customers = self.customer_repo.get_all()
-            if not customers:
+            if not self.customer_repo.get_page(page_size=1):
                 messagebox.showerror("No Customers", "Please add customers first!")
                 return None, None
             
-            dialog = CustomerSelectDialog(self, customers)
+            dialog = CustomerSelectDialog(self, self._picker_search(self.customer_repo),
+                                          limit=self.PICKER_LIMIT)
             self.wait_window(dialog)
             return dialog.result if dialog.result else (None, None)
             
@@ -331,7 +367,7 @@ class OrdersView(BaseView):
                     f"{current_status} → {new_status}"
                 )
                 
-                self.refresh()
+                self.refresh_item(order_id)
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to update order:\n{e}")
@@ -353,12 +389,7 @@ class OrdersView(BaseView):
             return
         
         try:
-            order = self.repository.get_with_details(order_id)
-            if not order:
-                messagebox.showerror("Error", "Order not found.")
-                return
-            
-            OrderDetailsDialog(self, order)
+            OrderDetailsDialog(self, load=lambda: self.repository.get_with_details(order_id))
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load order details:\n{e}")
@@ -372,29 +403,32 @@ class OrdersView(BaseView):
             search_type = dialog.result['type']
             search_value = dialog.result['value']
             
-            try:
-                if search_type == "customer":
-                    results = self.repository.search_by_customer_name(search_value)
-                elif search_type == "status":
-                    results = self.repository.find_by_status(search_value)
-                elif search_type == "bolt":
-                    results = self.repository.search_by_bolt_name(search_value)
-                else:
-                    return
-                
+            limit = self.SEARCH_RESULT_LIMIT
+            searches = {
+                "customer": lambda value: self.repository.search_by_customer_name(value, page_size=limit),
+                "status": lambda value: self.repository.find_by_status(value, page_size=limit),
+                "bolt": lambda value: self.repository.search_by_bolt_name(value, page_size=limit),
+                "notes": lambda value: self.repository.search_notes(value, limit=limit),
+            }
+            search = searches.get(search_type)
+            if search is None:
+                return
+            
+            def show_results(results):
                 if not results:
                     messagebox.showinfo("No Results", "No orders found matching your search.")
                     return
-                
-                OrderListDialog(self, results, on_open=self._open_order_from_search)
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Search failed:\n{e}")
+                OrderListDialog(self, results, on_open=self._open_order_from_search, limit=limit)
+            
+            self.search_loader.load(
+                lambda: search(search_value),
+                show_results,
+                on_error=lambda e: messagebox.showerror("Error", f"Search failed:\n{e}"),
+            )
     
     def _open_order_from_search(self, order_id: int):
         """Open order details from search results."""
         try:
-            order = self.repository.get_with_details(order_id)
-            OrderDetailsDialog(self, order)
+            OrderDetailsDialog(self, load=lambda: self.repository.get_with_details(order_id))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load order:\n{e}")
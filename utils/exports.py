@@ -1,6 +1,10 @@
 import csv
+import gzip
+import io
+import os
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence
 
 def export_to_csv(data: list, columns: list, filename: str):
     """Export data to CSV file."""
@@ -21,6 +25,47 @@ def export_to_csv(data: list, columns: list, filename: str):
             writer.writerow(row)
 
 
+def stream_to_csv(chunks: Iterable[Sequence], columns: list, filename: str,
+                  headers: Optional[list] = None, compress: bool = False,
+                  progress: Optional[Callable[[int], None]] = None,
+                  buffer_size: int = 1 << 20) -> int:
+    """
+    Write rows to CSV as they arrive, so memory stays flat for any size.
+    
+    Args:
+        chunks: Iterable of row batches; rows are mappings keyed by column
+        columns: Keys to write, in order
+        headers: Header line (defaults to columns)
+        compress: gzip the output
+        progress: Called with the running row count after each batch
+        
+    Returns:
+        Number of rows written
+    """
+    filepath = Path(filename)
+    # Write next to the target and rename at the end, so a failed export
+    # never leaves a truncated file under the real name
+    partial = filepath.with_name(filepath.name + ".part")
+    
+    raw = gzip.open(partial, "wb") if compress else open(partial, "wb")
+    written = 0
+    try:
+        with io.TextIOWrapper(io.BufferedWriter(raw, buffer_size), encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers or columns)
+            for chunk in chunks:
+                writer.writerows([row.get(col, "") for col in columns] for row in chunk)
+                written += len(chunk)
+                if progress:
+                    progress(written)
+        os.replace(partial, filepath)
+    except BaseException:
+        raw.close()
+        partial.unlink(missing_ok=True)
+        raise
+    return written
+
+
 def generate_report(data: dict, filename: str):
     """Generate a simple text report."""
     filepath = Path(filename)
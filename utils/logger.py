@@ -1,24 +1,119 @@
+import atexit
+import gzip
 import logging
-from config.settings import LOG_FILE, LOG_LEVEL
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+from config.settings import (
+    LOG_FILE, LOG_LEVEL, LOG_MAX_BYTES, LOG_MAX_AGE_DAYS, LOG_BACKUP_COUNT, SLOW_QUERY_LOG
+)
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotates by size or age, whichever comes first, and gzips rotated files.
+
+    Age counts from when the current file was started; for a file that
+    already exists at startup its modification time is used, as
+    TimedRotatingFileHandler does.
+    """
+
+    def __init__(self, filename, max_bytes: int, max_age: float, backup_count: int):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.max_age = max_age
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._compress
+        try:
+            self.started = os.stat(self.baseFilename).st_mtime
+        except OSError:
+            self.started = time.time()
+
+    def shouldRollover(self, record):
+        # An empty file is not worth a backup, however old it is
+        if (self.max_age and time.time() - self.started >= self.max_age
+                and self.stream is not None and self.stream.tell()):
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.started = time.time()
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+
+def _not_slow_queries(record) -> bool:
+    # Slow-query records, with their plans, only go to SLOW_QUERY_LOG
+    return not record.name.startswith("PowerLock.slow")
+
 
 def setup_logger(name: str = "PowerLock"):
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, LOG_LEVEL))
-
-    #file handler 
-    fh = logging.FileHandler(LOG_FILE)
-    fh.setLevel(logging.DEBUG)
-
-    # Console handler
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
-    
-    # Formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    fh.setFormatter(formatter)
-    ch.setFormatter(formatter)
-    
-    logger.addHandler(fh)
-    logger.addHandler(ch)
-    
-    return logger
\ No newline at end of file
+    """
+    Configure application logging once and return the named logger.
+
+    Records are only put on a queue by the calling thread; a listener
+    thread formats them and does the file and console I/O. Later calls just
+    return the logger, so handlers are never installed twice.
+    """
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is None:
+            # File handler
+            fh = CompressingRotatingFileHandler(
+                LOG_FILE, LOG_MAX_BYTES, LOG_MAX_AGE_DAYS * 86400, LOG_BACKUP_COUNT
+            )
+            fh.setLevel(logging.DEBUG)
+            fh.addFilter(_not_slow_queries)
+
+            # Console handler
+            ch = logging.StreamHandler()
+            ch.setLevel(logging.INFO)
+            ch.addFilter(_not_slow_queries)
+
+            # Slow-query log: statements over SLOW_QUERY_MS with their plans
+            sh = CompressingRotatingFileHandler(
+                SLOW_QUERY_LOG, LOG_MAX_BYTES, LOG_MAX_AGE_DAYS * 86400, LOG_BACKUP_COUNT
+            )
+            sh.addFilter(logging.Filter("PowerLock.slow"))
+
+            # Formatter
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            fh.setFormatter(formatter)
+            ch.setFormatter(formatter)
+            sh.setFormatter(formatter)
+
+            log_queue = queue.SimpleQueue()
+            app_logger = logging.getLogger("PowerLock")
+            app_logger.setLevel(getattr(logging, LOG_LEVEL))
+            _queue_handler = logging.handlers.QueueHandler(log_queue)
+            app_logger.addHandler(_queue_handler)
+
+            _listener = logging.handlers.QueueListener(log_queue, fh, ch, sh, respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+
+    return logging.getLogger(name)
+
+
+def shutdown_logging():
+    """Write out queued records and stop the listener thread."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            logging.getLogger("PowerLock").removeHandler(_queue_handler)
+            _queue_handler = None
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
@@ -0,0 +1,15 @@
+import unicodedata
+
+
+def normalize_text(value) -> str:
+    """
+    Fold text for searching: case-insensitive and accent-insensitive.
+    
+    "Ντίζα", "ΝΤΙΖΑ" and "ντιζα" all become "ντιζα". Final sigma folds
+    to σ, so word endings match as well. None becomes "".
+    """
+    if value is None:
+        return ""
+    decomposed = unicodedata.normalize("NFD", str(value).casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return unicodedata.normalize("NFC", stripped)